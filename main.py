@@ -1,96 +1,461 @@
 #!/usr/bin/env python3
 import sys
 from pathlib import Path
-from typing import List, Tuple, cast
+from typing import TYPE_CHECKING, Dict, List, Tuple, cast
 
 import psutil
 from loguru import logger
 
 from procsight.cli.parser import get_params
-from procsight.core.file_export import export_to_csv
+from procsight.core.file_export import export_to_file
+from procsight.core.highfreq import HighFrequencyCapture
+from procsight.core.leak import (
+    DEFAULT_WINDOW_SEC,
+    LeakDetector,
+    cgroup_memory_limit_mb,
+)
 from procsight.core.monitor import Monitor
-from procsight.models.metrics import CpuUsage, MemoryUsage, ProcessSample
-from procsight.visualization.plot import (
-    plot_cpu_usage,
-    plot_from_extended,
-    plot_memory_usage,
+from procsight.core.multi_monitor import MultiMonitor
+from procsight.core.process_tree import TreeMonitor
+from procsight.core.rows import BASIC_COLUMNS, EXTENDED_COLUMNS
+from procsight.core.sinks import (
+    DEFAULT_TAIL,
+    SampleSink,
+    StatsSink,
+    TailSink,
+    open_file_sink,
 )
 
+if TYPE_CHECKING:
+    from procsight.models.metrics import CpuUsage, MemoryUsage, ProcessSample
 
-def main():
-    logger.remove()
-    logger.add(sys.stdout, level="INFO")
+# pandas, matplotlib, seaborn and pydantic are only imported once a run needs
+# them (plots, CSV export), so sampling starts as soon as the arguments are parsed
+
+
+def _wants_plots(args) -> bool:
+    return not args.no_show or bool(args.save_plots)
+
+
+def _plotting(args):
+    """Import the plotting module, on the Agg backend when nothing is shown."""
+    if args.no_show:
+        import matplotlib
+
+        matplotlib.use("Agg")
+    from procsight.visualization import plot
+
+    return plot
+
+
+def _plot_basic(args, data, times, label: str) -> None:
+    if not _wants_plots(args):
+        return
+    plot = _plotting(args)
+    basic_tuples: List[Tuple[CpuUsage, MemoryUsage]] = data
+
+    cpu_path = None
+    mem_path = None
+    if args.save_plots:
+        p = Path(args.save_plots)
+        p.mkdir(parents=True, exist_ok=True)
+        ext = getattr(args, "img_format", "png")
+        cpu_path = str(p / f"cpu_{label}.{ext}")
+        mem_path = str(p / f"mem_{label}.{ext}")
+
+    plot.plot_cpu_usage(
+        basic_tuples,
+        times,
+        show=not args.no_show,
+        save_path=cpu_path,
+        dpi=args.dpi,
+        transparent=getattr(args, "transparent", False),
+        theme=getattr(args, "theme", "light"),
+        max_points=getattr(args, "max_points", None),
+    )
+    plot.plot_memory_usage(
+        basic_tuples,
+        times,
+        show=not args.no_show,
+        save_path=mem_path,
+        dpi=args.dpi,
+        transparent=getattr(args, "transparent", False),
+        theme=getattr(args, "theme", "light"),
+        max_points=getattr(args, "max_points", None),
+    )
+
+
+def _plot_extended(args, data, times, subdir: str | None = None) -> None:
+    if not _wants_plots(args):
+        return
+    plot = _plotting(args)
+    out_dir = None
+    if args.save_plots:
+        p = Path(args.save_plots)
+        if subdir:
+            p = p / subdir
+        p.mkdir(parents=True, exist_ok=True)
+        out_dir = str(p)
+
+    samples_ext = cast("List[ProcessSample]", data)
+    plot.plot_from_extended(
+        samples_ext,
+        times,
+        out_dir=out_dir,
+        show=not args.no_show,
+        dpi=args.dpi,
+        theme=getattr(args, "theme", "light"),
+        ext=getattr(args, "img_format", "png"),
+        max_points=getattr(args, "max_points", None),
+    )
+
+
+def _pid_path(out: str, pid: int) -> str:
+    """``<out stem>_pid<pid><suffix>`` next to ``out``."""
+    return str(Path(out).with_stem(f"{Path(out).stem}_pid{pid}"))
+
+
+def _side_path(out: str, name: str) -> str:
+    """``<out stem>_<name>.csv`` next to ``out``."""
+    return str(Path(out).with_name(f"{Path(out).stem}_{name}.csv"))
 
-    args = get_params()
+
+def _plot_threads(args, series) -> None:
+    if not _wants_plots(args) or not len(series):
+        return
+    plot = _plotting(args)
+    save_path = None
+    if args.save_plots:
+        p = Path(args.save_plots)
+        p.mkdir(parents=True, exist_ok=True)
+        save_path = str(p / f"threads.{getattr(args, 'img_format', 'png')}")
+    plot.plot_thread_cpu(
+        series,
+        show=not args.no_show,
+        save_path=save_path,
+        dpi=args.dpi,
+        transparent=getattr(args, "transparent", False),
+        theme=getattr(args, "theme", "light"),
+        max_points=getattr(args, "max_points", None),
+    )
+
+
+def _leak_detector(args) -> LeakDetector:
+    limit = getattr(args, "leak_limit", None)
+    if limit is None:
+        limit = cgroup_memory_limit_mb(args.pid)
+        if limit is not None:
+            logger.info(
+                f"leak check: projecting against the cgroup limit of {limit:g} MB"
+            )
+    return LeakDetector(
+        window_s=getattr(args, "leak_window", DEFAULT_WINDOW_SEC), limit_mb=limit
+    )
+
+
+def _stats_sink(args) -> StatsSink:
+    """Summary statistics of a streamed run, saved as ``<out>_stats.json``."""
+    json_path = None
+    if args.out:
+        json_path = str(Path(args.out).with_name(f"{Path(args.out).stem}_stats.json"))
+    return StatsSink(
+        EXTENDED_COLUMNS if args.extended else BASIC_COLUMNS,
+        getattr(args, "thresholds", None),
+        json_path,
+        leak=_leak_detector(args),
+    )
+
+
+def _output_sinks(args) -> List[SampleSink]:
+    stats = _stats_sink(args)
+    sinks: List[SampleSink] = [stats]
+    if args.out:
+        sinks.append(open_file_sink(args.out, args.extended, stats=stats.stats))
+    return sinks
+
+
+def _run_single(args) -> None:
+    # stream samples to --out as they arrive; continuous runs keep only a
+    # bounded tail in memory for the final plots
+    continuous = not args.duration and not args.samples
+    sinks = _output_sinks(args)
+    tail = None
+    if continuous:
+        tail = TailSink(getattr(args, "tail", DEFAULT_TAIL))
+        sinks.append(tail)
 
     try:
-        monitor = Monitor(pid=args.pid, interval=args.interval)
+        monitor = Monitor(
+            pid=args.pid,
+            interval=args.interval,
+            backend=getattr(args, "backend", "auto"),
+            sinks=sinks,
+            retain=not continuous,
+            overrun=getattr(args, "overrun", "skip"),
+            self_metrics=getattr(args, "self_metrics", False),
+            max_interval=getattr(args, "max_interval", None),
+            threads=getattr(args, "threads", 0),
+            self_out=_side_path(args.out, "self") if args.out else None,
+            threads_out=_side_path(args.out, "threads") if args.out else None,
+        )
 
         data = monitor.get_process_usage_by_interval(
             duration=args.duration, samples=args.samples, extended=args.extended
         )
+    finally:
+        for sink in sinks:
+            sink.close()
+
+    thread_series = getattr(monitor, "thread_series", None)
+
+    # we use actual sampled times captured by Monitor
+    times = monitor.sample_times
+    if tail is not None:
+        data, times = tail.samples, tail.times
+    if not args.extended:
+        _plot_basic(args, data, times, f"pid{args.pid}")
+    else:
+        # extended mode: produce richer plots
+        _plot_extended(args, data, times)
+        if thread_series is not None:
+            _plot_threads(args, thread_series)
+
+
+def _run_live(args) -> None:
+    from procsight.visualization.live import REFRESH_SEC, LivePlot, run_live
+
+    live = LivePlot(
+        extended=args.extended,
+        interval=args.interval,
+        window_sec=args.live_window,
+        refresh_sec=args.refresh or REFRESH_SEC,
+        theme=getattr(args, "theme", "light"),
+        title=f"pid {args.pid}",
+    )
+    sinks: List[SampleSink] = [live, *_output_sinks(args)]
+    monitor = Monitor(
+        pid=args.pid,
+        interval=args.interval,
+        backend=getattr(args, "backend", "auto"),
+        sinks=sinks,
+        retain=False,
+        overrun=getattr(args, "overrun", "skip"),
+        max_interval=getattr(args, "max_interval", None),
+    )
+    try:
+        run_live(monitor, live, args.duration, args.samples, args.extended)
+    finally:
+        for sink in sinks:
+            sink.close()
+
+    if args.save_plots:
+        p = Path(args.save_plots)
+        p.mkdir(parents=True, exist_ok=True)
+        live.save(str(p / f"live_pid{args.pid}.{args.img_format}"), dpi=args.dpi)
+
+
+def _run_tui(args) -> None:
+    from procsight.visualization.tui import REFRESH_SEC, TerminalView, run_tui
+
+    view = TerminalView(
+        extended=args.extended,
+        interval=args.interval,
+        window_sec=args.live_window,
+        title=f"ProcSight pid {args.pid}",
+    )
+    sinks: List[SampleSink] = [view, *_output_sinks(args)]
+    monitor = Monitor(
+        pid=args.pid,
+        interval=args.interval,
+        backend=getattr(args, "backend", "auto"),
+        sinks=sinks,
+        retain=False,
+        overrun=getattr(args, "overrun", "skip"),
+        max_interval=getattr(args, "max_interval", None),
+    )
+    # log lines would scribble over the curses screen
+    logger.disable("procsight")
+    try:
+        run_tui(
+            monitor,
+            view,
+            args.duration,
+            args.samples,
+            args.extended,
+            refresh_sec=args.refresh or REFRESH_SEC,
+        )
+    finally:
+        logger.enable("procsight")
+        for sink in sinks:
+            sink.close()
+    logger.info(f"terminal view used {view.cpu_percent:.2f}% of one core")
+
+
+def _run_triggered(args) -> None:
+    from procsight.core.trigger import TriggeredCapture
+
+    monitor = Monitor(
+        pid=args.pid,
+        interval=args.interval,
+        backend=getattr(args, "backend", "auto"),
+        retain=False,
+        overrun=getattr(args, "overrun", "skip"),
+    )
+    capture = TriggeredCapture(
+        monitor,
+        args.triggers,
+        args.out,
+        capture_interval=args.capture_interval,
+        window_s=args.capture_window,
+        pre_s=args.pre_trigger,
+    )
+    incidents = capture.run(duration=args.duration, samples=args.samples)
+    logger.info(f"{len(incidents)} triggered captures written")
+
+
+def _run_high_freq(args) -> None:
+    capture = HighFrequencyCapture(
+        pid=args.pid,
+        interval=args.interval,
+        backend=getattr(args, "backend", "auto"),
+    )
+    try:
+        data = capture.run(duration=args.duration, samples=args.samples)
+    finally:
+        capture.close()
+
+    if args.out:
+        export_to_file(args, data, data.times)
+    _plot_basic(args, data, data.times, f"pid{args.pid}")
+
+
+def _pid_sinks(args, continuous: bool, opened: List[SampleSink]):
+    """
+    Per-PID sink factory for the multi-process monitors, and the tails it fills.
 
+    Each PID streams to ``<out stem>_pid<PID>`` and, in continuous runs, to a
+    bounded tail for the final plots. Every sink made is added to ``opened``.
+    """
+    tails: Dict[int, TailSink] = {}
+
+    def sinks_for(pid: int) -> List[SampleSink]:
+        per_pid: List[SampleSink] = []
         if args.out:
-            export_to_csv(args, data)
+            per_pid.append(open_file_sink(_pid_path(args.out, pid), args.extended))
+        if continuous:
+            per_pid.append(
+                tails.setdefault(pid, TailSink(getattr(args, "tail", DEFAULT_TAIL)))
+            )
+        opened.extend(per_pid)
+        return per_pid
+
+    return sinks_for, tails
 
+
+def _run_multi(args) -> None:
+    # stream each PID to its own file as samples arrive; continuous runs keep
+    # only a bounded tail per PID in memory for the final plots
+    continuous = not args.duration and not args.samples
+    sinks: List[SampleSink] = []
+    sinks_for, tails = _pid_sinks(args, continuous, sinks)
+
+    try:
+        monitor = MultiMonitor(
+            pids=args.pids,
+            interval=args.interval,
+            backend=getattr(args, "backend", "auto"),
+            max_workers=getattr(args, "workers", 0) or None,
+            overrun=getattr(args, "overrun", "skip"),
+            sinks=sinks_for,
+            retain=not continuous,
+        )
+        series = monitor.get_process_usage_by_interval(
+            duration=args.duration, samples=args.samples, extended=args.extended
+        )
+    finally:
+        for sink in sinks:
+            sink.close()
+
+    for pid in series:
+        if pid in tails:
+            data, times = tails[pid].samples, tails[pid].times
+        else:
+            data, times = series[pid], monitor.times_for(pid)
+        if not data:
+            continue
         if not args.extended:
-            basic_tuples: List[Tuple[CpuUsage, MemoryUsage]] = data  # type: ignore[assignment]
-            for cpu_usage, memory_usage in basic_tuples:
-                logger.debug(f"CPU:{cpu_usage.model_dump_json}")
-                logger.debug(f"Memory:{memory_usage.model_dump_json}")
-
-            # we use actual sampled times captured by Monitor
-            times = monitor.sample_times
-
-            cpu_path = None
-            mem_path = None
-            if args.save_plots:
-                p = Path(args.save_plots)
-                p.mkdir(parents=True, exist_ok=True)
-                ext = getattr(args, "img_format", "png")
-                cpu_path = str(p / f"cpu_pid{args.pid}.{ext}")
-                mem_path = str(p / f"mem_pid{args.pid}.{ext}")
-
-            plot_cpu_usage(
-                basic_tuples,
-                times,
-                show=not args.no_show,
-                save_path=cpu_path,
-                dpi=args.dpi,
-                transparent=getattr(args, "transparent", False),
-                theme=getattr(args, "theme", "light"),
-            )
-            plot_memory_usage(
-                basic_tuples,
-                times,
-                show=not args.no_show,
-                save_path=mem_path,
-                dpi=args.dpi,
-                transparent=getattr(args, "transparent", False),
-                theme=getattr(args, "theme", "light"),
-            )
+            _plot_basic(args, data, times, f"pid{pid}")
         else:
-            # extended mode: produce richer plots
-            out_dir = None
-            if args.save_plots:
-                p = Path(args.save_plots)
-                p.mkdir(parents=True, exist_ok=True)
-                out_dir = str(p)
-
-            samples_ext = cast(List[ProcessSample], data)
-            times = monitor.sample_times
-            plot_from_extended(
-                samples_ext,
-                times,
-                out_dir=out_dir,
-                show=not args.no_show,
-                dpi=args.dpi,
-                theme=getattr(args, "theme", "light"),
-                ext=getattr(args, "img_format", "png"),
-            )
-    except psutil.NoSuchProcess:
-        logger.error(f"process PID not found (pid={args.pid})")
-    except ValueError as e:
+            _plot_extended(args, data, times, subdir=f"pid{pid}")
+
+
+def _run_tree(args) -> None:
+    # the tree total streams to --out itself, every process in the tree next to it
+    continuous = not args.duration and not args.samples
+    sinks: List[SampleSink] = []
+    sinks_for, _ = _pid_sinks(args, False, sinks)
+    total_sinks: List[SampleSink] = []
+    if args.out:
+        total_sinks.append(open_file_sink(args.out, args.extended))
+    tail = None
+    if continuous:
+        tail = TailSink(getattr(args, "tail", DEFAULT_TAIL))
+        total_sinks.append(tail)
+    sinks.extend(total_sinks)
+
+    try:
+        monitor = TreeMonitor(
+            root_pid=args.pid,
+            interval=args.interval,
+            backend=getattr(args, "backend", "auto"),
+            max_workers=getattr(args, "workers", 0) or None,
+            overrun=getattr(args, "overrun", "skip"),
+            sinks=sinks_for,
+            total_sinks=total_sinks,
+            retain=not continuous,
+        )
+        monitor.get_process_usage_by_interval(
+            duration=args.duration, samples=args.samples, extended=args.extended
+        )
+    finally:
+        for sink in sinks:
+            sink.close()
+
+    data, times = monitor.totals, monitor.totals.times
+    if tail is not None:
+        data, times = tail.samples, tail.times
+    if not data:
+        return
+    if not args.extended:
+        _plot_basic(args, data, times, f"tree{args.pid}")
+    else:
+        _plot_extended(args, data, times, subdir=f"tree{args.pid}")
+
+
+def main():
+    logger.remove()
+    logger.add(sys.stdout, level="INFO")
+
+    args = get_params()
+
+    try:
+        if getattr(args, "high_freq", False):
+            _run_high_freq(args)
+        elif getattr(args, "live", False):
+            _run_live(args)
+        elif getattr(args, "tui", False):
+            _run_tui(args)
+        elif getattr(args, "triggers", None):
+            _run_triggered(args)
+        elif getattr(args, "tree", False):
+            _run_tree(args)
+        elif len(getattr(args, "pids", [])) > 1:
+            _run_multi(args)
+        else:
+            _run_single(args)
+    except psutil.NoSuchProcess as e:
+        logger.error(f"process PID not found (pid={e.pid})")
+    except (ValueError, ImportError) as e:
         logger.error(f"There was an issue during execution: {e}")
 
 
@@ -0,0 +1,307 @@
+"""
+Benchmarks for the sampling hot path.
+
+    python -m procsight.bench [--pid PID] [--out results.json] [--quick]
+
+Measures, against a synthetic workload (or any ``--pid``):
+
+- ``probes``: cost of every metric group on each backend
+- ``ticks``: cost of one full basic / extended tick per backend
+- ``timing``: timestamp spacing and lateness of ``Monitor`` at several intervals
+- ``memory``: bytes per stored sample (``SampleStore`` vs pydantic models)
+
+Results are written as JSON so runs of different versions can be diffed.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from time import perf_counter_ns, sleep
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import psutil
+from loguru import logger
+
+from procsight.core.highfreq import HighFrequencyCapture
+from procsight.core.monitor import Monitor
+from procsight.core.procfs import ProcfsCollector, procfs_available
+from procsight.core.rows import sample_from_row
+from procsight.core.sample_collector import SampleCollector
+from procsight.core.store import SampleStore
+
+INTERVALS = (0.1, 0.02, 0.005)
+HIGH_FREQ_INTERVAL = 0.002
+
+# CPU, memory and file I/O in one process, like scripts/stress.sh
+_WORKLOAD = """
+import hashlib, os, sys, tempfile, time
+buf = bytearray(int(sys.argv[1]) * 1024 * 1024)
+fd, path = tempfile.mkstemp(prefix="procsight_bench_")
+try:
+    while True:
+        hashlib.sha256(buf[: 4 * 1024 * 1024]).digest()
+        os.pwrite(fd, b"\\0" * 65536, 0)
+        time.sleep(0.005)
+finally:
+    os.close(fd)
+    os.remove(path)
+"""
+
+
+def start_workload(mem_mb: int = 64) -> subprocess.Popen:
+    """Start the synthetic workload; the caller terminates it."""
+    proc = subprocess.Popen([sys.executable, "-c", _WORKLOAD, str(mem_mb)])
+    sleep(0.3)  # let it allocate its buffer
+    return proc
+
+
+def _time_ns(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Median/p95/mean cost of ``fn`` in microseconds."""
+    fn()  # warm up caches and lazily opened files
+    samples: List[int] = []
+    for _ in range(repeat):
+        start = perf_counter_ns()
+        fn()
+        samples.append(perf_counter_ns() - start)
+    samples.sort()
+    return {
+        "median_us": samples[len(samples) // 2] / 1000,
+        "p95_us": samples[min(len(samples) - 1, int(len(samples) * 0.95))] / 1000,
+        "mean_us": statistics.fmean(samples) / 1000,
+    }
+
+
+def _safe(fn: Callable[[], Any]) -> Callable[[], Any]:
+    def call():
+        try:
+            return fn()
+        except (psutil.AccessDenied, OSError):
+            return None
+
+    return call
+
+
+def bench_probes(pid: int, repeat: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    proc = psutil.Process(pid)
+    groups: Dict[str, Dict[str, Callable[[], Any]]] = {
+        "psutil": {
+            "cpu_percent": lambda: proc.cpu_percent(interval=None),
+            "cpu_times": proc.cpu_times,
+            "memory_info": proc.memory_info,
+            "memory_full_info": _safe(proc.memory_full_info),
+            "io_counters": _safe(proc.io_counters),
+            "num_ctx_switches": proc.num_ctx_switches,
+            "open_files": _safe(proc.open_files),
+            "num_fds": _safe(proc.num_fds),
+            "num_threads": proc.num_threads,
+            "status": proc.status,
+            "cpu_affinity": _safe(proc.cpu_affinity),
+        }
+    }
+    collectors = []
+    if procfs_available():
+        c = ProcfsCollector(pid, pss=True)
+        collectors.append(c)
+        groups["procfs"] = {
+            name: (lambda name=name: c._read(name)) for name in sorted(c._fds)
+        }
+        groups["procfs"]["fd_dir"] = c._descriptors
+    try:
+        return {
+            backend: {name: _time_ns(fn, repeat) for name, fn in probes.items()}
+            for backend, probes in groups.items()
+        }
+    finally:
+        for c in collectors:
+            c.close()
+
+
+def _collectors(pid: int) -> Dict[str, Any]:
+    found: Dict[str, Any] = {"psutil": SampleCollector(psutil.Process(pid))}
+    if procfs_available():
+        found["procfs"] = ProcfsCollector(pid)
+    return found
+
+
+def bench_ticks(pid: int, repeat: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    results = {}
+    for backend, c in _collectors(pid).items():
+        c.prime()
+        results[backend] = {
+            "fast": _time_ns(c.read_fast, repeat),
+            "basic_row": _time_ns(c.read_basic_row, repeat),
+            "basic_models": _time_ns(c.basic, repeat),
+            "extended_row": _time_ns(lambda: c.read_row(1), repeat),
+            "extended_models": _time_ns(lambda: c.sample(1), repeat),
+        }
+        c.close()
+    return results
+
+
+def _spacing(times: Sequence[float], lateness: Sequence[float], interval: float):
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    lateness = sorted(lateness)
+    return {
+        "interval_s": interval,
+        "samples": len(times),
+        "achieved_s": statistics.fmean(gaps) if gaps else 0.0,
+        "jitter_s": statistics.pstdev(gaps) if gaps else 0.0,
+        "lateness_p50_s": lateness[len(lateness) // 2] if lateness else 0.0,
+        "lateness_p99_s": lateness[int(len(lateness) * 0.99)] if lateness else 0.0,
+        "lateness_max_s": lateness[-1] if lateness else 0.0,
+    }
+
+
+def bench_timing(
+    pid: int, intervals: Sequence[float], samples: int
+) -> List[Dict[str, Any]]:
+    results = []
+    for extended in (False, True):
+        for interval in intervals:
+            m = Monitor(pid, interval)
+            store = m.get_process_usage_by_interval(0, samples, extended=extended)
+            entry = _spacing(store.times, store.column("lateness_s"), interval)
+            entry["mode"] = "extended" if extended else "basic"
+            entry["missed"] = int(store.column("missed").sum())
+            results.append(entry)
+
+    capture = HighFrequencyCapture(pid, HIGH_FREQ_INTERVAL)
+    store = capture.run(samples=samples * 5)
+    capture.close()
+    entry = _spacing(store.times, store.column("lateness_s"), HIGH_FREQ_INTERVAL)
+    entry["mode"] = "high-freq"
+    entry["missed"] = capture.report.missed if capture.report else 0
+    results.append(entry)
+    return results
+
+
+def bench_memory(pid: int, samples: int) -> Dict[str, float]:
+    collector = SampleCollector(psutil.Process(pid))
+    collector.prime()
+    row = collector.read_row(1)
+    row.update(time_s=0.0, lateness_s=0.0, missed=0, interval_s=1.0)
+
+    tracemalloc.start()
+    store = SampleStore(extended=True)
+    for i in range(samples):
+        store.append({**row, "sample": i})
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+
+    tracemalloc.start()
+    models = [sample_from_row({**row, "sample": i}) for i in range(samples)]
+    model_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del models
+
+    return {
+        "samples": samples,
+        "store_bytes_per_sample": store_bytes / samples,
+        "models_bytes_per_sample": model_bytes / samples,
+    }
+
+
+def _environment() -> Dict[str, Any]:
+    try:
+        from importlib.metadata import version
+
+        procsight_version = version("procsight")
+    except Exception:
+        procsight_version = "unknown"
+    return {
+        "procsight": procsight_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "psutil": psutil.__version__,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def run_benchmarks(
+    pid: Optional[int] = None,
+    repeat: int = 2000,
+    timing_samples: int = 100,
+    memory_samples: int = 20_000,
+    intervals: Sequence[float] = INTERVALS,
+) -> Dict[str, Any]:
+    """Run every benchmark; starts (and stops) the synthetic workload if no pid is given."""
+    workload = None
+    if pid is None:
+        workload = start_workload()
+        pid = workload.pid
+    try:
+        return {
+            "environment": _environment(),
+            "target": {"pid": pid, "synthetic": workload is not None},
+            "probes": bench_probes(pid, repeat),
+            "ticks": bench_ticks(pid, repeat),
+            "timing": bench_timing(pid, intervals, timing_samples),
+            "memory": bench_memory(pid, memory_samples),
+        }
+    finally:
+        if workload is not None:
+            workload.terminate()
+            workload.wait()
+
+
+def _print_summary(results: Dict[str, Any]) -> None:
+    for backend, ticks in results["ticks"].items():
+        for name, t in ticks.items():
+            print(f"tick  {backend:<7} {name:<16} {t['median_us']:>9.1f} us")
+    for t in results["timing"]:
+        print(
+            f"timing {t['mode']:<9} {t['interval_s'] * 1000:>6.1f} ms -> "
+            f"{t['achieved_s'] * 1000:.3f} ms, jitter {t['jitter_s'] * 1000:.3f} ms, "
+            f"p99 late {t['lateness_p99_s'] * 1000:.3f} ms, missed {t['missed']}"
+        )
+    m = results["memory"]
+    print(
+        f"memory store {m['store_bytes_per_sample']:.0f} B/sample, "
+        f"models {m['models_bytes_per_sample']:.0f} B/sample"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = ArgumentParser(description="Benchmark ProcSight's collectors and timing.")
+    parser.add_argument(
+        "--pid",
+        type=int,
+        help="Benchmark against this process instead of a synthetic workload",
+    )
+    parser.add_argument(
+        "--out", help="Write JSON results to this file (default: stdout)"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Fewer repetitions, for a smoke run"
+    )
+    args = parser.parse_args(argv)
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    if args.quick:
+        results = run_benchmarks(
+            args.pid, repeat=200, timing_samples=30, memory_samples=2000
+        )
+    else:
+        results = run_benchmarks(args.pid)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        _print_summary(results)
+        print(f"Saved benchmark results at: {args.out}")
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,21 @@ from argparse import ArgumentParser, Namespace
 import psutil
 from loguru import logger
 
+from procsight.core.leak import DEFAULT_WINDOW_SEC as DEFAULT_LEAK_WINDOW_SEC
+from procsight.core.rows import (
+    BASIC_COLUMNS,
+    COUNTER_COLUMNS,
+    EXTENDED_COLUMNS,
+    NON_METRIC_COLUMNS,
+)
+from procsight.core.scheduler import OVERRUN_POLICIES
+from procsight.core.trigger import (
+    DEFAULT_CAPTURE_INTERVAL,
+    DEFAULT_PRE_SEC,
+    DEFAULT_WINDOW_SEC,
+    parse_condition,
+)
+
 
 def get_params() -> Namespace:
     parser = ArgumentParser(
@@ -11,9 +26,10 @@ def get_params() -> Namespace:
 
     parser.add_argument(
         "--pid",
-        action="store",
+        action="append",
+        dest="pids",
         type=int,
-        help="PID of the process to monitor",
+        help="PID of the process to monitor. Repeat to monitor several processes on one shared tick",
     )
     parser.add_argument(
         "--name",
@@ -28,6 +44,15 @@ def get_params() -> Namespace:
         default=1.0,
         help="Sampling interval in seconds (default: 1.0)",
     )
+    parser.add_argument(
+        "--max-interval",
+        action="store",
+        type=float,
+        default=None,
+        help="Adaptive sampling: sample every --interval while CPU, RSS or I/O change and "
+        "back off (doubling) up to this many seconds while they are flat. "
+        "Each row records its interval_s",
+    )
     parser.add_argument(
         "--duration",
         action="store",
@@ -46,7 +71,14 @@ def get_params() -> Namespace:
         "--out",
         action="store",
         type=str,
-        help="Path to CSV output file (optional)",
+        help="Path to output file (optional). Samples are written incrementally; .ndjson/.jsonl writes JSON lines, .parquet/.feather typed columns (needs pyarrow), anything else CSV",
+    )
+    parser.add_argument(
+        "--tail",
+        action="store",
+        type=int,
+        default=10_000,
+        help="Continuous mode keeps only the last N samples in memory for plotting (default: 10000)",
     )
     parser.add_argument(
         "--save-plots",
@@ -76,27 +108,269 @@ def get_params() -> Namespace:
     parser.add_argument(
         "--no-show",
         action="store_true",
-        help="Do not display plots interactively (useful in headless runs or CI)",
+        help="Do not display plots interactively (useful in headless runs or CI); "
+        "without --save-plots no plots are rendered",
     )
     parser.add_argument(
         "--extended",
         action="store_true",
         help="Collect extended metrics (IO, ctx switches, fds, threads, meta)",
     )
+    parser.add_argument(
+        "--backend",
+        choices=["auto", "psutil", "procfs"],
+        default="auto",
+        help="Collector backend. auto uses the native /proc reader on Linux and psutil elsewhere (default: auto)",
+    )
+    parser.add_argument(
+        "--overrun",
+        choices=list(OVERRUN_POLICIES),
+        default="skip",
+        help="What to do when a sample takes longer than --interval: skip the missed ticks, "
+        "catchup by sampling back to back, or stretch the schedule (default: skip)",
+    )
+    parser.add_argument(
+        "--high-freq",
+        action="store_true",
+        help="High-frequency capture of CPU and RSS only, for intervals down to ~1 ms "
+        "(needs --duration or --samples; reports the achieved interval and jitter)",
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Show CPU/RSS (and the extended panels) updating while sampling; "
+        "close the window or press Ctrl+C to stop",
+    )
+    parser.add_argument(
+        "--live-window",
+        action="store",
+        type=float,
+        default=300.0,
+        help="Seconds of history shown by --live and --tui (default: 300)",
+    )
+    parser.add_argument(
+        "--tui",
+        action="store_true",
+        help="Terminal live view (curses) for SSH sessions: current/min/max/p95 and a "
+        "sparkline per metric while sampling; press q or Ctrl+C to stop",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store",
+        type=float,
+        default=None,
+        help="Seconds between --live/--tui redraws, independent of --interval "
+        "(default: 0.5 for --live, 1 for --tui)",
+    )
+    parser.add_argument(
+        "--threshold",
+        action="append",
+        dest="threshold_specs",
+        default=[],
+        metavar="METRIC=VALUE",
+        help="Report the time spent above VALUE for a metric column, e.g. cpu_percent=80. "
+        "Repeatable; shown in the summary (above_s row, log, <out>_stats.json)",
+    )
+    parser.add_argument(
+        "--leak-window",
+        action="store",
+        type=float,
+        default=DEFAULT_LEAK_WINDOW_SEC,
+        help="Seconds of history the leak check fits its RSS/PSS/data trend over "
+        f"(default: {DEFAULT_LEAK_WINDOW_SEC:g})",
+    )
+    parser.add_argument(
+        "--leak-limit",
+        action="store",
+        type=float,
+        default=None,
+        metavar="MB",
+        help="Memory limit the leak check projects the time to. Default: the target's "
+        "cgroup memory limit, if any",
+    )
+    parser.add_argument(
+        "--trigger",
+        action="append",
+        dest="trigger_specs",
+        default=[],
+        metavar="SPEC",
+        help="Triggered capture: sample cheaply every --interval and write nothing until SPEC "
+        "fires, e.g. rss_mb>2048, cpu_percent>80x3 (3 ticks in a row) or fds+10x12 (grew by "
+        "10 over 12 ticks). Each trigger writes an extended capture to <out>_trigger<N>. Repeatable",
+    )
+    parser.add_argument(
+        "--capture-interval",
+        action="store",
+        type=float,
+        default=DEFAULT_CAPTURE_INTERVAL,
+        help=f"Sampling interval during a triggered capture (default: {DEFAULT_CAPTURE_INTERVAL})",
+    )
+    parser.add_argument(
+        "--capture-window",
+        action="store",
+        type=float,
+        default=DEFAULT_WINDOW_SEC,
+        help=f"Seconds captured after a trigger fires (default: {DEFAULT_WINDOW_SEC:g})",
+    )
+    parser.add_argument(
+        "--pre-trigger",
+        action="store",
+        type=float,
+        default=DEFAULT_PRE_SEC,
+        help="Seconds of samples from before the trigger kept in memory and written with "
+        f"each capture (default: {DEFAULT_PRE_SEC:g})",
+    )
+    parser.add_argument(
+        "--self-metrics",
+        action="store_true",
+        help="Record ProcSight's own cost per tick (tick latency, CPU, RSS, per-probe latency); "
+        "logs a summary and writes <out>_self.csv next to --out",
+    )
+    parser.add_argument(
+        "--threads",
+        action="store",
+        type=int,
+        default=0,
+        metavar="K",
+        help="With --extended, also record per-thread CPU%% of the K busiest threads each "
+        "tick, warn about threads pinning a core and write <out>_threads.csv and a "
+        "stacked threads plot (default: 0, off)",
+    )
+    parser.add_argument(
+        "--max-points",
+        action="store",
+        type=int,
+        default=None,
+        help="Max points drawn per plotted line; longer runs are downsampled (LTTB with a "
+        "min/max band so spikes stay visible). Default: the figure's pixel width, 0 draws every sample",
+    )
     parser.add_argument(
         "--theme",
         choices=["light", "dark"],
         default="light",
         help="Plot theme (light or dark). Default: light",
     )
+    parser.add_argument(
+        "--tree",
+        action="store_true",
+        help="Also monitor all descendants of --pid and record a per-tick tree total",
+    )
+    parser.add_argument(
+        "--workers",
+        action="store",
+        type=int,
+        default=0,
+        help="Probe threads when monitoring several PIDs. 0 picks min(8, number of PIDs)",
+    )
     args = parser.parse_args()
 
+    args.pids = list(dict.fromkeys(args.pids or []))
+    args.pid = args.pids[0] if args.pids else None
+
     if args.pid is None and not args.name:
         parser.error("You must provide either --pid or --name.")
-    if args.pid is not None and args.pid < 0:
+    if any(pid < 0 for pid in args.pids):
         parser.error("--pid must be a positive integer.")
+    if args.tree and len(args.pids) > 1:
+        parser.error("--tree takes a single --pid (the root of the tree).")
+    if args.high_freq and (args.extended or args.tree or len(args.pids) > 1):
+        parser.error("--high-freq samples a single --pid in basic mode only.")
+    if args.high_freq and not (args.duration or args.samples):
+        parser.error("--high-freq needs --duration or --samples.")
+    if args.self_metrics and (
+        args.live
+        or args.tui
+        or args.high_freq
+        or args.tree
+        or len(args.pids) > 1
+        or args.trigger_specs
+    ):
+        parser.error(
+            "--self-metrics is only supported for a single --pid without --live, "
+            "--tui or --trigger."
+        )
+    if args.live and (
+        args.no_show or args.high_freq or args.tree or len(args.pids) > 1
+    ):
+        parser.error(
+            "--live shows a single --pid and cannot be combined with --no-show."
+        )
+    if args.tui and (args.live or args.high_freq or args.tree or len(args.pids) > 1):
+        parser.error("--tui shows a single --pid and cannot be combined with --live.")
+    if args.live_window <= 0 or (args.refresh is not None and args.refresh <= 0):
+        parser.error("--live-window and --refresh must be > 0.")
+    args.thresholds = {}
+    metrics = set(BASIC_COLUMNS + EXTENDED_COLUMNS) - NON_METRIC_COLUMNS
+    for spec in args.threshold_specs:
+        name, _, value = spec.partition("=")
+        try:
+            args.thresholds[name.strip()] = float(value)
+        except ValueError:
+            parser.error(f"--threshold expects METRIC=VALUE, got {spec!r}.")
+        if name.strip() not in metrics - COUNTER_COLUMNS:
+            parser.error(f"--threshold: unknown metric {name.strip()!r}.")
+    args.triggers = []
+    for spec in args.trigger_specs:
+        try:
+            condition = parse_condition(spec)
+        except ValueError as e:
+            parser.error(f"--trigger: {e}")
+        if condition.column not in metrics:
+            parser.error(f"--trigger: unknown metric {condition.column!r}.")
+        args.triggers.append(condition)
+    if args.triggers:
+        if not args.out:
+            parser.error("--trigger needs --out (captures are written next to it).")
+        if (
+            args.live
+            or args.tui
+            or args.high_freq
+            or args.tree
+            or len(args.pids) > 1
+            or args.max_interval is not None
+        ):
+            parser.error(
+                "--trigger samples a single --pid and cannot be combined with "
+                "--live, --tui, --high-freq or --max-interval."
+            )
+        if args.thresholds:
+            parser.error("--threshold is not reported for --trigger captures.")
+    if args.capture_interval <= 0 or args.capture_window <= 0 or args.pre_trigger < 0:
+        parser.error(
+            "--capture-interval and --capture-window must be > 0, --pre-trigger >= 0."
+        )
+    if args.leak_window <= 0 or (args.leak_limit is not None and args.leak_limit <= 0):
+        parser.error("--leak-window and --leak-limit must be > 0.")
+    if args.threads < 0:
+        parser.error("--threads must be >= 0.")
+    if args.threads:
+        if not args.extended:
+            parser.error("--threads needs --extended.")
+        if (
+            args.live
+            or args.tui
+            or args.high_freq
+            or args.tree
+            or len(args.pids) > 1
+            or args.triggers
+        ):
+            parser.error(
+                "--threads samples a single --pid and cannot be combined with "
+                "--live, --tui, --high-freq or --trigger."
+            )
+    if args.max_points is not None and args.max_points < 0:
+        parser.error("--max-points must be >= 0.")
+    if args.tail <= 0:
+        parser.error("--tail must be > 0.")
+    if args.workers < 0:
+        parser.error("--workers must be >= 0.")
     if args.interval <= 0:
         parser.error("--interval must be > 0.")
+    if args.max_interval is not None:
+        if args.max_interval < args.interval:
+            parser.error("--max-interval must be >= --interval.")
+        if args.high_freq or args.tree or len(args.pids) > 1:
+            parser.error("--max-interval is only supported for a single --pid.")
     if args.duration < 0 or args.samples < 0:
         parser.error("--duration and --samples must be >= 0.")
     if args.duration and args.samples:
@@ -119,6 +393,7 @@ def get_params() -> Namespace:
             parser.error(f"No running process found matching name: {args.name}")
         elif len(matches) == 1:
             args.pid = int(matches[0][0])
+            args.pids = [args.pid]
         else:
             print("Multiple processes matched:")
             for idx, (pid, pname, cmd) in enumerate(matches, start=1):
@@ -129,23 +404,44 @@ def get_params() -> Namespace:
                 if choice < 1 or choice > len(matches):
                     raise ValueError
                 args.pid = int(matches[choice - 1][0])
+                args.pids = [args.pid]
             except Exception:
                 parser.error("Invalid selection.")
 
     logger.info("Arguments Parsed:")
-    logger.info(f"pid: {args.pid}")
+    logger.info(f"pid: {args.pid if len(args.pids) <= 1 else args.pids}")
     if getattr(args, "name", None):
         logger.info(f"name: {args.name}")
     logger.info(f"interval: {args.interval}")
+    if getattr(args, "max_interval", None) is not None:
+        logger.info(f"max-interval: {args.max_interval}")
     logger.info(f"duration: {args.duration}")
     logger.info(f"samples: {args.samples}")
     logger.info(f"out: {args.out}")
+    logger.info(f"tail: {args.tail}")
     logger.info(f"save-plots: {getattr(args, 'save_plots', None)}")
     logger.info(f"img_format: {getattr(args, 'img_format', 'png')}")
     logger.info(f"dpi: {getattr(args, 'dpi', None)}")
     logger.info(f"transparent: {getattr(args, 'transparent', False)}")
     logger.info(f"no-show: {getattr(args, 'no_show', False)}")
     logger.info(f"extended: {getattr(args, 'extended', False)}")
+    logger.info(f"tree: {getattr(args, 'tree', False)}")
+    logger.info(f"max-points: {getattr(args, 'max_points', None)}")
     logger.info(f"theme: {getattr(args, 'theme', 'light')}")
+    logger.info(f"backend: {getattr(args, 'backend', 'auto')}")
+    logger.info(f"overrun: {getattr(args, 'overrun', 'skip')}")
+    logger.info(f"high-freq: {getattr(args, 'high_freq', False)}")
+    logger.info(f"live: {getattr(args, 'live', False)}")
+    logger.info(f"tui: {getattr(args, 'tui', False)}")
+    logger.info(f"self-metrics: {getattr(args, 'self_metrics', False)}")
+    if getattr(args, "threads", 0):
+        logger.info(f"threads: top {args.threads}")
+    logger.info(f"thresholds: {getattr(args, 'thresholds', {})}")
+    if getattr(args, "triggers", None):
+        logger.info(f"triggers: {[c.spec for c in args.triggers]}")
+        logger.info(
+            f"capture: every {args.capture_interval}s for {args.capture_window}s, "
+            f"{args.pre_trigger}s before the trigger"
+        )
 
     return args
@@ -0,0 +1,50 @@
+"""
+Activity detection for adaptive sampling.
+
+``ActivityDetector`` compares each row with the previous one and calls the tick
+active when CPU, RSS or I/O moved by at least its threshold. ``Monitor`` feeds
+the verdict to an ``AdaptiveScheduler``, which samples at the minimum interval
+while the process is changing and backs off while it is flat.
+"""
+
+from typing import Any, Dict, Mapping, Optional
+
+# a tick is active when a column moved by at least this much since the last one
+ACTIVITY_THRESHOLDS: Dict[str, float] = {
+    "cpu_percent": 5.0,  # percentage points
+    "rss_mb": 1.0,
+    # cumulative counters (extended rows only): bytes moved since the last tick
+    "read_bytes": 64 * 1024,
+    "write_bytes": 64 * 1024,
+}
+
+
+class ActivityDetector:
+    """
+    Decides per row whether the process is changing.
+
+    The first row is always active, so a run starts at full rate. Columns a row
+    does not carry (the I/O counters in basic mode) or that are missing are
+    ignored.
+    """
+
+    def __init__(self, thresholds: Optional[Mapping[str, float]] = None):
+        self.thresholds = dict(
+            ACTIVITY_THRESHOLDS if thresholds is None else thresholds
+        )
+        self._previous: Optional[Mapping[str, Any]] = None
+
+    def reset(self) -> None:
+        self._previous = None
+
+    def update(self, row: Mapping[str, Any]) -> bool:
+        previous, self._previous = self._previous, row
+        if previous is None:
+            return True
+        for name, threshold in self.thresholds.items():
+            value, before = row.get(name), previous.get(name)
+            if value is None or before is None:
+                continue
+            if abs(value - before) >= threshold:
+                return True
+        return False
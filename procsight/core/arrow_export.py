@@ -0,0 +1,256 @@
+"""
+Parquet and Arrow IPC (Feather v2) output.
+
+Columns keep their real types: integers stay int64, ``status`` is
+dictionary-encoded and ``cpu_affinity`` is a ``list<int32>``. There are no
+summary rows. The ``RunStats`` summary that ends a CSV file (count, mean,
+min, max, p50/p95/p99, ``above_s``) is stored as JSON in the metadata under
+``procsight.summary``, and the leak check's memory trends under
+``procsight.leak``.
+
+Needs the optional ``pyarrow`` dependency (``pip install "procsight[arrow]"``).
+"""
+
+import json
+from pathlib import Path
+from time import monotonic
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+from loguru import logger
+
+from procsight.core.file_export import output_columns, run_stats
+from procsight.core.rows import BASIC_COLUMNS, EXTENDED_COLUMNS
+from procsight.core.sinks import to_row
+from procsight.core.stats import RunStats
+from procsight.core.store import SampleStore, as_store, column_kind
+
+ARROW_FORMATS = {
+    ".parquet": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+}
+SUMMARY_KEY = b"procsight.summary"
+LEAK_KEY = b"procsight.leak"
+MODE_KEY = b"procsight.mode"
+COMPRESSION = "zstd"
+
+# rows per Parquet row group / IPC record batch when streaming
+ROW_GROUP_SIZE = 65_536
+# also write out buffered rows at least this often (seconds)
+ROW_GROUP_SEC = 60.0
+
+
+def arrow_format(path: Path) -> Optional[str]:
+    """``parquet``/``feather`` for an Arrow output path, else None."""
+    return ARROW_FORMATS.get(Path(path).suffix.lower())
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            'Parquet/Feather output needs pyarrow: pip install "procsight[arrow]"'
+        ) from e
+    return pyarrow
+
+
+def arrow_schema(columns: Sequence[str], metadata: Optional[Dict] = None):
+    pa = _pyarrow()
+    types = {
+        "int": pa.int64(),
+        "optional_int": pa.int64(),
+        "float": pa.float64(),
+    }
+    fields = []
+    for name in columns:
+        if name == "status":
+            fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+        elif name == "cpu_affinity":
+            fields.append(pa.field(name, pa.list_(pa.int32())))
+        else:
+            fields.append(pa.field(name, types[column_kind(name)]))
+    return pa.schema(fields, metadata=metadata)
+
+
+def store_to_table(store: SampleStore, columns: Sequence[str], metadata=None):
+    """Arrow table of ``columns`` (numeric columns are read without copying)."""
+    import numpy as np
+
+    pa = _pyarrow()
+    schema = arrow_schema(columns, metadata)
+    arrays = []
+    for field in schema:
+        name = field.name
+        kind = column_kind(name)
+        if kind == "category":
+            codes, categories = store.categorical(name)
+            missing = codes < 0
+            if name == "status":
+                arrays.append(
+                    pa.DictionaryArray.from_arrays(
+                        pa.array(codes, mask=missing),
+                        pa.array(categories, type=pa.string()),
+                    )
+                )
+            else:
+                lists = pa.array(
+                    [list(c) for c in categories] + [None], type=field.type
+                )
+                arrays.append(lists.take(np.where(missing, len(categories), codes)))
+        elif kind == "optional_int":
+            values = store.column(name)
+            missing = np.isnan(values)
+            arrays.append(
+                pa.array(np.where(missing, 0, values).astype(np.int64), mask=missing)
+            )
+        elif kind == "float":
+            values = store.column(name)
+            arrays.append(pa.array(values, mask=np.isnan(values)))
+        else:
+            arrays.append(pa.array(store.column(name)))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def summary_metadata(stats: RunStats, extended: bool) -> Dict[bytes, bytes]:
+    metadata = {
+        SUMMARY_KEY: json.dumps(stats.summary()).encode(),
+        MODE_KEY: b"extended" if extended else b"basic",
+    }
+    if stats.leak is not None:
+        trends = {name: t._asdict() for name, t in stats.leak.trends().items()}
+        metadata[LEAK_KEY] = json.dumps(trends).encode()
+    return metadata
+
+
+def _read_metadata(path: str) -> Mapping[bytes, bytes]:
+    pa = _pyarrow()
+    if arrow_format(Path(path)) == "parquet":
+        import pyarrow.parquet as pq
+
+        # file-level key/value metadata, which also holds keys added on close
+        return pq.read_metadata(path).metadata or {}
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema.metadata or {}
+
+
+def read_summary(path: str) -> Dict[str, Dict[str, Any]]:
+    """Summary statistics stored in a Parquet/Feather file written by ProcSight."""
+    return json.loads(_read_metadata(path).get(SUMMARY_KEY, b"{}"))
+
+
+def read_leak(path: str) -> Dict[str, Dict[str, Any]]:
+    """Memory trends (see ``procsight.core.leak.Trend``) stored in a Parquet/Feather file."""
+    return json.loads(_read_metadata(path).get(LEAK_KEY, b"{}"))
+
+
+def export_to_arrow(args, data, times: Optional[Sequence[float]] = None) -> None:
+    """
+    Write collected samples to ``args.out`` as Parquet or Feather.
+
+    Accepts the same ``data``/``times`` as ``export_to_csv``.
+    """
+    columns = output_columns(args.extended, data, times)
+    data = as_store(data, args.extended, times)
+    stats = run_stats(args, columns)
+    stats.extend(data.rows())
+    metadata = summary_metadata(stats, args.extended)
+    table = store_to_table(data, columns, metadata)
+
+    fmt = arrow_format(Path(args.out))
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, args.out, compression=COMPRESSION)
+    else:
+        import pyarrow.feather as feather
+
+        feather.write_feather(table, args.out, compression=COMPRESSION)
+    logger.info(f"Saved {fmt.capitalize()} at: {args.out}")
+
+
+class ArrowSink:
+    """
+    Incremental Parquet/Feather writer for streaming runs.
+
+    Rows are buffered in a ``SampleStore`` and written as one Parquet row group
+    (or IPC record batch) every ``batch_size`` rows or ``flush_sec`` seconds.
+    For Parquet the summary and memory trends of a ``RunStats`` are added to
+    the footer on ``close()``. As with ``CsvSink``, pass ``stats`` to use one
+    fed elsewhere (e.g. by a ``StatsSink``). An Arrow IPC file fixes its
+    metadata when it is opened, so streamed Feather files carry only the
+    ``procsight.mode`` key.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        extended: bool,
+        batch_size: int = ROW_GROUP_SIZE,
+        flush_sec: float = ROW_GROUP_SEC,
+        stats: Optional[RunStats] = None,
+        thresholds: Optional[Mapping[str, float]] = None,
+    ):
+        pa = _pyarrow()
+        self.path = path
+        self.extended = extended
+        self.format = arrow_format(Path(path))
+        self.batch_size = max(1, batch_size)
+        self.flush_sec = flush_sec
+        self.rows_written = 0
+        self.columns = list(EXTENDED_COLUMNS if extended else BASIC_COLUMNS)
+        self._own_stats = stats is None
+        self.stats = RunStats(self.columns, thresholds) if stats is None else stats
+        self._count = 0
+        self._buffer = SampleStore(extended, capacity=min(self.batch_size, 4096))
+        self._last_flush = monotonic()
+        self._closed = False
+
+        mode = {MODE_KEY: b"extended" if extended else b"basic"}
+        self._schema = arrow_schema(self.columns, mode)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(path, self._schema, compression=COMPRESSION)
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+            self._writer = pa.ipc.new_file(path, self._schema, options=options)
+
+    def write(self, elapsed: float, item: Any) -> None:
+        self._count += 1
+        row = to_row(item, self._count, elapsed)
+        if self._own_stats:
+            self.stats.add(row)
+        self._buffer.append(row)
+        if (
+            len(self._buffer) >= self.batch_size
+            or monotonic() - self._last_flush >= self.flush_sec
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._closed:
+            return
+        if len(self._buffer):
+            table = store_to_table(self._buffer, self.columns).replace_schema_metadata(
+                self._schema.metadata
+            )
+            self._writer.write_table(table)
+            self.rows_written += len(self._buffer)
+            self._buffer = SampleStore(self.extended, capacity=len(self._buffer))
+        self._last_flush = monotonic()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        if self.format == "parquet":
+            self._writer.add_key_value_metadata(
+                summary_metadata(self.stats, self.extended)
+            )
+        self._writer.close()
+        self._closed = True
+        logger.info(f"Saved {self.rows_written} samples at: {self.path}")
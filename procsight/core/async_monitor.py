@@ -0,0 +1,285 @@
+"""
+Asyncio-native sampling of many processes.
+
+``AsyncMonitor.stream()`` is an async generator of ``StreamSample``: one per
+target per tick. Ticks follow absolute deadlines on the loop's clock
+(``DeadlineScheduler.wait_async``). Blocking work (opening a collector,
+priming it, probing) runs on a bounded thread pool, so hundreds of targets
+can be watched from one event loop without stalling it.
+
+Backpressure: samples go through a queue of at most ``max_pending`` entries.
+When the consumer falls behind and the queue is full, the ticker waits. The
+ticks it could not make are then dropped by the ``overrun`` policy and counted
+in each row's ``missed``, instead of piling up in memory.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    AsyncIterator,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
+
+import psutil
+from loguru import logger
+
+from procsight.core.rates import RateTracker
+from procsight.core.rows import Row
+from procsight.core.sample_collector import Collector, make_collector
+from procsight.core.scheduler import DeadlineScheduler, log_schedule_summary
+
+# upper bound for the probe pool; probes are short and mostly wait on /proc reads
+MAX_WORKERS = 8
+# samples buffered between the ticker and a slow consumer
+MAX_PENDING = 1024
+
+
+class StreamSample(NamedTuple):
+    pid: int
+    elapsed: float  # seconds since the first tick, shared by all targets
+    row: Row  # flat row; ``rows.sample_from_row`` / ``basic_from_row`` give models
+
+
+_DONE = object()
+
+
+class AsyncMonitor:
+    """
+    Sample a changing set of processes from one event loop.
+
+    Targets can be added and removed while streaming (``add``/``remove``); new
+    ones join on the next tick. Targets that exit, or that can no longer be
+    read (``AccessDenied``), are dropped with a warning. ``stop()`` ends
+    the stream after the current tick. Cancelling the consuming task, or
+    closing the generator, cancels the ticker too.
+    """
+
+    def __init__(
+        self,
+        pids: Sequence[int] = (),
+        interval: float = 1.0,
+        backend: str = "auto",
+        max_workers: Optional[int] = None,
+        overrun: str = "skip",
+        max_pending: int = MAX_PENDING,
+        pss: bool = False,
+    ):
+        if max_pending <= 0:
+            raise ValueError("max_pending must be > 0.")
+        self.interval = interval
+        self.backend = backend
+        self.overrun = overrun
+        self.max_pending = max_pending
+        self.pss = pss
+        self.max_workers = max_workers or MAX_WORKERS
+        self._scheduler = DeadlineScheduler(interval, overrun)
+        self._collectors: Dict[int, Collector] = {}
+        self._pending: Set[int] = set(dict.fromkeys(pids))
+        self._stop = asyncio.Event()
+        self._probing = False
+        self._retired: List[Collector] = []
+        self._rates: Dict[int, RateTracker] = {}
+
+    @property
+    def pids(self) -> List[int]:
+        """PIDs currently being sampled or waiting to join."""
+        return list(self._collectors) + [
+            p for p in self._pending if p not in self._collectors
+        ]
+
+    def add(self, pid: int) -> None:
+        """Start sampling ``pid`` from the next tick."""
+        if pid not in self._collectors:
+            self._pending.add(pid)
+
+    def remove(self, pid: int) -> None:
+        """Stop sampling ``pid``."""
+        self._pending.discard(pid)
+        self._rates.pop(pid, None)
+        collector = self._collectors.pop(pid, None)
+        if collector is None:
+            return
+        if self._probing:
+            self._retired.append(collector)  # closed once its probe is back
+        else:
+            collector.close()
+
+    def stop(self) -> None:
+        """End a running ``stream()`` after the current tick."""
+        self._stop.set()
+
+    def close(self) -> None:
+        for pid in list(self._collectors):
+            self.remove(pid)
+
+    async def stream(
+        self, duration: float = 0, samples: int = 0, extended: bool = False
+    ) -> AsyncIterator[StreamSample]:
+        """
+        Yield a ``StreamSample`` per target per tick.
+
+        Modes match ``Monitor.get_process_usage_by_interval``: ``duration``
+        seconds, ``samples`` ticks, or neither to run until ``stop()`` or
+        cancellation. The stream also ends once no targets are left.
+        """
+        if duration and samples:
+            raise ValueError(
+                "Provide only one of duration or samples (or neither for continuous mode)."
+            )
+        loop = asyncio.get_running_loop()
+        self._stop.clear()
+        self._rates = {}
+        self._scheduler = DeadlineScheduler(
+            self.interval, self.overrun, clock=loop.time
+        )
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending)
+        pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="procsight-probe"
+        )
+        ticker = asyncio.create_task(
+            self.__run(loop, pool, queue, duration, samples, extended)
+        )
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                yield item
+            await ticker  # re-raises an error from the ticker
+        finally:
+            if not ticker.done():
+                ticker.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await ticker
+            pool.shutdown(wait=False, cancel_futures=True)
+            log_schedule_summary(self._scheduler)
+
+    async def __run(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        pool: ThreadPoolExecutor,
+        queue: asyncio.Queue,
+        duration: float,
+        samples: int,
+        extended: bool,
+    ) -> None:
+        scheduler = self._scheduler
+        base: Optional[float] = None
+        count = 0
+        try:
+            await self.__open_pending(loop, pool)
+            while not self._stop.is_set() and (self._collectors or self._pending):
+                if duration and scheduler.next_offset >= duration:
+                    break
+                if samples and count >= samples:
+                    break
+                tick = await scheduler.wait_async()
+                if duration and tick.offset >= duration:
+                    break
+                count += 1
+                now = loop.time()
+                if base is None:
+                    base = now
+                elapsed = now - base
+
+                targets = list(self._collectors.items())
+                self._probing = True
+                try:
+                    rows = await asyncio.gather(
+                        *(
+                            loop.run_in_executor(pool, _probe, c, extended, count)
+                            for _, c in targets
+                        )
+                    )
+                finally:
+                    self._probing = False
+                    while self._retired:
+                        self._retired.pop().close()
+                for (pid, _), row in zip(targets, rows):
+                    if pid not in self._collectors:
+                        continue  # removed while its probe was running
+                    if row is None:
+                        logger.warning(f"process exited, no longer sampled (pid={pid})")
+                        self.remove(pid)
+                        continue
+                    if isinstance(row, psutil.AccessDenied):
+                        logger.warning(f"access denied, no longer sampled (pid={pid})")
+                        self.remove(pid)
+                        continue
+                    row["sample"] = count
+                    row["time_s"] = elapsed
+                    row["lateness_s"] = tick.lateness
+                    row["missed"] = tick.missed
+                    row["interval_s"] = tick.interval
+                    if extended:
+                        self._rates.setdefault(pid, RateTracker()).update(row)
+                    # waits while the consumer is max_pending samples behind
+                    await queue.put(StreamSample(pid, elapsed, row))
+
+                # newcomers are primed now and first sampled on the next tick
+                await self.__open_pending(loop, pool)
+            if not (self._collectors or self._pending):
+                logger.warning("all monitored processes have exited")
+        except Exception:
+            # wake the consumer; it re-raises when it awaits this task
+            await queue.put(_DONE)
+            raise
+        await queue.put(_DONE)
+
+    async def __open_pending(
+        self, loop: asyncio.AbstractEventLoop, pool: ThreadPoolExecutor
+    ) -> None:
+        pending = [p for p in self._pending if p not in self._collectors]
+        self._pending.clear()
+        opened = await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, _open, pid, self.backend, self.pss)
+                for pid in pending
+            )
+        )
+        for pid, collector in zip(pending, opened):
+            if collector is None:
+                logger.warning(f"process exited before sampling started (pid={pid})")
+            elif isinstance(collector, psutil.AccessDenied):
+                logger.warning(f"access denied, not sampled (pid={pid})")
+            else:
+                self._collectors[pid] = collector
+
+
+# probes and opens report an exited target as None and return AccessDenied, so
+# one unreadable target among many does not end the stream
+
+
+def _open(
+    pid: int, backend: str, pss: bool
+) -> Union[Collector, psutil.AccessDenied, None]:
+    try:
+        collector = make_collector(psutil.Process(pid), backend, pss=pss)
+        collector.prime()
+    except psutil.NoSuchProcess:
+        return None
+    except psutil.AccessDenied as e:
+        return e
+    return collector
+
+
+def _probe(
+    collector: Collector, extended: bool, sample_index: int
+) -> Union[Row, psutil.AccessDenied, None]:
+    try:
+        if extended:
+            return collector.read_row(sample_index)
+        return collector.read_basic_row()
+    except psutil.NoSuchProcess:
+        return None
+    except psutil.AccessDenied as e:
+        return e
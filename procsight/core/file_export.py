@@ -1,99 +1,82 @@
-import pandas as pd
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
 from loguru import logger
-from pandas import DataFrame
-
-from procsight.models.metrics import CpuUsage, MemoryUsage
-
-
-def _append_average_row(df: DataFrame) -> DataFrame:
-    means = df.drop(columns=["sample"], errors="ignore").mean(numeric_only=True)
-    avg_row = {"sample": "avg", **means.to_dict()}
-    return pd.concat([df, DataFrame([avg_row])], ignore_index=True)
-
-
-def export_to_csv(args, data):
-    if args.extended:
-        rows = [s.model_dump() for s in data]
-        df = pd.json_normalize(rows)
-
-        rename_map = {
-            "sample": "sample",
-            "meta.uptime_sec": "uptime_sec",
-            "meta.status": "status",
-            "cpu.process": "cpu_percent",
-            "cpu.user": "cpu_user",
-            "cpu.system": "cpu_system",
-            "memory.rss": "rss_mb",
-            "memory.vms": "vms_mb",
-            "memory.shared": "shared_mb",
-            "memory.data": "data_mb",
-            "memory.text": "text_mb",
-            "io.read_count": "read_count",
-            "io.write_count": "write_count",
-            "io.read_bytes": "read_bytes",
-            "io.write_bytes": "write_bytes",
-            "io.read_chars": "read_chars",
-            "io.write_chars": "write_chars",
-            "ctx.voluntary": "ctx_voluntary",
-            "ctx.involuntary": "ctx_involuntary",
-            "descriptors.open_files": "open_files",
-            "descriptors.fds": "fds",
-            "threads.threads": "threads",
-            "meta.cpu_affinity": "cpu_affinity",
-        }
-        df = df.rename(columns=rename_map)
-
-        if "cpu_affinity" in df.columns:
-
-            def _join_affinity(v):
-                if isinstance(v, (list, tuple)) and len(v) > 0:
-                    return ";".join(map(str, v))
-                return None
-
-            df["cpu_affinity"] = df["cpu_affinity"].apply(_join_affinity)
-
-        preferred_order = [
-            "sample",
-            "uptime_sec",
-            "status",
-            "cpu_percent",
-            "cpu_user",
-            "cpu_system",
-            "rss_mb",
-            "vms_mb",
-            "shared_mb",
-            "data_mb",
-            "text_mb",
-            "read_count",
-            "write_count",
-            "read_bytes",
-            "write_bytes",
-            "read_chars",
-            "write_chars",
-            "ctx_voluntary",
-            "ctx_involuntary",
-            "open_files",
-            "fds",
-            "threads",
-            "cpu_affinity",
-        ]
-        existing_cols = [c for c in preferred_order if c in df.columns]
-        df = df[existing_cols]
-
-        df = _append_average_row(df)
-        df.to_csv(args.out, index=False)
+
+from procsight.core.leak import DEFAULT_WINDOW_SEC, LeakDetector
+from procsight.core.rows import BASIC_COLUMNS, EXTENDED_COLUMNS, TIMING_COLUMNS
+from procsight.core.stats import RunStats
+from procsight.core.store import SampleStore, as_store
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+
+def _append_summary_rows(df: DataFrame, stats: RunStats) -> DataFrame:
+    import pandas as pd
+
+    summary = pd.DataFrame(stats.summary_rows(), columns=df.columns)
+    return pd.concat([df, summary], ignore_index=True)
+
+
+def output_columns(
+    extended: bool, data, times: Optional[Sequence[float]] = None
+) -> List[str]:
+    """
+    Columns written for ``data``.
+
+    A store carries its own times, plus the scheduler's ``lateness_s``/``missed``
+    columns, which are written whenever ``times`` is given. Models carry no
+    scheduling info, so only the times passed in can be written.
+    """
+    columns = EXTENDED_COLUMNS if extended else BASIC_COLUMNS
+    if times is None:
+        dropped = TIMING_COLUMNS
+    elif isinstance(data, SampleStore):
+        dropped = []
     else:
-        basic_tuples: list[tuple[CpuUsage, MemoryUsage]] = data
-        rows = [
-            {
-                "sample": i + 1,
-                "cpu_percent": cpu.process,
-                "rss_mb": mem.rss,
-                "vms_mb": mem.vms,
-            }
-            for i, (cpu, mem) in enumerate(basic_tuples)
-        ]
-        df = DataFrame(rows)
-        df = _append_average_row(df)
-        df.to_csv(args.out, index=False)
+        dropped = TIMING_COLUMNS[1:]
+    return [c for c in columns if c not in dropped]
+
+
+def run_stats(args, columns: Sequence[str]) -> RunStats:
+    """``RunStats`` for an export: ``args.thresholds`` and a leak check per ``args``."""
+    leak = LeakDetector(
+        window_s=getattr(args, "leak_window", DEFAULT_WINDOW_SEC),
+        limit_mb=getattr(args, "leak_limit", None),
+    )
+    return RunStats(columns, getattr(args, "thresholds", None), leak=leak)
+
+
+def export_to_csv(args, data, times: Optional[Sequence[float]] = None):
+    """
+    Write collected samples to ``args.out`` followed by the summary rows.
+
+    The rows are those of ``RunStats.summary_rows`` (p50/p95/p99/max, time
+    above any ``args.thresholds``, the memory trends, then ``avg``), as the
+    streaming sink writes.
+
+    ``data`` is a ``SampleStore`` (columns are taken as-is) or a list of samples
+    (converted once with ``as_store``).
+    When ``times`` (elapsed seconds per sample) is given it is written as a
+    ``time_s`` column (see ``output_columns``).
+    """
+    columns = output_columns(args.extended, data, times)
+    store = as_store(data, args.extended, times)
+    stats = run_stats(args, columns)
+    stats.extend(store.rows())
+    df = _append_summary_rows(store.to_dataframe(columns), stats)
+    df.to_csv(args.out, index=False)
     logger.info(f"Saved CSV at: {args.out}")
+
+
+def export_to_file(args, data, times: Optional[Sequence[float]] = None):
+    """Write ``args.out`` as Parquet/Feather when its suffix asks for it, else CSV."""
+    from procsight.core.arrow_export import arrow_format, export_to_arrow
+
+    if arrow_format(Path(args.out)):
+        export_to_arrow(args, data, times)
+    else:
+        export_to_csv(args, data, times)
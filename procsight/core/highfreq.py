@@ -0,0 +1,142 @@
+"""
+High-frequency capture (intervals down to ~1 ms).
+
+Only CPU time and memory are read on each tick, straight into preallocated
+``array`` buffers. Rows, CPU percentages and models are built once the capture
+has finished, so nothing allocates or parses beyond the probe itself while the
+clock is running.
+"""
+
+import gc
+import math
+import statistics
+from array import array
+from time import monotonic, sleep
+from typing import NamedTuple
+
+import psutil
+from loguru import logger
+
+from procsight.core.sample_collector import make_collector
+from procsight.core.scheduler import DeadlineScheduler
+from procsight.core.store import SampleStore
+
+# busy-wait the last SPIN_SEC before each deadline instead of sleeping
+SPIN_SEC = 0.001
+
+
+class CaptureReport(NamedTuple):
+    samples: int
+    interval: float  # requested
+    achieved: float  # mean spacing between samples
+    jitter: float  # standard deviation of that spacing
+    max_lateness: float
+    missed: int
+
+    def __str__(self) -> str:
+        return (
+            f"{self.samples} samples, interval {self.interval * 1000:.3f} ms requested, "
+            f"{self.achieved * 1000:.3f} ms achieved, "
+            f"jitter {self.jitter * 1000:.3f} ms, "
+            f"max lateness {self.max_lateness * 1000:.3f} ms, missed {self.missed}"
+        )
+
+
+class HighFrequencyCapture:
+    """
+    Sample CPU and RSS of one process at millisecond intervals.
+
+    Ticks use a ``DeadlineScheduler`` with a hybrid sleep/spin wait, and the
+    garbage collector is paused during the capture. ``run()`` returns a basic
+    ``SampleStore`` (items are ``(CpuUsage, MemoryUsage)``), with CPU % computed
+    from the CPU-time deltas between consecutive samples. ``report`` describes
+    the interval that was actually achieved.
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        interval: float,
+        backend: str = "auto",
+        spin_sec: float = SPIN_SEC,
+    ):
+        self.pid = pid
+        self.interval = interval
+        self.spin_sec = spin_sec
+        self.report: CaptureReport | None = None
+        self._collector = make_collector(psutil.Process(pid), backend)
+
+    def close(self) -> None:
+        self._collector.close()
+
+    def run(self, duration: float = 0, samples: int = 0) -> SampleStore:
+        """Capture for ``duration`` seconds or exactly ``samples`` samples."""
+        if bool(duration) == bool(samples):
+            raise ValueError("High-frequency capture needs one of duration or samples.")
+        capacity = samples or math.ceil(duration / self.interval)
+        times = array("d", bytes(8 * capacity))
+        cpu = array("d", bytes(8 * capacity))
+        rss = array("d", bytes(8 * capacity))
+        vms = array("d", bytes(8 * capacity))
+        lateness = array("d", bytes(8 * capacity))
+        missed = array("q", bytes(8 * capacity))
+
+        read = self._collector.read_fast
+        scheduler = DeadlineScheduler(
+            self.interval, "skip", clock=monotonic, sleep=sleep, spin=self.spin_sec
+        )
+        count = 0
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            scheduler.start()
+            while count < capacity:
+                tick = scheduler.wait()
+                if duration and tick.offset >= duration:
+                    break
+                times[count] = monotonic()
+                try:
+                    cpu[count], rss[count], vms[count] = read()
+                except psutil.NoSuchProcess:
+                    logger.warning(f"process exited during capture (pid={self.pid})")
+                    break
+                lateness[count] = tick.lateness
+                missed[count] = tick.missed
+                count += 1
+        except KeyboardInterrupt:
+            print("\nStopping high-frequency capture (Ctrl+C).")
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        store = SampleStore(extended=False, capacity=max(1, count))
+        for i in range(count):
+            if i:
+                dt = times[i] - times[i - 1]
+                cpu_pct = max(0.0, (cpu[i] - cpu[i - 1]) / dt * 100.0) if dt else 0.0
+            else:
+                cpu_pct = 0.0
+            store.append(
+                {
+                    "sample": i + 1,
+                    "time_s": times[i] - times[0],
+                    "lateness_s": lateness[i],
+                    "missed": missed[i],
+                    "interval_s": self.interval,
+                    "cpu_percent": cpu_pct,
+                    "rss_mb": rss[i],
+                    "vms_mb": vms[i],
+                }
+            )
+
+        gaps = [times[i] - times[i - 1] for i in range(1, count)]
+        self.report = CaptureReport(
+            samples=count,
+            interval=self.interval,
+            achieved=statistics.fmean(gaps) if gaps else 0.0,
+            jitter=statistics.pstdev(gaps) if gaps else 0.0,
+            max_lateness=scheduler.max_lateness,
+            missed=scheduler.missed,
+        )
+        logger.info(f"high-frequency capture: {self.report}")
+        return store
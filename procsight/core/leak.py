@@ -0,0 +1,275 @@
+"""
+Online memory-leak detection.
+
+``LeakDetector`` fits a robust trend to RSS, PSS and the data segment while a
+run goes on. Samples are averaged into ``points`` buckets covering the last
+``window_s`` seconds. Over those points it keeps a Theil–Sen estimate: the
+median of the slopes between every pair of points, which ignores the odd
+spike or GC drop. The pairwise slopes are kept sorted and updated as a bucket
+enters or leaves the window. A tick costs O(1), and a bucket O(points²) at
+most, however long the run.
+
+Each ``Trend`` reports:
+
+- the slope in MB/hour;
+- a confidence that the series is rising. This is the one-sided Mann–Kendall
+  test over the same pairwise slopes;
+- the hours until the current fit reaches ``limit_mb``. The limit is given by
+  the user or read from the target's cgroup (``cgroup_memory_limit_mb``).
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from pathlib import Path
+from statistics import median
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from loguru import logger
+
+from procsight.core.rows import Row
+
+LEAK_COLUMNS = ("rss_mb", "pss_mb", "data_mb")
+DEFAULT_WINDOW_SEC = 3600.0
+DEFAULT_POINTS = 60
+# fewer points than this give no trend
+MIN_POINTS = 4
+# cgroup v1 reports "no limit" as a huge page-aligned number
+_CGROUP_UNLIMITED = 1 << 60
+
+
+class Trend(NamedTuple):
+    metric: str
+    slope_mb_h: float
+    confidence: float  # 0..1 that the series is rising (Mann–Kendall)
+    points: int
+    current_mb: float  # fitted value at the last point
+    limit_mb: Optional[float]
+    hours_to_limit: Optional[float]  # None when flat/falling or without a limit
+
+
+class _TheilSen:
+    """Theil–Sen slope over a sliding window of ``(t, y)`` points."""
+
+    def __init__(self, points: int):
+        self.points: Deque[Tuple[float, float]] = deque(maxlen=points)
+        self.slopes: List[float] = []
+
+    def push(self, t: float, y: float) -> None:
+        if len(self.points) == self.points.maxlen:
+            t0, y0 = self.points.popleft()
+            for t1, y1 in self.points:
+                s = self.slopes
+                del s[bisect_left(s, (y1 - y0) / (t1 - t0))]
+        for t1, y1 in self.points:
+            insort(self.slopes, (y - y1) / (t - t1))
+        self.points.append((t, y))
+
+    def copy(self) -> _TheilSen:
+        other = _TheilSen(self.points.maxlen or 0)
+        other.points.extend(self.points)
+        other.slopes = list(self.slopes)
+        return other
+
+    def slope(self) -> float:
+        s = self.slopes
+        n = len(s)
+        return s[n // 2] if n % 2 else (s[n // 2 - 1] + s[n // 2]) / 2
+
+    def intercept(self, slope: float) -> float:
+        return median(y - slope * t for t, y in self.points)
+
+    def confidence(self) -> float:
+        """One-sided Mann–Kendall confidence that the series is rising."""
+        n = len(self.points)
+        s = self.slopes
+        score = (len(s) - bisect_right(s, 0.0)) - bisect_left(s, 0.0)
+        variance = n * (n - 1) * (2 * n + 5) / 18
+        if score > 0:
+            score -= 1  # continuity correction
+        elif score < 0:
+            score += 1
+        z = score / math.sqrt(variance)
+        return 0.5 * (1 + math.erf(z / math.sqrt(2)))
+
+
+class LeakDetector:
+    """
+    Streaming Theil–Sen trend per memory column.
+
+    ``add`` takes one row per tick (``time_s`` is required). ``trends``
+    returns a ``Trend`` per column with enough points, counting the current,
+    partial bucket, so it can be asked at any time.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str] = LEAK_COLUMNS,
+        window_s: float = DEFAULT_WINDOW_SEC,
+        points: int = DEFAULT_POINTS,
+        limit_mb: Optional[float] = None,
+    ):
+        if window_s <= 0 or points < MIN_POINTS:
+            raise ValueError(f"window_s must be > 0 and points >= {MIN_POINTS}.")
+        self.columns = list(columns)
+        self.window_s = window_s
+        self.bucket_s = window_s / points
+        self.limit_mb = limit_mb
+        self._fits = {name: _TheilSen(points) for name in self.columns}
+        self._bucket: Optional[int] = None
+        self._t_sum = 0.0
+        self._count = 0
+        self._sums: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+
+    def add(self, row: Mapping[str, Any]) -> None:
+        t = row.get("time_s")
+        if t is None:
+            return
+        bucket = int(t // self.bucket_s)
+        if bucket != self._bucket:
+            self.__close_bucket()
+            self._bucket = bucket
+        self._t_sum += t
+        self._count += 1
+        for name in self.columns:
+            value = row.get(name)
+            if value is None or math.isnan(value):
+                continue
+            self._sums[name] = self._sums.get(name, 0.0) + value
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def extend(self, rows) -> None:
+        for row in rows:
+            self.add(row)
+
+    def __close_bucket(self) -> None:
+        if not self._count:
+            return
+        self.__push_bucket(self._fits)
+        self._t_sum = 0.0
+        self._count = 0
+        self._sums = {}
+        self._counts = {}
+
+    def __push_bucket(self, fits: Dict[str, _TheilSen]) -> None:
+        t = self._t_sum / self._count
+        for name, total in self._sums.items():
+            fits[name].push(t, total / self._counts[name])
+
+    def trends(self) -> Dict[str, Trend]:
+        fits = self._fits
+        if self._count:
+            # the partial bucket counts without being committed to the window
+            fits = {name: fit.copy() for name, fit in fits.items()}
+            self.__push_bucket(fits)
+        out = {}
+        for name, fit in fits.items():
+            if len(fit.points) < MIN_POINTS:
+                continue
+            slope = fit.slope()  # MB per second
+            t_last = fit.points[-1][0]
+            current = fit.intercept(slope) + slope * t_last
+            hours = None
+            if self.limit_mb is not None and slope > 0:
+                hours = max(0.0, self.limit_mb - current) / slope / 3600
+            out[name] = Trend(
+                metric=name,
+                slope_mb_h=slope * 3600,
+                confidence=fit.confidence(),
+                points=len(fit.points),
+                current_mb=current,
+                limit_mb=self.limit_mb,
+                hours_to_limit=hours,
+            )
+        return out
+
+    def summary_rows(self) -> List[Row]:
+        """
+        The trends as CSV rows labelled in the ``sample`` column.
+
+        The rows are ``slope_mb_h``, ``slope_confidence`` and, with a limit,
+        ``hours_to_limit``. There are no rows when no column has a trend yet.
+        """
+        trends = self.trends()
+        if not trends:
+            return []
+        rows: List[Row] = [
+            {"sample": "slope_mb_h", **{n: t.slope_mb_h for n, t in trends.items()}},
+            {
+                "sample": "slope_confidence",
+                **{n: t.confidence for n, t in trends.items()},
+            },
+        ]
+        if self.limit_mb is not None:
+            rows.append(
+                {
+                    "sample": "hours_to_limit",
+                    **{n: t.hours_to_limit for n, t in trends.items()},
+                }
+            )
+        return rows
+
+    def log(self) -> None:
+        trends = self.trends()
+        if not trends:
+            logger.debug("leak check: not enough data for a trend")
+            return
+        for t in trends.values():
+            line = (
+                f"leak check {t.metric}: {t.slope_mb_h:+.2f} MB/h "
+                f"(confidence {t.confidence:.0%}, {t.points} points)"
+            )
+            if t.hours_to_limit is not None:
+                h = t.hours_to_limit
+                eta = f"{h:.1f} h" if h >= 1 else f"{h * 60:.0f} min"
+                line += f", reaches {t.limit_mb:g} MB in {eta}"
+            if t.slope_mb_h > 0 and t.confidence >= 0.95:
+                logger.warning(line)
+            else:
+                logger.info(line)
+
+
+def cgroup_memory_limit_mb(pid: int) -> Optional[float]:
+    """
+    Memory limit (MB) of the cgroup ``pid`` runs in, or None.
+
+    Reads ``memory.max`` (cgroup v2) or ``memory.limit_in_bytes`` (v1). The
+    limit applies to the whole cgroup, which may hold more than this process.
+    """
+    try:
+        lines = Path(f"/proc/{pid}/cgroup").read_text().splitlines()
+    except OSError:
+        return None
+    candidates = []
+    for line in lines:
+        _, controllers, path = line.split(":", 2)
+        if controllers == "":
+            candidates.append(Path("/sys/fs/cgroup") / path.lstrip("/") / "memory.max")
+        elif "memory" in controllers.split(","):
+            candidates.append(
+                Path("/sys/fs/cgroup/memory")
+                / path.lstrip("/")
+                / "memory.limit_in_bytes"
+            )
+    for candidate in candidates:
+        try:
+            value = candidate.read_text().strip()
+        except OSError:
+            continue
+        if value == "max" or not value.isdigit() or int(value) >= _CGROUP_UNLIMITED:
+            return None
+        return int(value) / 1024**2
+    return None
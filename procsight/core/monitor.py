@@ -1,100 +1,367 @@
+import sys
+import threading
 from time import monotonic, sleep
-from typing import List, Tuple, Union
+from typing import Any, Collection, Iterator, List, Optional, Sequence, Tuple
 
 import psutil
 
-from procsight.core.sample_collector import collect_basic_tuple, collect_sample
-from procsight.models.metrics import CpuUsage, MemoryUsage, ProcessSample
+from procsight.core.adaptive import ActivityDetector
+from procsight.core.overhead import SelfMonitor
+from procsight.core.rates import RateTracker
+from procsight.core.rows import Row
+from procsight.core.sample_collector import make_collector
+from procsight.core.scheduler import (
+    AdaptiveScheduler,
+    DeadlineScheduler,
+    Tick,
+    log_schedule_summary,
+)
+from procsight.core.sinks import RowCsvSink, SampleSink
+from procsight.core.store import SampleStore
+from procsight.core.threads import THREAD_COLUMNS, ThreadTracker
+
+# GIL switch interval while sampling in the background: the sampling thread gets
+# the interpreter back within 1 ms of its deadline while a view thread renders
+BACKGROUND_SWITCH_INTERVAL = 0.001
 
 
 class Monitor:
-    def __init__(self, pid: int, interval: float):
+    """
+    Sample one process at a fixed interval.
+
+    Samples are kept column-wise in a ``SampleStore``; indexing it yields the
+    usual pydantic models. Every sample is also pushed to ``sinks`` as soon as it
+    is collected. With ``retain=False`` nothing is accumulated in memory (the
+    returned store and ``sample_times`` stay empty), so long continuous runs keep
+    a flat footprint and rely on the sinks for output.
+
+    All modes tick on absolute deadlines (see ``DeadlineScheduler``); ``overrun``
+    picks what happens when a tick runs past the next one. Each row records its
+    ``lateness_s``, the number of ``missed`` ticks before it and the
+    ``interval_s`` it was scheduled at.
+
+    With ``max_interval`` set, sampling is adaptive: ``interval`` becomes the
+    fastest rate, used while CPU, RSS or I/O are changing (see
+    ``ActivityDetector``), and the interval doubles after each flat tick up to
+    ``max_interval`` (see ``AdaptiveScheduler``).
+
+    With ``threads=K`` extended runs also record per-thread CPU% of the ``K``
+    busiest threads of each tick (see ``ThreadTracker``). As with the self
+    rows, they are streamed to ``threads_out`` (CSV) when given and kept in
+    ``thread_series`` only when ``retain`` is set.
+
+    With ``self_metrics=True`` the monitor also records its own cost per tick
+    (tick latency, CPU time, RSS and per-probe latency) and logs a summary at
+    the end of the run. The rows are streamed to ``self_out`` (CSV) when given
+    and kept in ``self_series`` only when ``retain`` is set.
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        interval: float,
+        backend: str = "auto",
+        sinks: Optional[Sequence[SampleSink]] = None,
+        retain: bool = True,
+        overrun: str = "skip",
+        self_metrics: bool = False,
+        max_interval: Optional[float] = None,
+        threads: int = 0,
+        self_out: Optional[str] = None,
+        threads_out: Optional[str] = None,
+    ):
         self.pid = pid
+        self.backend = backend
         self.interval = interval
-        self._sample_times: List[float] = []
+        self.max_interval = max_interval
+        self.sinks: List[SampleSink] = list(sinks or [])
+        self.retain = retain
+        self.overrun = overrun
+        self._scheduler = DeadlineScheduler(interval, overrun)
+        self._store: Optional[SampleStore] = None
         self._base_mono: float | None = None
         self._proc: psutil.Process = psutil.Process(self.pid)
+        self._collector = make_collector(self._proc, backend)
+        self.self_metrics = self_metrics
+        self.self_out = self_out
+        self._self: Optional[SelfMonitor] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self._rates = RateTracker()
+        self._activity: Optional[ActivityDetector] = None
+        self.threads = threads
+        self.threads_out = threads_out
+        self._threads: Optional[ThreadTracker] = None
+        self._columns: Optional[Collection[str]] = None
 
     @property
     def sample_times(self) -> List[float]:
         """Return a list of elapsed seconds per collected sample (aligned to first sample)."""
-        return list(self._sample_times)
+        return self._store.times if self._store is not None else []
+
+    def stop(self) -> None:
+        """Ask a running ``get_process_usage_by_interval`` (e.g. in another thread) to return."""
+        self._stop.set()
+
+    def set_interval(self, interval: float) -> None:
+        """
+        Change the interval of the current run from the next tick on.
+
+        Meant for consumers of ``iter_samples`` that switch rate mid-run (see
+        ``procsight.core.trigger``). ``interval`` itself, used by the next
+        run, is left alone.
+        """
+        self._scheduler.set_interval(interval)
+
+    def set_columns(self, columns: Optional[Collection[str]]) -> None:
+        """
+        Read only the extended probes ``columns`` need from the next tick on.
+
+        The other extended columns are left empty (see ``probe_groups``) until
+        this is called again with None.
+        """
+        self._columns = columns
+
+    def start_background(
+        self, duration: int, samples: int, extended: bool = False
+    ) -> threading.Thread:
+        """
+        Run ``get_process_usage_by_interval`` in a daemon thread.
+
+        For live views that render in the calling thread while samples reach
+        them through the sinks. End the run with ``stop()``; ``join()`` waits
+        for it and re-raises any error from the sampling thread.
+
+        The interpreter's switch interval is lowered while the sampling thread
+        runs and restored by that thread when the run ends, whether or not
+        ``join()`` is called.
+        """
+        previous = sys.getswitchinterval()
+
+        def run() -> None:
+            try:
+                self.get_process_usage_by_interval(duration, samples, extended)
+            except BaseException as e:
+                self._error = e
+            finally:
+                sys.setswitchinterval(previous)
+
+        self._error = None
+        sys.setswitchinterval(BACKGROUND_SWITCH_INTERVAL)
+        self._thread = threading.Thread(
+            target=run, name="procsight-sampler", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is None:
+            return
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return
+        self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    @property
+    def thread_series(self) -> Optional[SampleStore]:
+        """Top-K threads per tick of the last extended run, if ``threads`` and ``retain``."""
+        return self._threads.series if self._threads is not None else None
+
+    @property
+    def self_series(self) -> Optional[SampleStore]:
+        """Per-tick self-overhead of the last run, if ``self_metrics`` and ``retain``."""
+        return self._self.series if self._self is not None else None
 
     def get_process_usage_by_interval(
         self, duration: int, samples: int, extended: bool = False
-    ) -> Union[List[Tuple[CpuUsage, MemoryUsage]], List[ProcessSample]]:
+    ) -> SampleStore:
         """
         Collect process metrics.
 
+        Returns a ``SampleStore``: each item is a ``ProcessSample`` (extended) or
+        a ``(CpuUsage, MemoryUsage)`` tuple (basic).
+
         Modes (mutually exclusive):
           - duration > 0: run for that many seconds
           - samples > 0: collect exactly N samples
           - neither: run until user interrupts with Ctrl+C (continuous)
         """
+        collection = self._store = SampleStore(extended)
+        ticks = self.__run(duration, samples, extended)
+        try:
+            for _, row in ticks:
+                if self.retain:
+                    collection.append(row)
+        finally:
+            ticks.close()
+        return collection
+
+    def iter_samples(
+        self,
+        duration: int = 0,
+        samples: int = 0,
+        extended: bool = False,
+        rows: bool = False,
+    ) -> Iterator[Tuple[float, Any]]:
+        """
+        Yield ``(elapsed, sample)`` as each tick completes.
+
+        Same modes as ``get_process_usage_by_interval``, but nothing is kept in
+        the monitor: memory stays flat however long the run. ``sample`` is a
+        ``ProcessSample`` or ``(CpuUsage, MemoryUsage)`` tuple, or the flat row
+        dict with ``rows=True`` (cheaper, and what ``procsight.core.pipeline``
+        works on). Sinks still receive every sample. Breaking out of the loop
+        (or closing the generator) ends the run and flushes the sinks.
+        """
+        self._store = None
+        convert = None
+        if not rows:
+            from procsight.core.rows import basic_from_row, sample_from_row
+
+            convert = sample_from_row if extended else basic_from_row
+        ticks = self.__run(duration, samples, extended)
+        try:
+            for elapsed, row in ticks:
+                yield elapsed, (row if convert is None else convert(row))
+        finally:
+            ticks.close()
+
+    def __run(
+        self, duration: int, samples: int, extended: bool
+    ) -> Iterator[Tuple[float, Row]]:
         if duration and samples:
             raise ValueError(
                 "Provide only one of duration or samples (or neither for continuous mode)."
             )
 
         # reset timing state for this run
-        self._sample_times = []
+        self._stop.clear()
         self._base_mono = None
+        self._rates.reset()
+        self._activity = None
+        if self.max_interval:
+            self._activity = ActivityDetector()
+            self._scheduler = AdaptiveScheduler(
+                self.interval,
+                self.max_interval,
+                self.overrun,
+                clock=monotonic,
+                sleep=sleep,
+            )
+        else:
+            self._scheduler = DeadlineScheduler(
+                self.interval, self.overrun, clock=monotonic, sleep=sleep
+            )
 
-        # prime CPU percent once so subsequent non-blocking calls have a baseline
-        self._proc.cpu_percent(interval=None)
+        self._self = None
+        if self.self_metrics:
+            probes = list(
+                self._collector.PROBES if extended else self._collector.BASIC_PROBES
+            )
+            if self.threads and extended:
+                probes.append("threads")
+            self._self = SelfMonitor(probes, retain=self.retain)
+            if self.self_out:
+                self._self.sinks.append(RowCsvSink(self.self_out, self._self.columns))
+        self._collector.timer = self._self.timer if self._self is not None else None
 
-        if extended:
-            collection: Union[
-                list[tuple[CpuUsage, MemoryUsage]], list[ProcessSample]
-            ] = []
-        else:
-            collection = []
+        self._threads = None
+        if self.threads and extended:
+            self._threads = ThreadTracker(
+                self.pid, self.threads, self.backend, retain=self.retain
+            )
+            if self.threads_out:
+                self._threads.sinks.append(RowCsvSink(self.threads_out, THREAD_COLUMNS))
+
+        # prime CPU percent once so subsequent non-blocking calls have a baseline
+        self._collector.prime()
+        if self._threads is not None:
+            self._threads.prime()
 
         if duration:
-            self.__collect_for_duration(duration, collection, extended)
+            ticks = self.__ticks_for_duration(duration)
         elif samples:
-            self.__collect_for_samples(samples, collection, extended)
+            ticks = self.__ticks_for_samples(samples)
         else:
-            self.__collect_continuous(collection, extended)
-
-        return collection
+            print("Sampling continuously. Press Ctrl+C to stop.")
+            ticks = self.__ticks_continuous()
+        try:
+            for sample_index, tick in ticks:
+                yield self.__get_all_usage_metrics(extended, sample_index, tick)
+        except KeyboardInterrupt:
+            if duration or samples:
+                raise
+            print("\nStopping continuous sampling (Ctrl+C).")
+        finally:
+            for sink in self.sinks:
+                sink.flush()
+            log_schedule_summary(self._scheduler)
+            if self._threads is not None:
+                self._threads.log_summary()
+                self._threads.close()
+            if self._self is not None:
+                if self._base_mono is not None:
+                    self._self.log_summary(monotonic() - self._base_mono)
+                self._self.close()
 
-    def __collect_for_duration(self, duration: int, collection, extended: bool) -> None:
-        start = monotonic()
-        interval = self.interval
+    def __ticks_for_duration(self, duration: int) -> Iterator[Tuple[int, Tick]]:
+        scheduler = self._scheduler
         count = 0
-        while (monotonic() - start) < duration:
-            self.__get_all_usage_metrics(collection, extended, sample_index=count + 1)
+        while scheduler.next_offset < duration and not self._stop.is_set():
+            tick = scheduler.wait()
+            if tick.offset >= duration:
+                break
             count += 1
-            next_time = start + count * interval
-            sleep(max(0.0, next_time - monotonic()))
+            yield count, tick
 
-    def __collect_for_samples(self, samples: int, collection, extended: bool) -> None:
+    def __ticks_for_samples(self, samples: int) -> Iterator[Tuple[int, Tick]]:
         for i in range(1, samples + 1):
-            self.__get_all_usage_metrics(collection, extended, sample_index=i)
-            sleep(self.interval)
+            if self._stop.is_set():
+                break
+            yield i, self._scheduler.wait()
 
-    def __collect_continuous(self, collection, extended: bool) -> None:
-        print("Sampling continuously. Press Ctrl+C to stop.")
-        try:
-            count = 0
-            while True:
-                count += 1
-                self.__get_all_usage_metrics(collection, extended, sample_index=count)
-                sleep(self.interval)
-        except KeyboardInterrupt:
-            print("\nStopping continuous sampling (Ctrl+C).")
+    def __ticks_continuous(self) -> Iterator[Tuple[int, Tick]]:
+        count = 0
+        while not self._stop.is_set():
+            count += 1
+            yield count, self._scheduler.wait()
 
     def __get_all_usage_metrics(
-        self, collection, extended: bool, sample_index: int
-    ) -> None:
+        self, extended: bool, sample_index: int, tick: Tick
+    ) -> Tuple[float, Row]:
         now_m = monotonic()
         if self._base_mono is None:
             self._base_mono = now_m
-        self._sample_times.append(now_m - self._base_mono)
+        elapsed = now_m - self._base_mono
+        if self._self is not None:
+            self._self.begin()
         if extended:
-            sample = collect_sample(self._proc, sample_index)
-            collection.append(sample)
+            row = self._collector.read_row(sample_index, self._columns)
         else:
-            cpu_usage, memory_usage = collect_basic_tuple(self._proc)
-            collection.append((cpu_usage, memory_usage))
+            row = self._collector.read_basic_row()
+            row["sample"] = sample_index
+        row["time_s"] = elapsed
+        row["lateness_s"] = tick.lateness
+        row["missed"] = tick.missed
+        row["interval_s"] = tick.interval
+        if extended:
+            self._rates.update(row)
+        if self._threads is not None:
+            self._threads.update(sample_index, elapsed)
+            if self._self is not None:
+                self._self.timer.mark("threads")
+        if self._activity is not None:
+            self._scheduler.adapt(self._activity.update(row))
+        for sink in self.sinks:
+            sink.write(elapsed, row)
+        if self._self is not None:
+            self._self.end(sample_index, elapsed)
+        return elapsed, row
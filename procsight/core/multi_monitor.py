@@ -0,0 +1,253 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+import psutil
+from loguru import logger
+
+from procsight.core.rates import RateTracker
+from procsight.core.rows import Row
+from procsight.core.sample_collector import Collector, make_collector
+from procsight.core.scheduler import DeadlineScheduler, Tick, log_schedule_summary
+from procsight.core.sinks import SampleSink
+from procsight.core.store import SampleStore
+
+# one process's samples; items are ProcessSample or (CpuUsage, MemoryUsage)
+Series = SampleStore
+
+# upper bound for the probe pool; probes are short and mostly wait on /proc reads
+MAX_WORKERS = 8
+
+
+class MultiMonitor:
+    """
+    Sample several processes from one deadline-driven loop.
+
+    Every target is probed on the same tick, so all per-PID series share the
+    timestamps in ``sample_times`` (and extended samples carry the shared tick
+    number in ``ProcessSample.sample``). Probes for a tick are spread across a
+    small thread pool so the tick still fits inside the interval. Targets that
+    exit, or that can no longer be read (``AccessDenied``), are dropped with a
+    warning; their series simply stop.
+
+    As with ``Monitor``, each target's rows go to its sinks as they are
+    collected: ``sinks(pid)`` gives them when the target is added (e.g. one CSV
+    per PID). Sinks are flushed at the end of a run and closed by the caller.
+    With ``retain=False`` the series and ``sample_times`` stay empty, so
+    memory stays flat however long the run.
+    """
+
+    def __init__(
+        self,
+        pids: Sequence[int],
+        interval: float,
+        backend: str = "auto",
+        max_workers: Optional[int] = None,
+        pss: bool = False,
+        overrun: str = "skip",
+        sinks: Optional[Callable[[int], Sequence[SampleSink]]] = None,
+        retain: bool = True,
+    ):
+        if not pids:
+            raise ValueError("MultiMonitor needs at least one pid.")
+        self.interval = interval
+        self.backend = backend
+        self.pss = pss
+        self.overrun = overrun
+        self.sinks = sinks
+        self.retain = retain
+        self._target_sinks: Dict[int, List[SampleSink]] = {}
+        self._scheduler = DeadlineScheduler(interval, overrun)
+        self._tick_info = Tick(0.0, 0.0, 0)
+        self.max_workers = max_workers or min(MAX_WORKERS, len(pids))
+        self._collectors: Dict[int, Collector] = {}
+        self._extended = False
+        self._series: Dict[int, SampleStore] = {}
+        self._rates: Dict[int, RateTracker] = {}
+        self._sample_times: List[float] = []
+        self._base_mono: float | None = None
+        self._elapsed = 0.0
+        for pid in dict.fromkeys(pids):
+            self._add_target(pid)
+
+    @property
+    def pids(self) -> List[int]:
+        """PIDs that have been sampled, in the order they were added."""
+        return list(self._series)
+
+    @property
+    def sample_times(self) -> List[float]:
+        """Elapsed seconds of every shared tick (aligned to the first tick)."""
+        return list(self._sample_times)
+
+    def times_for(self, pid: int) -> List[float]:
+        """Elapsed seconds of the ticks at which ``pid`` was sampled."""
+        series = self._series.get(pid)
+        return series.times if series is not None else []
+
+    def _add_target(self, pid: int) -> Collector:
+        collector = make_collector(psutil.Process(pid), self.backend, pss=self.pss)
+        self._collectors[pid] = collector
+        self._series.setdefault(pid, SampleStore(self._extended))
+        if self.sinks is not None and pid not in self._target_sinks:
+            self._target_sinks[pid] = list(self.sinks(pid))
+        return collector
+
+    def _drop_target(self, pid: int) -> None:
+        collector = self._collectors.pop(pid, None)
+        if collector is not None:
+            collector.close()
+
+    def close(self) -> None:
+        for pid in list(self._collectors):
+            self._drop_target(pid)
+
+    def get_process_usage_by_interval(
+        self, duration: int, samples: int, extended: bool = False
+    ) -> Dict[int, Series]:
+        """
+        Collect metrics for every target and return one series per PID.
+
+        Modes match ``Monitor.get_process_usage_by_interval``.
+        """
+        if duration and samples:
+            raise ValueError(
+                "Provide only one of duration or samples (or neither for continuous mode)."
+            )
+
+        self._sample_times = []
+        self._base_mono = None
+        self._extended = extended
+        for pid in self._series:
+            self._series[pid] = SampleStore(extended)
+        self._rates = {}
+
+        for pid, collector in list(self._collectors.items()):
+            try:
+                collector.prime()
+            except psutil.NoSuchProcess:
+                logger.warning(f"process exited before sampling started (pid={pid})")
+                self._drop_target(pid)
+            except psutil.AccessDenied:
+                self._target_denied(pid)
+
+        self._scheduler = DeadlineScheduler(
+            self.interval, self.overrun, clock=monotonic, sleep=sleep
+        )
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="procsight-probe"
+        ) as pool:
+            try:
+                if duration:
+                    self.__run(pool, extended, duration=duration)
+                elif samples:
+                    self.__run(pool, extended, samples=samples)
+                else:
+                    print("Sampling continuously. Press Ctrl+C to stop.")
+                    try:
+                        self.__run(pool, extended)
+                    except KeyboardInterrupt:
+                        print("\nStopping continuous sampling (Ctrl+C).")
+            finally:
+                for sinks in self._target_sinks.values():
+                    for sink in sinks:
+                        sink.flush()
+        log_schedule_summary(self._scheduler)
+
+        return {pid: series for pid, series in self._series.items()}
+
+    def __run(
+        self,
+        pool: ThreadPoolExecutor,
+        extended: bool,
+        duration: int = 0,
+        samples: int = 0,
+    ) -> None:
+        scheduler = self._scheduler
+        count = 0
+        while self._collectors:
+            if duration and scheduler.next_offset >= duration:
+                break
+            if samples and count >= samples:
+                break
+            self._tick_info = scheduler.wait()
+            if duration and self._tick_info.offset >= duration:
+                break
+            count += 1
+            self._tick(pool, extended, count)
+        if not self._collectors:
+            logger.warning("all monitored processes have exited")
+
+    def _tick(
+        self, pool: ThreadPoolExecutor, extended: bool, sample_index: int
+    ) -> None:
+        self._before_tick()
+        now_m = monotonic()
+        if self._base_mono is None:
+            self._base_mono = now_m
+        elapsed = self._elapsed = now_m - self._base_mono
+        if self.retain:
+            self._sample_times.append(elapsed)
+
+        targets = list(self._collectors.items())
+        if len(targets) == 1:
+            results = [self._probe(targets[0][1], extended, sample_index)]
+        else:
+            results = list(
+                pool.map(
+                    lambda c: self._probe(c, extended, sample_index),
+                    [c for _, c in targets],
+                )
+            )
+
+        for (pid, _), row in zip(targets, results):
+            if isinstance(row, psutil.AccessDenied):
+                self._target_denied(pid)
+                continue
+            if row is None:
+                self._target_exited(pid)
+                continue
+            row["sample"] = sample_index
+            row["time_s"] = elapsed
+            row["lateness_s"] = self._tick_info.lateness
+            row["missed"] = self._tick_info.missed
+            row["interval_s"] = self._tick_info.interval
+            if extended:
+                self._rates.setdefault(pid, RateTracker()).update(row)
+            if self.retain:
+                self._series[pid].append(row)
+            for sink in self._target_sinks.get(pid, ()):
+                sink.write(elapsed, row)
+
+        self._after_tick(
+            sample_index,
+            {pid: r for (pid, _), r in zip(targets, results) if isinstance(r, dict)},
+        )
+
+    def _before_tick(self) -> None:
+        """Hook for subclasses to adjust the target set before each tick."""
+
+    def _after_tick(self, sample_index: int, results: Dict[int, Row]) -> None:
+        """Hook for subclasses to consume the per-PID rows of a tick."""
+
+    def _target_exited(self, pid: int) -> None:
+        logger.warning(f"process exited, no longer sampled (pid={pid})")
+        self._drop_target(pid)
+
+    def _target_denied(self, pid: int) -> None:
+        logger.warning(f"access denied, no longer sampled (pid={pid})")
+        self._drop_target(pid)
+
+    @staticmethod
+    def _probe(
+        collector: Collector, extended: bool, sample_index: int
+    ) -> Union[Row, psutil.AccessDenied, None]:
+        """The row, None if the process exited, or the ``AccessDenied`` raised."""
+        try:
+            if extended:
+                return collector.read_row(sample_index)
+            return collector.read_basic_row()
+        except psutil.NoSuchProcess:
+            return None
+        except psutil.AccessDenied as e:
+            return e
@@ -0,0 +1,159 @@
+"""
+Self-overhead instrumentation.
+
+``ProbeTimer`` times each probe group inside a collector tick. ``SelfMonitor``
+turns that, plus ProcSight's own CPU time and RSS, into a per-tick "self"
+series and an end-of-run summary.
+"""
+
+import os
+from time import perf_counter_ns, process_time
+from typing import Dict, List, Optional, Sequence
+
+import psutil
+from loguru import logger
+
+from procsight.core.rows import Row
+from procsight.core.sinks import SampleSink
+from procsight.core.stats import RunStats
+from procsight.core.store import SampleStore
+
+# columns of the self series before the per-probe ``probe_<name>_us`` columns
+SELF_COLUMNS = [
+    "sample",
+    "time_s",
+    "tick_us",
+    "self_cpu_ms",
+    "self_cpu_percent",
+    "self_rss_mb",
+]
+
+
+def probe_column(name: str) -> str:
+    return f"probe_{name}_us"
+
+
+class ProbeTimer:
+    """
+    Wall-clock time of each probe group within one tick.
+
+    A collector calls ``start()`` at the beginning of a tick and ``mark(name)``
+    after each group; the time since the previous mark is charged to ``name``.
+    """
+
+    def __init__(self):
+        self.last: Dict[str, int] = {}
+        self._t = 0
+
+    def start(self) -> None:
+        self.last = {}
+        self._t = perf_counter_ns()
+
+    def mark(self, name: str) -> None:
+        now = perf_counter_ns()
+        self.last[name] = self.last.get(name, 0) + now - self._t
+        self._t = now
+
+
+def _no_mark(name: str) -> None:
+    pass
+
+
+def marker(timer: Optional[ProbeTimer]):
+    """``timer.mark`` when timing is enabled, else a no-op with the same signature."""
+    if timer is None:
+        return _no_mark
+    timer.start()
+    return timer.mark
+
+
+class SelfMonitor:
+    """
+    Per-tick cost of sampling: tick latency, own CPU time and RSS, probe latencies.
+
+    Each row goes to ``sinks`` and, with ``retain``, to ``series``. The summary
+    is kept by a streaming ``RunStats``, so ``retain=False`` keeps memory flat
+    however long the run.
+    """
+
+    def __init__(
+        self,
+        probes: Sequence[str],
+        sinks: Sequence[SampleSink] = (),
+        retain: bool = True,
+    ):
+        self.timer = ProbeTimer()
+        self.probes = list(probes)
+        self.columns = SELF_COLUMNS + [probe_column(p) for p in self.probes]
+        self.series = SampleStore(extended=False, columns=self.columns)
+        self.stats = RunStats(self.columns)
+        self.sinks = list(sinks)
+        self.retain = retain
+        self._me = psutil.Process(os.getpid())
+        self._cpu0 = 0.0
+        self._tick0 = 0
+
+    def begin(self) -> None:
+        self._cpu0 = process_time()
+        self._tick0 = perf_counter_ns()
+
+    def end(self, sample_index: int, elapsed: float) -> None:
+        tick_ns = perf_counter_ns() - self._tick0
+        cpu_s = process_time() - self._cpu0
+        row: Row = {
+            "sample": sample_index,
+            "time_s": elapsed,
+            "tick_us": tick_ns / 1000,
+            "self_cpu_ms": cpu_s * 1000,
+            "self_cpu_percent": cpu_s / (tick_ns / 1e9) * 100 if tick_ns else 0.0,
+            "self_rss_mb": self._me.memory_info().rss / 1024**2,
+        }
+        for name, ns in self.timer.last.items():
+            row[probe_column(name)] = ns / 1000
+        self.stats.add(row)
+        for sink in self.sinks:
+            sink.write(elapsed, row)
+        if self.retain:
+            self.series.append(row)
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+    def summary(self, wall_s: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Mean/p95/max of every self column.
+
+        With ``wall_s`` (the run's wall-clock length) the summary also has
+        ``cpu_share``: ProcSight's sampling CPU time as a % of one core.
+        """
+        out: Dict[str, Dict[str, float]] = {
+            name: {"mean": s["mean"], "p95": s["p95"], "max": s["max"]}
+            for name, s in self.stats.summary().items()
+        }
+        cpu = self.stats.metrics.get("self_cpu_ms")
+        if wall_s and cpu is not None:
+            out["cpu_share"] = {"percent": cpu.total / 1000 / wall_s * 100}
+        return out
+
+    def log_summary(self, wall_s: Optional[float] = None) -> None:
+        summary = self.summary(wall_s)
+        if "tick_us" not in summary:
+            return
+        probes: List[str] = sorted(
+            (p for p in self.probes if probe_column(p) in summary),
+            key=lambda p: summary[probe_column(p)]["mean"],
+            reverse=True,
+        )
+        costly = ", ".join(
+            f"{p} {summary[probe_column(p)]['mean']:.1f}" for p in probes[:4]
+        )
+        share = summary.get("cpu_share", {}).get("percent")
+        logger.info(
+            f"monitor overhead: tick {summary['tick_us']['mean']:.1f} us "
+            f"(p95 {summary['tick_us']['p95']:.1f}), "
+            f"RSS {summary['self_rss_mb']['max']:.1f} MB"
+            + (f", CPU {share:.2f}% of one core" if share is not None else "")
+        )
+        if costly:
+            logger.info(f"most expensive probes (mean us): {costly}")
@@ -0,0 +1,112 @@
+"""
+Composable steps over a sample stream.
+
+Each step takes an iterable of ``(elapsed, sample)`` pairs, such as
+``Monitor.iter_samples()``, and returns a lazy iterator, so steps chain into
+pipelines that hold at most one window in memory::
+
+    stream = monitor.iter_samples(extended=True, rows=True)
+    busy = where(stream, lambda t, row: row["cpu_percent"] > 50)
+    for start, summary in aggregate(until(busy, lambda t, row: t > 3600), 60):
+        print(start, summary.means()["rss_mb"])
+
+Samples may be flat rows or models; ``aggregate`` flattens models itself.
+Steps that stop early (``until``, ``take``) close their input, which ends the
+monitor's run and flushes its sinks.
+"""
+
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from procsight.core.rows import BASIC_COLUMNS, EXTENDED_COLUMNS
+from procsight.core.sinks import RunningSummary, to_row
+
+Pair = Tuple[float, Any]
+Predicate = Callable[[float, Any], bool]
+
+
+def _close(stream: Iterable) -> None:
+    close = getattr(stream, "close", None)
+    if close is not None:
+        close()
+
+
+def where(stream: Iterable[Pair], predicate: Predicate) -> Iterator[Pair]:
+    """Samples for which ``predicate(elapsed, sample)`` is true."""
+    return ((t, item) for t, item in stream if predicate(t, item))
+
+
+def until(
+    stream: Iterable[Pair], predicate: Predicate, inclusive: bool = False
+) -> Iterator[Pair]:
+    """Samples up to the first one matching ``predicate``, then stop the stream."""
+    try:
+        for t, item in stream:
+            if predicate(t, item):
+                if inclusive:
+                    yield t, item
+                return
+            yield t, item
+    finally:
+        _close(stream)
+
+
+def take(stream: Iterable[Pair], n: int) -> Iterator[Pair]:
+    """The first ``n`` samples, then stop the stream."""
+    try:
+        yield from islice(stream, n)
+    finally:
+        _close(stream)
+
+
+def windows(
+    stream: Iterable[Pair], seconds: float
+) -> Iterator[Tuple[float, List[Pair]]]:
+    """
+    Tumbling windows of ``seconds``: ``(window_start, samples)``.
+
+    Windows are aligned to multiples of ``seconds`` of elapsed time; empty ones
+    are skipped. The last, partial window is yielded when the stream ends.
+    """
+    if seconds <= 0:
+        raise ValueError("seconds must be > 0.")
+    start: Optional[float] = None
+    batch: List[Pair] = []
+    for t, item in stream:
+        index = t // seconds * seconds
+        if start is not None and index != start:
+            yield start, batch
+            batch = []
+        start = index
+        batch.append((t, item))
+    if batch:
+        yield start, batch
+
+
+def aggregate(
+    stream: Iterable[Pair],
+    seconds: float,
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[Tuple[float, RunningSummary]]:
+    """
+    Count/mean/min/max per column over tumbling windows of ``seconds``.
+
+    Yields ``(window_start, RunningSummary)``. Windows are summarized as the
+    samples arrive, so no window's samples are held. ``columns`` defaults to
+    every metric column.
+    """
+    if seconds <= 0:
+        raise ValueError("seconds must be > 0.")
+    if columns is None:
+        columns = list(dict.fromkeys(BASIC_COLUMNS + EXTENDED_COLUMNS))
+    start: Optional[float] = None
+    summary: Optional[RunningSummary] = None
+    for n, (t, item) in enumerate(stream, start=1):
+        index = t // seconds * seconds
+        if summary is None or index != start:
+            if summary is not None:
+                yield start, summary
+            start, summary = index, RunningSummary(list(columns))
+        summary.add(to_row(item, n, t))
+    if summary is not None:
+        yield start, summary
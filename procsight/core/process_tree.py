@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import os
+from time import monotonic
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import psutil
+from loguru import logger
+
+from procsight.core.multi_monitor import MAX_WORKERS, MultiMonitor
+from procsight.core.rows import (
+    BASIC_ROW_COLUMNS,
+    EXTENDED_ROW_COLUMNS,
+    NON_METRIC_COLUMNS,
+    Row,
+    basic_from_row,
+    flatten_basic,
+    flatten_sample,
+    sample_from_row,
+)
+from procsight.core.sinks import SampleSink
+from procsight.core.store import SampleStore
+
+if TYPE_CHECKING:
+    from procsight.models.metrics import CpuUsage, MemoryUsage, ProcessSample
+
+# fallback full rescan cadence (seconds) when /proc/<pid>/task/*/children is missing
+RESCAN_SEC = 5.0
+
+
+def children_files_supported() -> bool:
+    """True if the kernel exposes /proc/<pid>/task/<tid>/children (CONFIG_PROC_CHILDREN)."""
+    pid = os.getpid()
+    return os.path.exists(f"/proc/{pid}/task/{pid}/children")
+
+
+def read_children(pid: int) -> List[int]:
+    """Direct children of ``pid``, read from every thread's ``children`` file."""
+    try:
+        tids = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return []
+    children: List[int] = []
+    for tid in tids:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children", "rb") as f:
+                children.extend(int(c) for c in f.read().split())
+        except OSError:
+            continue
+    return children
+
+
+# columns summed as-is (missing in every process -> None) when aggregating a tree
+_SUMMED = [
+    c for c in EXTENDED_ROW_COLUMNS if c not in NON_METRIC_COLUMNS | {"uptime_sec"}
+]
+
+
+def _sum_optional(values) -> Optional[float]:
+    present = [v for v in values if v is not None]
+    return sum(present) if present else None
+
+
+def aggregate_rows(
+    rows: Sequence[Mapping[str, Any]], sample_index: int, root_pid: int
+) -> Row:
+    """
+    Sum the rows of several processes into one tree total.
+
+    Shared pages are counted once per process in RSS; use ``pss_mb`` (read
+    with ``pss=True``) for a total that does not double count them.
+    """
+    total: Row = {"sample": sample_index}
+    for column in _SUMMED:
+        total[column] = _sum_optional(row.get(column) for row in rows)
+    if rows and "pid" not in rows[0]:
+        # basic rows: only the columns they carry
+        return {k: v for k, v in total.items() if k in BASIC_ROW_COLUMNS}
+    root = next((r for r in rows if r.get("pid") == root_pid), None)
+    total.update(
+        pid=root_pid,
+        uptime_sec=root["uptime_sec"] if root else 0.0,
+        status=root["status"] if root else "exited",
+        cpu_affinity=None,
+        processes=len(rows),
+    )
+    return total
+
+
+def aggregate_basic(
+    pairs: Sequence[Tuple[CpuUsage, MemoryUsage]],
+) -> Tuple[CpuUsage, MemoryUsage]:
+    """Sum basic (cpu, memory) tuples of several processes into one tree total."""
+    rows = [flatten_basic(0, cpu, mem) for cpu, mem in pairs]
+    return basic_from_row(aggregate_rows(rows, 0, 0))
+
+
+def aggregate_samples(
+    samples: Sequence[ProcessSample], sample_index: int, root_pid: int
+) -> ProcessSample:
+    """Sum extended samples of several processes into one tree total."""
+    rows = [flatten_sample(s) for s in samples]
+    return sample_from_row(aggregate_rows(rows, sample_index, root_pid))
+
+
+class TreeMonitor(MultiMonitor):
+    """
+    Monitor a process and all of its descendants.
+
+    Children are discovered incrementally: before every tick the ``children``
+    files of the processes already being tracked are read, so the cost grows
+    with the size of the tree rather than the number of processes on the host.
+    Kernels without ``/proc/<pid>/task/*/children`` fall back to a psutil
+    rescan of the tree at most every ``rescan_sec`` seconds.
+
+    Per-process series are returned as in ``MultiMonitor``; the summed tree
+    total of every tick is kept in ``totals`` (aligned with ``sample_times``)
+    and written to ``total_sinks``. With ``retain=False`` only the sinks get
+    the rows. Processes that cannot be read are skipped for as long as they
+    stay in the tree. PSS (``smaps_rollup``, costly for big trees) is only
+    read with ``pss=True``.
+    """
+
+    def __init__(
+        self,
+        root_pid: int,
+        interval: float,
+        backend: str = "auto",
+        max_workers: Optional[int] = None,
+        pss: bool = False,
+        rescan_sec: float = RESCAN_SEC,
+        overrun: str = "skip",
+        sinks: Optional[Callable[[int], Sequence[SampleSink]]] = None,
+        total_sinks: Optional[Sequence[SampleSink]] = None,
+        retain: bool = True,
+    ):
+        self.root_pid = root_pid
+        self.rescan_sec = rescan_sec
+        self.totals = SampleStore(extended=False)
+        self.total_sinks: List[SampleSink] = list(total_sinks or [])
+        # children that could not be read, so they are not primed again
+        self._rejected: Set[int] = set()
+        self._use_children_files = children_files_supported()
+        self._last_rescan: Optional[float] = None
+        super().__init__(
+            [root_pid],
+            interval,
+            backend=backend,
+            max_workers=max_workers or MAX_WORKERS,
+            pss=pss,
+            overrun=overrun,
+            sinks=sinks,
+            retain=retain,
+        )
+        if not self._use_children_files:
+            logger.debug(
+                f"children files unavailable, rescanning tree every {rescan_sec}s"
+            )
+        self._discover()
+
+    def get_process_usage_by_interval(
+        self, duration: int, samples: int, extended: bool = False
+    ):
+        self.totals = SampleStore(extended)
+        try:
+            return super().get_process_usage_by_interval(duration, samples, extended)
+        finally:
+            for sink in self.total_sinks:
+                sink.flush()
+
+    def _try_add(self, pid: int) -> bool:
+        try:
+            self._add_target(pid).prime()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self._drop_target(pid)
+            self._rejected.add(pid)
+            return False
+        logger.info(f"tracking child process (pid={pid})")
+        return True
+
+    def _discover(self) -> None:
+        if self._use_children_files:
+            known = set(self._collectors)
+            frontier = list(known)
+            seen: Set[int] = set()
+            while frontier:
+                for child in read_children(frontier.pop()):
+                    seen.add(child)
+                    if child not in known and child not in self._rejected:
+                        known.add(child)
+                        if self._try_add(child):
+                            frontier.append(child)
+            # forget rejected PIDs once they leave the tree (PIDs get reused)
+            self._rejected &= seen
+            return
+
+        now = monotonic()
+        if self._last_rescan is not None and now - self._last_rescan < self.rescan_sec:
+            return
+        self._last_rescan = now
+        try:
+            children = psutil.Process(self.root_pid).children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return
+        self._rejected &= {child.pid for child in children}
+        for child in children:
+            if child.pid not in self._collectors and child.pid not in self._rejected:
+                self._try_add(child.pid)
+
+    def _before_tick(self) -> None:
+        self._discover()
+
+    def _after_tick(self, sample_index: int, results: Dict[int, Row]) -> None:
+        if not results:
+            return
+        total = aggregate_rows(list(results.values()), sample_index, self.root_pid)
+        total["time_s"] = self._elapsed
+        total["lateness_s"] = self._tick_info.lateness
+        total["missed"] = self._tick_info.missed
+        total["interval_s"] = self._tick_info.interval
+        if self.retain:
+            self.totals.append(total)
+        for sink in self.total_sinks:
+            sink.write(self._elapsed, total)
+
+    def _target_exited(self, pid: int) -> None:
+        logger.info(f"process in tree exited (pid={pid})")
+        self._drop_target(pid)
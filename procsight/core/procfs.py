@@ -0,0 +1,404 @@
+from __future__ import annotations
+
+import os
+import stat as stat_mod
+import sys
+from time import monotonic, time
+from typing import TYPE_CHECKING, Collection, Dict, List, Optional, Tuple
+
+import psutil  # type: ignore
+from loguru import logger
+
+from procsight.core.overhead import ProbeTimer, marker
+from procsight.core.rows import (
+    PROBE_GROUP_COLUMNS,
+    Row,
+    basic_from_row,
+    probe_groups,
+    sample_from_row,
+)
+
+if TYPE_CHECKING:
+    from procsight.models.metrics import CpuUsage, MemoryUsage, ProcessSample
+
+_MB = 1024**2
+# how often the CPU affinity is re-read when ``status`` is not (seconds)
+AFFINITY_REFRESH_SEC = 1.0
+
+# same mapping psutil uses for the single-letter state in /proc/<pid>/stat
+_STATUS = {
+    "R": "running",
+    "S": "sleeping",
+    "D": "disk-sleep",
+    "T": "stopped",
+    "t": "tracing-stop",
+    "Z": "zombie",
+    "X": "dead",
+    "x": "dead",
+    "K": "wake-kill",
+    "W": "waking",
+    "I": "idle",
+    "P": "parked",
+}
+
+# initial buffer sizes; a buffer doubles if a file ever fills it completely
+_BUF_SIZES = {
+    "stat": 1024,
+    "statm": 256,
+    "io": 512,
+    "status": 4096,
+    "schedstat": 128,
+    "smaps_rollup": 1024,
+}
+_REQUIRED = ("stat", "statm", "status")
+
+
+def procfs_available() -> bool:
+    return sys.platform.startswith("linux") and os.path.exists("/proc/self/stat")
+
+
+def _boot_time() -> float:
+    with open("/proc/stat", "rb") as f:
+        for line in f:
+            if line.startswith(b"btime"):
+                return float(line.split()[1])
+    return psutil.boot_time()
+
+
+def parse_stat(data: bytes) -> List[bytes]:
+    """Return the /proc/<pid>/stat fields that follow ``comm`` (state first)."""
+    # comm may contain spaces and parentheses, so split after the *last* ')'
+    return data[data.rfind(b")") + 2 :].split()
+
+
+def _status_value(data: bytes, key: bytes) -> Optional[bytes]:
+    start = data.find(b"\n" + key)
+    if start < 0:
+        return None
+    start += len(key) + 1
+    end = data.find(b"\n", start)
+    return data[start:end].strip()
+
+
+def parse_cpu_list(value: bytes) -> List[int]:
+    """Parse a kernel CPU list such as ``0-3,8,10-11``."""
+    cpus: List[int] = []
+    for part in value.split(b","):
+        if not part:
+            continue
+        lo, _, hi = part.partition(b"-")
+        cpus.extend(range(int(lo), int(hi or lo) + 1))
+    return cpus
+
+
+class ProcfsCollector:
+    """
+    Linux collector that reads /proc/<pid> directly instead of going through psutil.
+
+    ``stat``, ``statm``, ``io``, ``status`` and ``schedstat`` are opened once and
+    re-read with ``os.preadv`` into preallocated buffers on every tick; only the
+    fields a sample row needs are parsed. ``io`` and ``schedstat`` are
+    optional (``io`` needs ptrace access to the target). ``smaps_rollup`` is only
+    opened when ``pss`` is requested, since the kernel walks every mapping to
+    produce it.
+
+    CPU% is normalized by the number of CPUs the target may run on. The
+    affinity comes with ``status`` when it is read, and is otherwise re-read
+    with ``sched_getaffinity`` at most every ``AFFINITY_REFRESH_SEC``, so a
+    ``taskset`` change is picked up on every probe path.
+
+    Exposes the same interface as ``SampleCollector`` so ``Monitor`` can use either.
+    """
+
+    PROBES = ("stat", "statm", "status", "cpu", "smaps_rollup", "io", "fds", "meta")
+    BASIC_PROBES = ("stat", "cpu")
+
+    def __init__(self, pid: int, pss: bool = False):
+        self.pid = pid
+        self._clk_tck = float(os.sysconf("SC_CLK_TCK"))
+        self._page = os.sysconf("SC_PAGE_SIZE")
+        self._fds: Dict[str, int] = {}
+        self._bufs: Dict[str, bytearray] = {}
+        self._fd_dir: Optional[int] = None
+        self.timer: Optional[ProbeTimer] = None
+        try:
+            for name, size in _BUF_SIZES.items():
+                if name == "smaps_rollup" and not pss:
+                    continue
+                try:
+                    self._fds[name] = os.open(f"/proc/{pid}/{name}", os.O_RDONLY)
+                except (PermissionError, FileNotFoundError):
+                    if name in _REQUIRED:
+                        raise
+                    continue
+                self._bufs[name] = bytearray(size)
+            try:
+                self._fd_dir = os.open(f"/proc/{pid}/fd", os.O_RDONLY | os.O_DIRECTORY)
+            except PermissionError:
+                self._fd_dir = None
+        except FileNotFoundError:
+            self.close()
+            raise psutil.NoSuchProcess(pid)
+        except BaseException:
+            self.close()
+            raise
+
+        fields = parse_stat(self._read("stat"))
+        self._create_time = _boot_time() + int(fields[19]) / self._clk_tck
+        self._affinity_raw: Optional[bytes] = None
+        self._affinity: Optional[List[int]] = None
+        self._affinity_key: Optional[Tuple[int, ...]] = None
+        self._cores = max(1, os.cpu_count() or 1)
+        self._affinity_read_at = 0.0
+        self._update_affinity(self._read("status"))
+        self._last_wall: Optional[float] = None
+        self._last_cpu_s = 0.0
+        self._last_run_s: Optional[float] = None
+        # (reported CPU s per core, utime+stime s, schedstat s) of the last read_fast
+        self._fast_last: Optional[Tuple[float, float, Optional[float]]] = None
+
+    def close(self) -> None:
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds.clear()
+        if self._fd_dir is not None:
+            os.close(self._fd_dir)
+            self._fd_dir = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _read(self, name: str) -> bytes:
+        fd = self._fds[name]
+        buf = self._bufs[name]
+        while True:
+            try:
+                n = os.preadv(fd, [buf], 0)
+            except ProcessLookupError:
+                raise psutil.NoSuchProcess(self.pid)
+            if n < len(buf):
+                return bytes(buf[:n])
+            buf = self._bufs[name] = bytearray(len(buf) * 2)
+
+    def _update_affinity(self, status: bytes) -> None:
+        # Cpus_allowed_list comes for free with status; re-parse only on change
+        raw = _status_value(status, b"Cpus_allowed_list:")
+        self._affinity_read_at = monotonic()
+        if raw is None or raw == self._affinity_raw:
+            return
+        self._affinity_raw = raw
+        self._set_affinity(parse_cpu_list(raw))
+
+    def _set_affinity(self, cpus: List[int]) -> None:
+        self._affinity = cpus or None
+        self._affinity_key = tuple(cpus) if cpus else None
+        if cpus:
+            self._cores = len(cpus)
+
+    def _refresh_affinity(self) -> None:
+        # one syscall, no /proc parsing; rate-limited for the high-frequency paths
+        now = monotonic()
+        if now - self._affinity_read_at < AFFINITY_REFRESH_SEC:
+            return
+        self._affinity_read_at = now
+        try:
+            cpus = sorted(os.sched_getaffinity(self.pid))
+        except OSError:
+            return
+        if tuple(cpus) != self._affinity_key:
+            self._affinity_raw = None
+            self._set_affinity(cpus)
+
+    def prime(self) -> None:
+        """Establish the CPU time baseline so the first sample reports a delta."""
+        self._cpu_percent(parse_stat(self._read("stat")))
+
+    def _run_time(self, fields: List[bytes]) -> Optional[float]:
+        # schedstat has ns resolution (utime/stime move in clock ticks, usually
+        # 10 ms) but only covers the thread-group leader, so use it only for
+        # single-threaded targets; kernels without schedstats report 0
+        if "schedstat" not in self._fds or fields[17] != b"1":
+            return None
+        run_ns = int(self._read("schedstat").split()[0])
+        return run_ns / 1e9 if run_ns else None
+
+    def _cpu_percent(self, fields: List[bytes]) -> float:
+        cpu_s = (int(fields[11]) + int(fields[12])) / self._clk_tck
+        run_s = self._run_time(fields)
+        now = monotonic()
+        last_wall, last_cpu_s, last_run_s = (
+            self._last_wall,
+            self._last_cpu_s,
+            self._last_run_s,
+        )
+        self._last_wall, self._last_cpu_s, self._last_run_s = now, cpu_s, run_s
+        if last_wall is None or now <= last_wall:
+            return 0.0
+        if run_s is not None and last_run_s is not None:
+            delta = run_s - last_run_s
+        else:
+            delta = cpu_s - last_cpu_s
+        # total percent across cores, same scale as psutil.Process.cpu_percent()
+        return max(0.0, delta / (now - last_wall) * 100.0)
+
+    def _cpu(self, fields: List[bytes], row: Row) -> None:
+        self._refresh_affinity()
+        cores = float(self._cores)
+        row["cpu_percent"] = self._cpu_percent(fields) / cores
+        row["cpu_user"] = int(fields[11]) / self._clk_tck / cores
+        row["cpu_system"] = int(fields[12]) / self._clk_tck / cores
+
+    def read_basic_row(self) -> Row:
+        mark = marker(self.timer)
+        fields = parse_stat(self._read("stat"))
+        row: Row = {
+            "rss_mb": int(fields[21]) * self._page / _MB,
+            "vms_mb": int(fields[20]) / _MB,
+        }
+        mark("stat")
+        self._cpu(fields, row)
+        mark("cpu")
+        return row
+
+    def read_fast(self) -> Tuple[float, float, float]:
+        """
+        Cheapest probe: (CPU seconds / cores, RSS MB, VMS MB) from ``stat`` alone.
+
+        The CPU seconds are cumulative. Between two reads of a single-threaded
+        target they advance by the ``schedstat`` run time (ns resolution),
+        otherwise by clock ticks: ``num_threads`` is checked on every read, as
+        ``schedstat`` covers only the leader thread. The source, and the core
+        count after an affinity change, can change from one read to the next
+        without a jump, since only normalized deltas are added up.
+        """
+        fields = parse_stat(self._read("stat"))
+        self._refresh_affinity()
+        ticks_s = (int(fields[11]) + int(fields[12])) / self._clk_tck
+        run_s = self._run_time(fields)
+        if self._fast_last is None:
+            cpu_s = (run_s if run_s is not None else ticks_s) / self._cores
+        else:
+            last_cpu_s, last_ticks_s, last_run_s = self._fast_last
+            if run_s is not None and last_run_s is not None:
+                delta = run_s - last_run_s
+            else:
+                delta = ticks_s - last_ticks_s
+            cpu_s = last_cpu_s + max(0.0, delta) / self._cores
+        self._fast_last = (cpu_s, ticks_s, run_s)
+        return (
+            cpu_s,
+            int(fields[21]) * self._page / _MB,
+            int(fields[20]) / _MB,
+        )
+
+    def basic(self) -> Tuple[CpuUsage, MemoryUsage]:
+        return basic_from_row(self.read_basic_row())
+
+    def _descriptors(self) -> Tuple[Optional[int], Optional[int]]:
+        if self._fd_dir is None:
+            return None, None
+        try:
+            names = os.listdir(self._fd_dir)
+        except OSError:
+            return None, None
+        open_files = 0
+        for name in names:
+            # like psutil.Process.open_files(): absolute paths to regular files
+            try:
+                target = os.readlink(name, dir_fd=self._fd_dir)
+                if not target.startswith("/") or target.endswith(" (deleted)"):
+                    continue
+                if stat_mod.S_ISREG(os.stat(name, dir_fd=self._fd_dir).st_mode):
+                    open_files += 1
+            except OSError:
+                continue
+        return open_files, len(names)
+
+    def read_row(
+        self, sample_index: int, columns: Optional[Collection[str]] = None
+    ) -> Row:
+        """
+        Read one extended sample as a flat row (see ``procsight.core.rows``).
+
+        With ``columns``, the files only needed for other columns (see
+        ``probe_groups``) are not read and their columns are None.
+        """
+        groups = probe_groups(columns)
+        mark = marker(self.timer)
+        fields = parse_stat(self._read("stat"))
+        mark("stat")
+        row: Row = {"sample": sample_index, "pid": self.pid}
+        page_mb = self._page / _MB
+        if "memory" in groups:
+            statm = self._read("statm").split()
+            mark("statm")
+            row["rss_mb"] = int(statm[1]) * page_mb
+            row["vms_mb"] = int(statm[0]) * page_mb
+            row["shared_mb"] = int(statm[2]) * page_mb
+            row["text_mb"] = int(statm[3]) * page_mb
+            row["data_mb"] = int(statm[5]) * page_mb
+        else:
+            row["rss_mb"] = int(fields[21]) * page_mb
+            row["vms_mb"] = int(fields[20]) / _MB
+            row["shared_mb"] = row["text_mb"] = row["data_mb"] = None
+        status = None
+        if "ctx" in groups:
+            status = self._read("status")
+            self._update_affinity(status)
+            mark("status")
+
+        self._cpu(fields, row)
+        mark("cpu")
+
+        pss: Optional[float] = None
+        if "pss" in groups and "smaps_rollup" in self._fds:
+            pss_kb = _status_value(self._read("smaps_rollup"), b"Pss:")
+            if pss_kb is not None:
+                pss = int(pss_kb.split()[0]) / 1024
+            mark("smaps_rollup")
+        row["pss_mb"] = pss
+
+        if "io" in groups and "io" in self._fds:
+            # rchar, wchar, syscr, syscw, read_bytes, write_bytes, cancelled_...
+            io_vals = self._read("io").split()[1::2]
+            row["read_count"] = int(io_vals[2])
+            row["write_count"] = int(io_vals[3])
+            row["read_bytes"] = int(io_vals[4])
+            row["write_bytes"] = int(io_vals[5])
+            row["read_chars"] = int(io_vals[0])
+            row["write_chars"] = int(io_vals[1])
+            mark("io")
+        else:
+            # not asked for, or not readable (another user's process)
+            for name in PROBE_GROUP_COLUMNS["io"]:
+                row[name] = None
+
+        if status is not None:
+            voluntary = _status_value(status, b"voluntary_ctxt_switches:")
+            involuntary = _status_value(status, b"nonvoluntary_ctxt_switches:")
+            row["ctx_voluntary"] = int(voluntary) if voluntary is not None else None
+            row["ctx_involuntary"] = (
+                int(involuntary) if involuntary is not None else None
+            )
+        else:
+            row["ctx_voluntary"] = row["ctx_involuntary"] = None
+
+        if "fds" in groups:
+            row["open_files"], row["fds"] = self._descriptors()
+            mark("fds")
+        else:
+            row["open_files"] = row["fds"] = None
+        row["threads"] = int(fields[17])
+        row["uptime_sec"] = max(0.0, time() - self._create_time)
+        row["status"] = _STATUS.get(fields[0].decode(), "unknown")
+        row["cpu_affinity"] = self._affinity_key
+        mark("meta")
+
+        logger.opt(lazy=True).debug("{}", lambda: row)
+        return row
+
+    def sample(self, sample_index: int) -> ProcessSample:
+        return sample_from_row(self.read_row(sample_index))
@@ -0,0 +1,111 @@
+"""
+Per-second rates of the cumulative counters.
+
+I/O counters, context switches and CPU user/system time only ever grow, so the
+raw values show totals, not throughput. Each counter in ``RATES`` gets a rate
+column derived from the delta between consecutive ticks, divided by the
+measured time between them (``time_s``), not the nominal interval.
+
+A counter that goes backwards has been reset, for example when the PID was
+reused. The new value is then taken as the whole delta, as if it restarted
+from zero. The first tick, and any tick next to a missing value, has no rate
+(None / NaN).
+
+``RateTracker`` does this one row at a time as the monitors sample.
+``compute_rates`` and ``fill_rates`` do the same over whole columns for runs
+rebuilt from models.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Any, Dict, Mapping, MutableMapping, Optional, Tuple
+
+if TYPE_CHECKING:
+    from procsight.core.store import SampleStore
+
+# counter column -> (rate column, scale)
+RATES: Dict[str, Tuple[str, float]] = {
+    # CPU seconds (already per core) per second, as a per-core percentage
+    "cpu_user": ("cpu_user_percent", 100.0),
+    "cpu_system": ("cpu_system_percent", 100.0),
+    "read_count": ("read_ops_per_s", 1.0),
+    "write_count": ("write_ops_per_s", 1.0),
+    "read_bytes": ("read_bytes_per_s", 1.0),
+    "write_bytes": ("write_bytes_per_s", 1.0),
+    "read_chars": ("read_chars_per_s", 1.0),
+    "write_chars": ("write_chars_per_s", 1.0),
+    "ctx_voluntary": ("ctx_voluntary_per_s", 1.0),
+    "ctx_involuntary": ("ctx_involuntary_per_s", 1.0),
+}
+
+RATE_COLUMNS = [rate for rate, _ in RATES.values()]
+
+
+def rate(
+    value: Optional[float],
+    previous: Optional[float],
+    dt: Optional[float],
+    scale: float = 1.0,
+) -> Optional[float]:
+    """Per-second rate between two counter readings ``dt`` seconds apart."""
+    if value is None or previous is None or dt is None or not dt > 0:
+        return None
+    if math.isnan(value) or math.isnan(previous):
+        return None
+    delta = value - previous
+    if delta < 0:
+        delta = value  # counter reset: counted from zero since
+    return delta / dt * scale
+
+
+class RateTracker:
+    """Adds the ``RATE_COLUMNS`` to each row of one process's stream."""
+
+    def __init__(self):
+        self._previous: Optional[Mapping[str, Any]] = None
+
+    def reset(self) -> None:
+        self._previous = None
+
+    def update(self, row: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+        """Set the rate columns of ``row`` (in place) and return it."""
+        previous = self._previous
+        if previous is None:
+            for name in RATE_COLUMNS:
+                row[name] = None
+        else:
+            now, before = row.get("time_s"), previous.get("time_s")
+            dt = now - before if now is not None and before is not None else None
+            for counter, (name, scale) in RATES.items():
+                row[name] = rate(row.get(counter), previous.get(counter), dt, scale)
+        self._previous = row
+        return row
+
+
+def compute_rates(times, values, scale: float = 1.0):
+    """Vectorized ``rate`` over a whole column; element 0 is NaN."""
+    import numpy as np
+
+    t = np.asarray(times, dtype=np.float64)
+    v = np.asarray(values, dtype=np.float64)
+    out = np.full(len(v), np.nan)
+    if len(v) < 2:
+        return out
+    delta = np.diff(v)
+    delta = np.where(delta < 0, v[1:], delta)
+    dt = np.diff(t)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = np.where(dt > 0, delta / dt * scale, np.nan)
+    return out
+
+
+def fill_rates(store: SampleStore) -> SampleStore:
+    """Compute every rate column of ``store`` from its counters, in place."""
+    if "time_s" not in store.columns:
+        return store
+    times = store.column("time_s")
+    for counter, (name, scale) in RATES.items():
+        if counter in store.columns and name in store.columns:
+            store.column(name)[:] = compute_rates(times, store.column(counter), scale)
+    return store
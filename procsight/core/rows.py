@@ -0,0 +1,293 @@
+"""
+Flat per-tick rows.
+
+A row is a plain dict keyed by the canonical column names below. Collectors
+produce rows, ``SampleStore`` stores them column-wise and the sinks write them
+out; the pydantic models are only built when a caller asks for them.
+"""
+
+from __future__ import annotations
+
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from procsight.core.rates import RATE_COLUMNS, RATES
+
+if TYPE_CHECKING:
+    from procsight.models.metrics import CpuUsage, MemoryUsage, ProcessSample
+
+Row = Dict[str, Any]
+
+# CSV columns in basic mode
+BASIC_COLUMNS = [
+    "sample",
+    "time_s",
+    "lateness_s",
+    "missed",
+    "interval_s",
+    "cpu_percent",
+    "rss_mb",
+    "vms_mb",
+]
+
+# everything a basic row carries (the CPU breakdown is not exported to CSV)
+BASIC_ROW_COLUMNS = BASIC_COLUMNS + ["cpu_user", "cpu_system"]
+
+EXTENDED_COLUMNS = [
+    "sample",
+    "time_s",
+    "lateness_s",
+    "missed",
+    "interval_s",
+    "uptime_sec",
+    "status",
+    "cpu_percent",
+    "cpu_user",
+    "cpu_system",
+    "rss_mb",
+    "vms_mb",
+    "shared_mb",
+    "data_mb",
+    "text_mb",
+    "pss_mb",
+    "read_count",
+    "write_count",
+    "read_bytes",
+    "write_bytes",
+    "read_chars",
+    "write_chars",
+    "ctx_voluntary",
+    "ctx_involuntary",
+    "open_files",
+    "fds",
+    "threads",
+    "cpu_affinity",
+    "processes",
+    # per-second rates of the counters above (see procsight.core.rates)
+    *RATE_COLUMNS,
+]
+
+# everything an extended row carries (pid is implied by the file in CSV output)
+EXTENDED_ROW_COLUMNS = EXTENDED_COLUMNS + ["pid"]
+
+# per-tick scheduling columns, only known when the samples were collected by a monitor
+TIMING_COLUMNS = ["time_s", "lateness_s", "missed", "interval_s"]
+
+# columns that are not measurements of the process (excluded from averages)
+NON_METRIC_COLUMNS = {
+    "sample",
+    "time_s",
+    "lateness_s",
+    "missed",
+    "interval_s",
+    "status",
+    "cpu_affinity",
+    "pid",
+}
+
+# cumulative counters: their totals only grow, so summaries use the rate columns
+COUNTER_COLUMNS = set(RATES)
+
+# extended columns a collector can skip when asked for fewer (see ``probe_groups``),
+# by the probe group that fills them; CPU, RSS/VMS, threads, status, uptime
+# and affinity are always read
+PROBE_GROUP_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "memory": ("shared_mb", "data_mb", "text_mb"),
+    "pss": ("pss_mb",),
+    "io": (
+        "read_count",
+        "write_count",
+        "read_bytes",
+        "write_bytes",
+        "read_chars",
+        "write_chars",
+    ),
+    "ctx": ("ctx_voluntary", "ctx_involuntary"),
+    "fds": ("open_files", "fds"),
+}
+
+
+def probe_groups(columns: Optional[Collection[str]]) -> Collection[str]:
+    """The groups of ``PROBE_GROUP_COLUMNS`` that fill any of ``columns`` (all for None)."""
+    if columns is None:
+        return PROBE_GROUP_COLUMNS.keys()
+    return {
+        group
+        for group, filled in PROBE_GROUP_COLUMNS.items()
+        if any(name in columns for name in filled)
+    }
+
+
+def format_affinity(value: Optional[Iterable[int]]) -> Optional[str]:
+    """Render an affinity list the way CSV output stores it (``0;1;2``)."""
+    if value is None or isinstance(value, str):
+        return value
+    value = list(value)
+    return ";".join(map(str, value)) if value else None
+
+
+def flatten_basic(
+    index: int, cpu: CpuUsage, mem: MemoryUsage, time_s: Optional[float] = None
+) -> Row:
+    """Flatten a basic (cpu, memory) tuple into a row keyed by ``BASIC_ROW_COLUMNS``."""
+    return {
+        "sample": index,
+        "time_s": time_s,
+        "cpu_percent": cpu.process,
+        "rss_mb": mem.rss,
+        "vms_mb": mem.vms,
+        "cpu_user": cpu.user,
+        "cpu_system": cpu.system,
+    }
+
+
+def flatten_sample(sample: ProcessSample, time_s: Optional[float] = None) -> Row:
+    """Flatten an extended sample into a row keyed by ``EXTENDED_ROW_COLUMNS``."""
+    affinity = sample.meta.cpu_affinity
+    return {
+        "sample": sample.sample,
+        "time_s": time_s,
+        "uptime_sec": sample.meta.uptime_sec,
+        "status": sample.meta.status,
+        "cpu_percent": sample.cpu.process,
+        "cpu_user": sample.cpu.user,
+        "cpu_system": sample.cpu.system,
+        "rss_mb": sample.memory.rss,
+        "vms_mb": sample.memory.vms,
+        "shared_mb": sample.memory.shared,
+        "data_mb": sample.memory.data,
+        "text_mb": sample.memory.text,
+        "pss_mb": sample.memory.pss,
+        "read_count": sample.io.read_count,
+        "write_count": sample.io.write_count,
+        "read_bytes": sample.io.read_bytes,
+        "write_bytes": sample.io.write_bytes,
+        "read_chars": sample.io.read_chars,
+        "write_chars": sample.io.write_chars,
+        "ctx_voluntary": sample.ctx.voluntary,
+        "ctx_involuntary": sample.ctx.involuntary,
+        "open_files": sample.descriptors.open_files,
+        "fds": sample.descriptors.fds,
+        "threads": sample.threads.threads,
+        "cpu_affinity": tuple(affinity) if affinity else None,
+        "processes": sample.meta.processes,
+        "pid": sample.meta.pid,
+    }
+
+
+def nest_basic(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Basic row as ``{"cpu": ..., "memory": ...}`` dicts (model_dump layout)."""
+    return {
+        "cpu": {
+            "process": row["cpu_percent"],
+            "user": row.get("cpu_user"),
+            "system": row.get("cpu_system"),
+        },
+        "memory": {"rss": row["rss_mb"], "vms": row["vms_mb"]},
+    }
+
+
+def nest_row(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Extended row in the nested layout of ``ProcessSample.model_dump()``."""
+    affinity = row.get("cpu_affinity")
+    return {
+        "sample": row["sample"],
+        "cpu": {
+            "process": row["cpu_percent"],
+            "user": row.get("cpu_user"),
+            "system": row.get("cpu_system"),
+        },
+        "memory": {
+            "rss": row["rss_mb"],
+            "vms": row["vms_mb"],
+            "shared": row.get("shared_mb"),
+            "data": row.get("data_mb"),
+            "text": row.get("text_mb"),
+            "pss": row.get("pss_mb"),
+        },
+        "io": {
+            "read_count": row["read_count"],
+            "write_count": row["write_count"],
+            "read_bytes": row["read_bytes"],
+            "write_bytes": row["write_bytes"],
+            "read_chars": row.get("read_chars"),
+            "write_chars": row.get("write_chars"),
+        },
+        "ctx": {
+            "voluntary": row["ctx_voluntary"],
+            "involuntary": row["ctx_involuntary"],
+        },
+        "descriptors": {"open_files": row["open_files"], "fds": row["fds"]},
+        "threads": {"threads": row["threads"]},
+        "meta": {
+            "pid": row["pid"],
+            "uptime_sec": row["uptime_sec"],
+            "status": row["status"],
+            "cpu_affinity": list(affinity) if affinity else None,
+            "processes": row.get("processes"),
+        },
+    }
+
+
+def basic_from_row(row: Mapping[str, Any]) -> Tuple[CpuUsage, MemoryUsage]:
+    # pydantic is only imported once models are asked for, not on the sampling path
+    from procsight.models.metrics import CpuUsage, MemoryUsage
+
+    return (
+        CpuUsage(
+            process=row["cpu_percent"],
+            user=row.get("cpu_user"),
+            system=row.get("cpu_system"),
+        ),
+        MemoryUsage(rss=row["rss_mb"], vms=row["vms_mb"]),
+    )
+
+
+def sample_from_row(row: Mapping[str, Any]) -> ProcessSample:
+    from procsight.models.metrics import (
+        ContextSwitchesUsage,
+        CpuUsage,
+        DescriptorUsage,
+        IOUsage,
+        MemoryUsage,
+        ProcessMeta,
+        ProcessSample,
+        ThreadUsage,
+    )
+
+    n = nest_row(row)
+    return ProcessSample(
+        sample=n["sample"],
+        cpu=CpuUsage(**n["cpu"]),
+        memory=MemoryUsage(**n["memory"]),
+        io=IOUsage(**n["io"]),
+        ctx=ContextSwitchesUsage(**n["ctx"]),
+        descriptors=DescriptorUsage(**n["descriptors"]),
+        threads=ThreadUsage(**n["threads"]),
+        meta=ProcessMeta(**n["meta"]),
+    )
+
+
+def rows_from_samples(
+    extended: bool, data: Iterable[Any], times: Optional[Sequence[float]] = None
+) -> List[Row]:
+    """Rows for a list of models (``ProcessSample`` or basic tuples) plus optional times."""
+    if times is not None:
+        times = list(times)
+
+    def _t(i: int) -> Optional[float]:
+        return times[i] if times is not None and i < len(times) else None
+
+    if extended:
+        return [flatten_sample(s, _t(i)) for i, s in enumerate(data)]
+    return [flatten_basic(i + 1, cpu, mem, _t(i)) for i, (cpu, mem) in enumerate(data)]
@@ -1,177 +1,340 @@
 from __future__ import annotations
 
-from time import time
-from typing import Optional, Tuple
+from contextlib import nullcontext
+from time import monotonic, time
+from typing import (
+    TYPE_CHECKING,
+    Collection,
+    ContextManager,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+)
 
 import psutil  # type: ignore
 from loguru import logger
 
-from procsight.models.metrics import (
-    ContextSwitchesUsage,
-    CpuUsage,
-    DescriptorUsage,
-    IOUsage,
-    MemoryUsage,
-    ProcessMeta,
-    ProcessSample,
-    ThreadUsage,
+from procsight.core.overhead import ProbeTimer, marker
+from procsight.core.procfs import ProcfsCollector, procfs_available
+from procsight.core.rows import (
+    PROBE_GROUP_COLUMNS,
+    Row,
+    basic_from_row,
+    probe_groups,
+    sample_from_row,
 )
 
+if TYPE_CHECKING:
+    from procsight.models.metrics import CpuUsage, MemoryUsage, ProcessSample
+
 _MB = 1024**2
 
+# how often (seconds) rarely-changing attributes such as CPU affinity are re-read
+STATIC_REFRESH_SEC = 30.0
+
+BACKENDS = ("auto", "psutil", "procfs")
+
+
+class Collector(Protocol):
+    """Interface shared by collector backends (``SampleCollector``, ``ProcfsCollector``)."""
+
+    pid: int
+    # probe groups charged by ``timer`` (extended / basic rows)
+    PROBES: Tuple[str, ...]
+    BASIC_PROBES: Tuple[str, ...]
+    timer: Optional[ProbeTimer]
+
+    def prime(self) -> None: ...
+
+    def read_row(
+        self, sample_index: int, columns: Optional[Collection[str]] = None
+    ) -> Row: ...
+
+    def read_basic_row(self) -> Row: ...
+
+    def read_fast(self) -> Tuple[float, float, float]: ...
 
-def _effective_core_count(proc: psutil.Process) -> int:
-    # try process CPU affinity (not available on macOS and some platforms)
+    def sample(self, sample_index: int) -> ProcessSample: ...
+
+    def basic(self) -> Tuple[CpuUsage, MemoryUsage]: ...
+
+    def close(self) -> None: ...
+
+
+def _affinity_of(proc: psutil.Process) -> Optional[List[int]]:
+    # process CPU affinity is not available on macOS and some platforms
     try:
         affinity = proc.cpu_affinity()  # type: ignore[attr-defined]
-        if isinstance(affinity, (list, tuple)) and len(affinity) > 0:
-            return max(1, len(affinity))
     except Exception:
-        pass
+        return None
+    if isinstance(affinity, (list, tuple)) and len(affinity) > 0:
+        return list(affinity)
+    return None
 
-    logical = psutil.cpu_count(logical=True) or 1
-    return max(1, int(logical))
 
+def _optional_mb(mem, field: str) -> Optional[float]:
+    value = getattr(mem, field, None)
+    return value / _MB if value is not None else None
 
-def collect_sample(proc: psutil.Process, sample_index: int) -> ProcessSample:
+
+class SampleCollector:
     """
-    Collect a single rich process sample.
+    Collect samples for a single process.
 
-    Assumes caller has already *primed* cpu_percent with interval=None exactly once
-    for the process before the first invocation, so this call is non-blocking.
+    Every tick is wrapped in ``Process.oneshot()`` so psutil reads each /proc file
+    (or issues each syscall) once per tick instead of once per metric. The
+    process create time hardly ever changes, so it is cached and only re-read
+    every ``static_refresh_sec`` seconds or when ``refresh_static()`` is called.
+    The CPU affinity, which sets the core count CPU% is normalized by, is one
+    cheap syscall and is checked on every tick, so a ``taskset`` change applies
+    from the next sample. ``read_fast`` uses the core count of the last tick.
+
+    Set ``timer`` to a ``ProbeTimer`` to record the latency of each probe group.
     """
-    # cpu
-    cpu_pct_total = proc.cpu_percent(interval=None)
-    cores = _effective_core_count(proc)
-    cpu_times = proc.cpu_times()
-    cpu = CpuUsage(
-        process=cpu_pct_total / float(cores),
-        user=getattr(cpu_times, "user") / float(cores),
-        system=getattr(cpu_times, "system") / float(cores),
-    )
-
-    # memory (prefer full info when available; fallback gracefully)
-    try:
-        mem_full = proc.memory_full_info()
-    except Exception:
-        mem_full = proc.memory_info()
-
-    memory = MemoryUsage(
-        rss=getattr(mem_full, "rss", 0) / _MB,
-        vms=getattr(mem_full, "vms", 0) / _MB,
-        shared=(getattr(mem_full, "shared", None) or 0) / _MB
-        if getattr(mem_full, "shared", None) is not None
-        else None,
-        data=(getattr(mem_full, "data", None) or 0) / _MB
-        if getattr(mem_full, "data", None) is not None
-        else None,
-        text=(getattr(mem_full, "text", None) or 0) / _MB
-        if getattr(mem_full, "text", None) is not None
-        else None,
-    )
-
-    # IO
-    try:
-        io_c = proc.io_counters()  # type: ignore[attr-defined]
-        io_usage = IOUsage(
-            read_count=io_c.read_count,
-            write_count=io_c.write_count,
-            read_bytes=io_c.read_bytes,
-            write_bytes=io_c.write_bytes,
-            read_chars=getattr(io_c, "read_chars", None),
-            write_chars=getattr(io_c, "write_chars", None),
-        )
-    except Exception:
-        io_usage = IOUsage(
-            read_count=0,
-            write_count=0,
-            read_bytes=0,
-            write_bytes=0,
+
+    PROBES = ("cpu", "memory", "io", "ctx", "fds", "threads", "status", "meta")
+    BASIC_PROBES = ("cpu", "memory")
+
+    def __init__(
+        self,
+        proc: psutil.Process,
+        static_refresh_sec: float = STATIC_REFRESH_SEC,
+        pss: bool = False,
+    ):
+        self.proc = proc
+        self.pid: int = proc.pid
+        self.static_refresh_sec = static_refresh_sec
+        self.pss = pss
+        self._affinity: Optional[List[int]] = None
+        self._cores = 1
+        self._create_time: Optional[float] = None
+        self._static_read_at = 0.0
+        self.timer: Optional[ProbeTimer] = None
+        self.refresh_static()
+
+    def refresh_static(self) -> None:
+        """Re-read cached attributes (affinity, core count, create time)."""
+        self._affinity = _affinity_of(self.proc)
+        if self._affinity:
+            self._cores = len(self._affinity)
+        else:
+            self._cores = max(1, int(psutil.cpu_count(logical=True) or 1))
+        try:
+            self._create_time = self.proc.create_time()
+        except Exception:
+            self._create_time = None
+        self._static_read_at = monotonic()
+
+    def prime(self) -> None:
+        """Establish the cpu_percent baseline so later calls are non-blocking."""
+        self.proc.cpu_percent(interval=None)
+
+    def close(self) -> None:
+        """Release backend resources (nothing to release for psutil)."""
+
+    def _oneshot(self) -> ContextManager:
+        oneshot = getattr(self.proc, "oneshot", None)
+        return oneshot() if oneshot is not None else nullcontext()
+
+    def _maybe_refresh_static(self) -> None:
+        if monotonic() - self._static_read_at >= self.static_refresh_sec:
+            self.refresh_static()
+
+    def _update_affinity(self) -> None:
+        affinity = _affinity_of(self.proc)
+        if affinity is not None and affinity != self._affinity:
+            self._affinity = affinity
+            self._cores = len(affinity)
+
+    def _cpu(self, row: Row, precomputed_cpu_pct: Optional[float] = None) -> None:
+        self._update_affinity()
+        # total CPU% from psutil can be up to 100 * cores; normalize to per-core %
+        cpu_pct_total = (
+            precomputed_cpu_pct
+            if precomputed_cpu_pct is not None
+            else self.proc.cpu_percent(interval=None)
         )
+        cores = float(self._cores)
+        cpu_times = self.proc.cpu_times()
+        row["cpu_percent"] = cpu_pct_total / cores
+        row["cpu_user"] = getattr(cpu_times, "user") / cores
+        row["cpu_system"] = getattr(cpu_times, "system") / cores
 
-    # ctx switch
-    try:
-        ctx = proc.num_ctx_switches()
-        ctx_usage = ContextSwitchesUsage(
-            voluntary=ctx.voluntary, involuntary=ctx.involuntary
+    def read_basic_row(self, precomputed_cpu_pct: Optional[float] = None) -> Row:
+        mark = marker(self.timer)
+        self._maybe_refresh_static()
+        row: Row = {}
+        with self._oneshot():
+            self._cpu(row, precomputed_cpu_pct)
+            mark("cpu")
+            mem_info = self.proc.memory_info()
+            mark("memory")
+        row["rss_mb"] = mem_info.rss / _MB
+        row["vms_mb"] = mem_info.vms / _MB
+        return row
+
+    def read_fast(self) -> Tuple[float, float, float]:
+        """Cheapest probe: (CPU seconds / cores, RSS MB, VMS MB)."""
+        with self._oneshot():
+            cpu_times = self.proc.cpu_times()
+            mem_info = self.proc.memory_info()
+        return (
+            (cpu_times.user + cpu_times.system) / self._cores,
+            mem_info.rss / _MB,
+            mem_info.vms / _MB,
         )
-    except Exception:
-        ctx_usage = ContextSwitchesUsage(voluntary=0, involuntary=0)
 
-    # open files
-    try:
-        open_files = len(proc.open_files())
-    except Exception:
-        open_files = 0
-    try:
-        fds = proc.num_fds()
-    except Exception:
-        fds = 0
-    desc_usage = DescriptorUsage(open_files=open_files, fds=fds)
+    def basic(
+        self, precomputed_cpu_pct: Optional[float] = None
+    ) -> Tuple[CpuUsage, MemoryUsage]:
+        return basic_from_row(self.read_basic_row(precomputed_cpu_pct))
 
-    # threads
-    try:
-        thread_usage = ThreadUsage(threads=proc.num_threads())
-    except Exception:
-        thread_usage = ThreadUsage(threads=0)
+    def read_row(
+        self, sample_index: int, columns: Optional[Collection[str]] = None
+    ) -> Row:
+        """
+        Collect a single rich sample as a flat row (see ``procsight.core.rows``).
 
-    # meta
-    now = time()
-    try:
-        create_time = proc.create_time()
-        uptime = max(0.0, now - create_time)
-    except Exception:
-        uptime = 0.0
-    try:
-        status = proc.status()
-    except Exception:
-        status = "unknown"
-    try:
-        affinity = proc.cpu_affinity()  # type: ignore[attr-defined]
-    except Exception:
-        affinity = None
-    meta = ProcessMeta(
-        pid=proc.pid,
-        uptime_sec=uptime,
-        status=status,
-        cpu_affinity=affinity,
-    )
-
-    sample = ProcessSample(
-        sample=sample_index,
-        cpu=cpu,
-        memory=memory,
-        io=io_usage,
-        ctx=ctx_usage,
-        descriptors=desc_usage,
-        threads=thread_usage,
-        meta=meta,
-    )
-
-    logger.debug(sample.model_dump_json())
-    return sample
+        Assumes ``prime()`` (or ``cpu_percent(interval=None)``) was called once
+        before the first invocation, so this call is non-blocking. With
+        ``columns``, probes only needed for other columns (see ``probe_groups``)
+        are skipped and their columns are None.
+        """
+        mark = marker(self.timer)
+        self._maybe_refresh_static()
+        proc = self.proc
+        groups = probe_groups(columns)
+        row: Row = {"sample": sample_index, "pid": self.pid}
+        for group in PROBE_GROUP_COLUMNS.keys() - groups:
+            for name in PROBE_GROUP_COLUMNS[group]:
+                row[name] = None
+        with self._oneshot():
+            self._cpu(row)
+            mark("cpu")
+
+            # memory_info() already carries rss/vms/shared/data/text; the "full"
+            # variant walks smaps, so only pay for it when PSS is requested
+            mem = None
+            if self.pss and "pss" in groups:
+                try:
+                    mem = proc.memory_full_info()
+                except Exception:
+                    mem = None
+            if mem is None:
+                mem = proc.memory_info()
+            row["rss_mb"] = getattr(mem, "rss", 0) / _MB
+            row["vms_mb"] = getattr(mem, "vms", 0) / _MB
+            if "memory" in groups:
+                row["shared_mb"] = _optional_mb(mem, "shared")
+                row["data_mb"] = _optional_mb(mem, "data")
+                row["text_mb"] = _optional_mb(mem, "text")
+            if "pss" in groups:
+                row["pss_mb"] = _optional_mb(mem, "pss")
+            mark("memory")
+
+            # IO
+            if "io" in groups:
+                try:
+                    io_c = proc.io_counters()  # type: ignore[attr-defined]
+                    row["read_count"] = io_c.read_count
+                    row["write_count"] = io_c.write_count
+                    row["read_bytes"] = io_c.read_bytes
+                    row["write_bytes"] = io_c.write_bytes
+                    row["read_chars"] = getattr(io_c, "read_chars", None)
+                    row["write_chars"] = getattr(io_c, "write_chars", None)
+                except Exception:
+                    for name in PROBE_GROUP_COLUMNS["io"]:
+                        row[name] = None
+                mark("io")
+
+            # ctx switch
+            if "ctx" in groups:
+                try:
+                    ctx = proc.num_ctx_switches()
+                    row["ctx_voluntary"] = ctx.voluntary
+                    row["ctx_involuntary"] = ctx.involuntary
+                except Exception:
+                    row["ctx_voluntary"] = row["ctx_involuntary"] = None
+                mark("ctx")
+
+            # open files
+            if "fds" in groups:
+                try:
+                    row["open_files"] = len(proc.open_files())
+                except Exception:
+                    row["open_files"] = None
+                try:
+                    row["fds"] = proc.num_fds()
+                except Exception:
+                    row["fds"] = None
+                mark("fds")
+
+            # threads
+            try:
+                row["threads"] = proc.num_threads()
+            except Exception:
+                row["threads"] = 0
+            mark("threads")
+
+            try:
+                row["status"] = proc.status()
+            except Exception:
+                row["status"] = "unknown"
+            mark("status")
+
+        # meta
+        if self._create_time is not None:
+            row["uptime_sec"] = max(0.0, time() - self._create_time)
+        else:
+            row["uptime_sec"] = 0.0
+        row["cpu_affinity"] = tuple(self._affinity) if self._affinity else None
+        mark("meta")
+
+        logger.opt(lazy=True).debug("{}", lambda: row)
+        return row
+
+    def sample(self, sample_index: int) -> ProcessSample:
+        """Collect a single rich process sample (see ``read_row``)."""
+        return sample_from_row(self.read_row(sample_index))
+
+
+def collect_sample(proc: psutil.Process, sample_index: int) -> ProcessSample:
+    """
+    Collect a single rich process sample.
+
+    Assumes caller has already *primed* cpu_percent with interval=None exactly once
+    for the process before the first invocation, so this call is non-blocking.
+    Prefer a long-lived ``SampleCollector`` when sampling repeatedly.
+    """
+    return SampleCollector(proc).sample(sample_index)
 
 
 def collect_basic_tuple(
     proc: psutil.Process, precomputed_cpu_pct: Optional[float] = None
 ) -> Tuple[CpuUsage, MemoryUsage]:
-    # total CPU% from psutil can be up to 100 * cores; normalize to per-core %
-    cpu_pct_total = (
-        precomputed_cpu_pct
-        if precomputed_cpu_pct is not None
-        else proc.cpu_percent(interval=None)
-    )
-    cores = _effective_core_count(proc)
-    cpu_times = None
-    cpu_times = proc.cpu_times()
-    cpu = CpuUsage(
-        process=cpu_pct_total / float(cores),
-        user=getattr(cpu_times, "user") / float(cores),
-        system=getattr(cpu_times, "system") / float(cores),
-    )
-    mem_info = proc.memory_info()
-    memory = MemoryUsage(
-        rss=mem_info.rss / _MB,
-        vms=mem_info.vms / _MB,
-    )
-    return cpu, memory
+    return SampleCollector(proc).basic(precomputed_cpu_pct)
+
+
+def make_collector(
+    proc: psutil.Process, backend: str = "auto", pss: bool = False
+) -> Collector:
+    """
+    Build a collector for ``proc``.
+
+    ``auto`` picks the native /proc reader on Linux and falls back to psutil
+    elsewhere, or when the target's /proc files cannot be opened. ``pss`` adds
+    proportional set size to extended samples (reads smaps, so it costs more).
+    """
+    if backend == "psutil":
+        return SampleCollector(proc, pss=pss)
+    if backend == "procfs":
+        return ProcfsCollector(proc.pid, pss=pss)
+    if backend == "auto":
+        if procfs_available():
+            try:
+                return ProcfsCollector(proc.pid, pss=pss)
+            except (OSError, psutil.Error) as e:
+                logger.debug(f"procfs backend unavailable for pid {proc.pid}: {e}")
+        return SampleCollector(proc, pss=pss)
+    raise ValueError(f"Unknown collector backend: {backend}")
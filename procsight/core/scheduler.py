@@ -0,0 +1,199 @@
+from time import monotonic, sleep
+from typing import Callable, NamedTuple, Optional
+
+from loguru import logger
+
+# what to do when a tick starts after the next deadline has already passed
+#   skip:    drop the missed deadlines and stay on the original grid
+#   catchup: run the missed ticks back to back until the schedule is caught up
+#   stretch: start the grid again from the late tick (the run gets longer)
+OVERRUN_POLICIES = ("skip", "catchup", "stretch")
+
+
+class Tick(NamedTuple):
+    offset: float  # scheduled time of this tick, seconds after start()
+    lateness: float  # how long after its deadline the tick actually started
+    missed: int  # deadlines dropped right before this tick
+    interval: float = 0.0  # spacing this tick was scheduled at
+
+
+class DeadlineScheduler:
+    """
+    Fixed-rate ticks against absolute monotonic deadlines.
+
+    Deadlines are ``start + n * interval``, so the time a probe takes never
+    accumulates into drift. ``wait()`` sleeps until the next deadline and
+    reports how late the tick is and how many deadlines were lost to an overrun
+    (see ``OVERRUN_POLICIES``); totals are kept in ``missed`` and
+    ``max_lateness``.
+
+    With ``spin > 0`` the wait is hybrid: sleep until ``spin`` seconds before
+    the deadline, then busy-wait on the clock for the rest. That trades a little
+    CPU for sub-millisecond accuracy, where ``time.sleep`` alone may oversleep.
+
+    ``clock`` and ``sleep`` are injectable for tests.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        policy: str = "skip",
+        clock: Callable[[], float] = monotonic,
+        sleep: Callable[[float], None] = sleep,
+        spin: float = 0.0,
+    ):
+        if interval <= 0:
+            raise ValueError("interval must be > 0.")
+        if policy not in OVERRUN_POLICIES:
+            raise ValueError(
+                f"Unknown overrun policy {policy!r} (expected one of {OVERRUN_POLICIES})."
+            )
+        self.interval = interval
+        self.policy = policy
+        self._clock = clock
+        self._sleep = sleep
+        self.spin = spin
+        self.ticks = 0
+        self.missed = 0
+        self.max_lateness = 0.0
+        self._start: Optional[float] = None
+        self._deadline = 0.0
+
+    def start(self) -> None:
+        """Anchor the schedule; the first tick is due immediately."""
+        self._start = self._deadline = self._clock()
+        self.ticks = 0
+        self.missed = 0
+        self.max_lateness = 0.0
+
+    @property
+    def next_offset(self) -> float:
+        """Seconds after ``start()`` at which the next tick is due."""
+        if self._start is None:
+            return 0.0
+        return self._deadline - self._start
+
+    def set_interval(self, interval: float) -> None:
+        """Change the interval from the next deadline on (measured from the last tick)."""
+        if interval <= 0:
+            raise ValueError("interval must be > 0.")
+        if self._start is not None:
+            # the next deadline was set one (old) interval after the last tick
+            self._deadline += interval - self.interval
+        self.interval = interval
+
+    def wait(self) -> Tick:
+        """Block until the next deadline and return its ``Tick``."""
+        if self._start is None:
+            self.start()
+        now = self._clock()
+        if now < self._deadline:
+            if self._deadline - now > self.spin:
+                self._sleep(self._deadline - now - self.spin)
+                now = self._clock()
+            while now < self._deadline:
+                now = self._clock()
+        return self._advance(now)
+
+    async def wait_async(self) -> Tick:
+        """
+        ``wait()`` for an event loop: await the next deadline, never blocking.
+
+        Build the scheduler with ``clock=loop.time`` so deadlines follow the
+        loop's own clock; ``spin`` does not apply.
+        """
+        import asyncio
+
+        if self._start is None:
+            self.start()
+        delay = self._deadline - self._clock()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._advance(self._clock())
+
+    def _advance(self, now: float) -> Tick:
+        deadline = self._deadline
+        missed = 0
+        behind = now - deadline
+        if behind >= self.interval and self.policy == "skip":
+            missed = int(behind // self.interval)
+            deadline += missed * self.interval
+        elif behind >= self.interval and self.policy == "stretch":
+            missed = int(behind // self.interval)
+            # the rest of the grid shifts to follow this (late) tick
+            self._deadline = now
+
+        lateness = max(0.0, now - deadline)
+        self._deadline = max(self._deadline, deadline) + self.interval
+        self.ticks += 1
+        self.missed += missed
+        self.max_lateness = max(self.max_lateness, lateness)
+        return Tick(
+            offset=deadline - self._start,
+            lateness=lateness,
+            missed=missed,
+            interval=self.interval,
+        )
+
+
+class AdaptiveScheduler(DeadlineScheduler):
+    """
+    Deadline ticks whose interval follows the signal.
+
+    After each tick the caller reports whether it saw activity with
+    ``adapt(active)``: an active tick drops the interval to ``min_interval``,
+    a quiet one multiplies it by ``backoff`` up to ``max_interval``. The new
+    interval applies from the next deadline on, so bursts are sampled at full
+    rate while long flat stretches cost a handful of ticks.
+    """
+
+    def __init__(
+        self,
+        min_interval: float,
+        max_interval: float,
+        policy: str = "skip",
+        backoff: float = 2.0,
+        clock: Callable[[], float] = monotonic,
+        sleep: Callable[[float], None] = sleep,
+        spin: float = 0.0,
+    ):
+        if max_interval < min_interval:
+            raise ValueError("max_interval must be >= min_interval.")
+        if backoff < 1:
+            raise ValueError("backoff must be >= 1.")
+        super().__init__(min_interval, policy, clock, sleep, spin)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+
+    def start(self) -> None:
+        super().start()
+        self.interval = self.min_interval
+
+    def adapt(self, active: bool) -> float:
+        """Set the interval to the next deadline from the last tick's activity."""
+        if active:
+            interval = self.min_interval
+        else:
+            interval = min(self.max_interval, self.interval * self.backoff)
+        self.set_interval(interval)
+        return interval
+
+
+def log_schedule_summary(scheduler: DeadlineScheduler) -> None:
+    """Log how closely a finished run kept to its schedule."""
+    if not scheduler.ticks:
+        return
+    interval = f"{scheduler.interval}s"
+    if isinstance(scheduler, AdaptiveScheduler):
+        interval = f"{scheduler.min_interval}-{scheduler.max_interval}s (adaptive)"
+    summary = (
+        f"{scheduler.ticks} ticks at {interval}, "
+        f"max lateness {scheduler.max_lateness * 1000:.1f} ms"
+    )
+    if scheduler.missed:
+        logger.warning(
+            f"missed {scheduler.missed} ticks ({summary}, overrun={scheduler.policy})"
+        )
+    else:
+        logger.debug(summary)
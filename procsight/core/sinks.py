@@ -0,0 +1,341 @@
+import csv
+import json
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from time import monotonic
+from typing import Any, Deque, Dict, List, Mapping, Optional, Protocol, Tuple
+
+from loguru import logger
+
+from procsight.core.leak import LeakDetector
+from procsight.core.rows import (
+    BASIC_COLUMNS,
+    EXTENDED_COLUMNS,
+    NON_METRIC_COLUMNS,
+    Row,
+    basic_from_row,
+    flatten_basic,
+    flatten_sample,
+    format_affinity,
+    nest_basic,
+    nest_row,
+    sample_from_row,
+)
+from procsight.core.stats import RunStats
+
+# flush file sinks after this many rows, or after FLUSH_SEC, whichever comes first
+BATCH_SIZE = 256
+FLUSH_SEC = 5.0
+# samples kept for plotting after a continuous run
+DEFAULT_TAIL = 10_000
+
+
+class SampleSink(Protocol):
+    """
+    Receives every sample as ``Monitor`` collects it.
+
+    ``item`` is a flat row dict (see ``procsight.core.rows``); sinks also accept
+    a ``ProcessSample`` or basic ``(CpuUsage, MemoryUsage)`` tuple.
+    """
+
+    def write(self, elapsed: float, item: Any) -> None: ...
+
+    def flush(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def to_row(item: Any, index: int, elapsed: float) -> Row:
+    """Row for a sink item: rows pass through, models are flattened."""
+    if isinstance(item, dict):
+        return item
+    if isinstance(item, tuple):
+        cpu, mem = item
+        return flatten_basic(index, cpu, mem, elapsed)
+    return flatten_sample(item, elapsed)
+
+
+class RunningSummary:
+    """Count, mean, min and max per metric column, updated one row at a time."""
+
+    def __init__(self, columns: List[str]):
+        self.columns = [c for c in columns if c not in NON_METRIC_COLUMNS]
+        self.count: Dict[str, int] = {}
+        self.total: Dict[str, float] = {}
+        self.min: Dict[str, float] = {}
+        self.max: Dict[str, float] = {}
+
+    def add(self, row: Row) -> None:
+        for key in self.columns:
+            value = row.get(key)
+            if value is None:
+                continue
+            if key in self.count:
+                self.count[key] += 1
+                self.total[key] += value
+                if value < self.min[key]:
+                    self.min[key] = value
+                if value > self.max[key]:
+                    self.max[key] = value
+            else:
+                self.count[key] = 1
+                self.total[key] = self.min[key] = self.max[key] = value
+
+    def means(self) -> Dict[str, float]:
+        return {key: self.total[key] / n for key, n in self.count.items()}
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        means = self.means()
+        return {
+            key: {
+                "count": self.count[key],
+                "mean": means[key],
+                "min": self.min[key],
+                "max": self.max[key],
+            }
+            for key in self.count
+        }
+
+
+class _BatchedFileSink(ABC):
+    """
+    Buffers formatted rows and writes them out in batches.
+
+    Subclasses format each item in ``write`` and hand it to ``_push``;
+    ``_write_rows`` writes a batch of them to ``_file``.
+    """
+
+    def __init__(
+        self, path: str, batch_size: int = BATCH_SIZE, flush_sec: float = FLUSH_SEC
+    ):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_sec = flush_sec
+        self.rows_written = 0
+        self._count = 0
+        self._pending: List[Any] = []
+        self._last_flush = monotonic()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "w", newline="", encoding="utf-8")
+
+    def _as_row(self, elapsed: float, item: Any) -> Row:
+        self._count += 1
+        return to_row(item, self._count, elapsed)
+
+    def _push(self, row: Any) -> None:
+        self._pending.append(row)
+        if (
+            len(self._pending) >= self.batch_size
+            or monotonic() - self._last_flush >= self.flush_sec
+        ):
+            self.flush()
+
+    @abstractmethod
+    def write(self, elapsed: float, item: Any) -> None: ...
+
+    @abstractmethod
+    def _write_rows(self, rows: List[Any]) -> None: ...
+
+    def flush(self) -> None:
+        if self._file.closed:
+            return
+        if self._pending:
+            self._write_rows(self._pending)
+            self.rows_written += len(self._pending)
+            self._pending = []
+        self._file.flush()
+        self._last_flush = monotonic()
+
+    def _finish(self) -> None:
+        """Hook to write trailing content before the file is closed."""
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.flush()
+        self._finish()
+        self._file.close()
+        logger.info(f"Saved {self.rows_written} samples at: {self.path}")
+
+
+class CsvSink(_BatchedFileSink):
+    """
+    Incremental CSV writer with the same columns as ``export_to_csv``.
+
+    A ``RunStats`` is kept so the trailing summary rows (p50/p95/p99/max,
+    ``above_s`` with thresholds, and ``avg`` last) are written on ``close()``
+    without holding the samples in memory. Pass ``stats`` to write the rows of
+    a ``RunStats`` fed elsewhere (e.g. by a ``StatsSink``) instead.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        extended: bool,
+        batch_size: int = BATCH_SIZE,
+        flush_sec: float = FLUSH_SEC,
+        stats: Optional[RunStats] = None,
+        thresholds: Optional[Mapping[str, float]] = None,
+    ):
+        super().__init__(path, batch_size, flush_sec)
+        self.extended = extended
+        self.columns = EXTENDED_COLUMNS if extended else BASIC_COLUMNS
+        self._writer = csv.DictWriter(
+            self._file, fieldnames=self.columns, extrasaction="ignore"
+        )
+        self._writer.writeheader()
+        self._file.flush()
+        self._own_stats = stats is None
+        self.stats = RunStats(self.columns, thresholds) if stats is None else stats
+
+    def write(self, elapsed: float, item: Any) -> None:
+        row = self._as_row(elapsed, item)
+        if self._own_stats:
+            self.stats.add(row)
+        if self.extended:
+            row = {**row, "cpu_affinity": format_affinity(row.get("cpu_affinity"))}
+        self._push(row)
+
+    def _write_rows(self, rows: List[Any]) -> None:
+        self._writer.writerows(rows)
+
+    def _finish(self) -> None:
+        self._writer.writerows(self.stats.summary_rows())
+
+
+class NdjsonSink(_BatchedFileSink):
+    """Incremental newline-delimited JSON writer (one nested sample per line)."""
+
+    def write(self, elapsed: float, item: Any) -> None:
+        row = self._as_row(elapsed, item)
+        if "pid" in row:
+            record = {"time_s": elapsed, **nest_row(row)}
+        else:
+            record = {"sample": row["sample"], "time_s": elapsed, **nest_basic(row)}
+        self._push(json.dumps(record, separators=(",", ":")))
+
+    def _write_rows(self, rows: List[Any]) -> None:
+        self._file.write("\n".join(rows) + "\n")
+
+
+class RowCsvSink(_BatchedFileSink):
+    """
+    Incremental CSV writer for row dicts with fixed ``columns``.
+
+    For side series such as the self-overhead rows: no summary rows, and
+    missing values are left empty.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        columns: List[str],
+        batch_size: int = BATCH_SIZE,
+        flush_sec: float = FLUSH_SEC,
+    ):
+        super().__init__(path, batch_size, flush_sec)
+        self.columns = list(columns)
+        self._writer = csv.DictWriter(
+            self._file, fieldnames=self.columns, extrasaction="ignore"
+        )
+        self._writer.writeheader()
+        self._file.flush()
+
+    def write(self, elapsed: float, item: Any) -> None:
+        self._push(item)
+
+    def _write_rows(self, rows: List[Any]) -> None:
+        self._writer.writerows(rows)
+
+
+class StatsSink:
+    """
+    Feeds a ``RunStats`` with every sample.
+
+    On ``close()`` the summary is logged and, with ``json_path``, saved along
+    with the sketches so the runs can be merged later (``stats.merge_files``).
+    Pass a ``LeakDetector`` to add memory trends to the summary.
+    """
+
+    def __init__(
+        self,
+        columns: List[str],
+        thresholds: Optional[Mapping[str, float]] = None,
+        json_path: Optional[str] = None,
+        leak: Optional[LeakDetector] = None,
+    ):
+        self.stats = RunStats(columns, thresholds, leak=leak)
+        self.json_path = json_path
+        self._count = 0
+        self._closed = False
+
+    def write(self, elapsed: float, item: Any) -> None:
+        self._count += 1
+        self.stats.add(to_row(item, self._count, elapsed))
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self.stats.log()
+        if self.json_path:
+            self.stats.save(self.json_path)
+
+
+class TailSink:
+    """Bounded in-memory tail of the most recent samples (for plotting)."""
+
+    def __init__(self, maxlen: int):
+        self._items: Deque[Tuple[float, Any]] = deque(maxlen=maxlen)
+
+    def write(self, elapsed: float, item: Any) -> None:
+        self._items.append((elapsed, item))
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def times(self) -> List[float]:
+        return [t for t, _ in self._items]
+
+    @property
+    def samples(self) -> List[Any]:
+        return [_as_model(item) for _, item in self._items]
+
+
+def _as_model(item: Any) -> Any:
+    # rows from Monitor become models again; other items are passed through
+    if not isinstance(item, dict):
+        return item
+    return sample_from_row(item) if "pid" in item else basic_from_row(item)
+
+
+def open_file_sink(
+    path: str,
+    extended: bool,
+    batch_size: int = BATCH_SIZE,
+    stats: Optional[RunStats] = None,
+) -> SampleSink:
+    """
+    Pick a file sink from the output extension (.ndjson/.jsonl, .parquet/.feather or CSV).
+
+    ``stats`` is the ``RunStats`` whose summary rows end a CSV file, or go
+    to the metadata of a Parquet file.
+    """
+    from procsight.core.arrow_export import ArrowSink, arrow_format
+
+    if Path(path).suffix.lower() in (".ndjson", ".jsonl"):
+        return NdjsonSink(path, batch_size=batch_size)
+    if arrow_format(Path(path)):
+        return ArrowSink(path, extended, stats=stats)
+    return CsvSink(path, extended, batch_size=batch_size, stats=stats)
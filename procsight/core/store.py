@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import math
+from array import array
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    overload,
+)
+
+from procsight.core.rows import (
+    BASIC_ROW_COLUMNS,
+    EXTENDED_ROW_COLUMNS,
+    Row,
+    basic_from_row,
+    format_affinity,
+    rows_from_samples,
+    sample_from_row,
+)
+
+# integer-valued columns that are always present; everything else numeric is
+# stored as float64 (NaN = missing)
+_INT_COLUMNS = {
+    "sample",
+    "missed",
+    "pid",
+    "threads",
+    # thread series (procsight.core.threads)
+    "rank",
+    "tid",
+}
+# low-cardinality labels, stored as int codes into a per-column category list
+_CATEGORICAL_COLUMNS = {"status", "cpu_affinity", "comm"}
+# float columns whose model field is an Optional[int]: counters a collector may
+# not read (unreadable, or skipped, see ``procsight.core.rows.probe_groups``)
+_OPTIONAL_INT_COLUMNS = {
+    "read_count",
+    "write_count",
+    "read_bytes",
+    "write_bytes",
+    "read_chars",
+    "write_chars",
+    "ctx_voluntary",
+    "ctx_involuntary",
+    "open_files",
+    "fds",
+    "processes",
+}
+
+INITIAL_CAPACITY = 1024
+
+
+def column_kind(name: str) -> str:
+    """Storage kind of a row column: ``int``, ``optional_int``, ``float`` or ``category``."""
+    if name in _CATEGORICAL_COLUMNS:
+        return "category"
+    if name in _INT_COLUMNS:
+        return "int"
+    if name in _OPTIONAL_INT_COLUMNS:
+        return "optional_int"
+    return "float"
+
+
+class SampleStore(Sequence):
+    """
+    Column-oriented storage for a run's samples.
+
+    Each metric lives in its own preallocated ``array`` column, so appending a
+    tick only writes scalars. When a column is full it is copied into a new
+    array of twice the size, never resized in place, which keeps the NumPy views
+    returned by ``column()`` valid (and zero-copy) while sampling continues.
+
+    Indexing returns the usual pydantic models (``ProcessSample`` or a basic
+    ``(CpuUsage, MemoryUsage)`` tuple), built on demand as a per-row view.
+    A store created with custom ``columns`` has no model and returns row dicts.
+    """
+
+    def __init__(
+        self,
+        extended: bool,
+        capacity: int = INITIAL_CAPACITY,
+        columns: Optional[Sequence[str]] = None,
+    ):
+        self.extended = extended
+        self._models = columns is None
+        self.columns: List[str] = list(
+            columns or (EXTENDED_ROW_COLUMNS if extended else BASIC_ROW_COLUMNS)
+        )
+        self._len = 0
+        self._capacity = max(1, capacity)
+        self._data: Dict[str, array] = {}
+        self._categories: Dict[str, List[Any]] = {}
+        self._category_codes: Dict[str, Dict[Any, int]] = {}
+        for name in self.columns:
+            if name in _CATEGORICAL_COLUMNS:
+                typecode = "i"
+                self._categories[name] = []
+                self._category_codes[name] = {}
+            elif name in _INT_COLUMNS:
+                typecode = "q"
+            else:
+                typecode = "d"
+            itemsize = array(typecode).itemsize
+            self._data[name] = array(typecode, bytes(itemsize * self._capacity))
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the stored values (excluding spare capacity)."""
+        return sum(col.itemsize for col in self._data.values()) * self._len
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        for name, col in self._data.items():
+            grown = array(col.typecode, bytes(col.itemsize * self._capacity))
+            grown[: self._len] = col[: self._len]
+            self._data[name] = grown
+
+    def _code(self, name: str, value: Any) -> int:
+        if value is None:
+            return -1
+        codes = self._category_codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._categories[name])
+            self._categories[name].append(value)
+        return code
+
+    def append(self, row: Mapping[str, Any]) -> None:
+        """Append one row (keys as in ``procsight.core.rows``)."""
+        if self._len == self._capacity:
+            self._grow()
+        i = self._len
+        for name, col in self._data.items():
+            value = row.get(name)
+            if name in self._categories:
+                col[i] = self._code(name, value)
+            elif value is None:
+                # int columns are always read; only rows rebuilt from models
+                # lack e.g. ``missed``
+                col[i] = 0 if col.typecode == "q" else math.nan
+            else:
+                col[i] = value
+        self._len += 1
+
+    def extend(self, rows: Sequence[Mapping[str, Any]]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def row(self, index: int) -> Row:
+        """Return row ``index`` as a plain dict."""
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("SampleStore index out of range")
+        out: Row = {}
+        for name, col in self._data.items():
+            value = col[index]
+            if name in self._categories:
+                out[name] = self._categories[name][value] if value >= 0 else None
+            elif col.typecode == "d" and math.isnan(value):
+                out[name] = None
+            elif name in _OPTIONAL_INT_COLUMNS:
+                out[name] = int(value)
+            else:
+                out[name] = value
+        return out
+
+    def rows(self) -> Iterator[Row]:
+        for i in range(self._len):
+            yield self.row(i)
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Any]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        row = self.row(index)
+        if not self._models:
+            return row
+        return sample_from_row(row) if self.extended else basic_from_row(row)
+
+    @property
+    def times(self) -> List[float]:
+        return self._data["time_s"][: self._len].tolist()
+
+    def column(self, name: str):
+        """
+        NumPy array of one column.
+
+        Numeric columns are zero-copy views of the store's buffer; categorical
+        columns (``status``, ``cpu_affinity``) are returned as object arrays.
+        """
+        import numpy as np
+
+        col = self._data[name]
+        if name in self._categories:
+            # code -1 (missing) indexes the trailing None
+            categories = np.empty(len(self._categories[name]) + 1, dtype=object)
+            for code, value in enumerate(self._categories[name]):
+                categories[code] = value
+            return categories[np.frombuffer(col, dtype=np.int32)[: self._len]]
+        dtype = np.int64 if col.typecode == "q" else np.float64
+        return np.frombuffer(col, dtype=dtype)[: self._len]
+
+    def categorical(self, name: str) -> Tuple[Any, List[Any]]:
+        """Codes (NumPy int32 view, -1 = missing) and categories of a label column."""
+        import numpy as np
+
+        codes = np.frombuffer(self._data[name], dtype=np.int32)[: self._len]
+        return codes, list(self._categories[name])
+
+    def to_dataframe(self, columns: Optional[Sequence[str]] = None):
+        """
+        Build a pandas DataFrame from the columns without per-row conversion.
+
+        ``status`` becomes a categorical and ``cpu_affinity`` a categorical of
+        ``0;1;2`` strings, matching the CSV layout.
+        """
+        import pandas as pd
+
+        data = {}
+        for name in columns or self.columns:
+            if name in self._categories:
+                codes, categories = self.categorical(name)
+                if name == "cpu_affinity":
+                    categories = [format_affinity(c) for c in categories]
+                data[name] = pd.Categorical.from_codes(codes, categories=categories)
+            else:
+                data[name] = self.column(name)
+        return pd.DataFrame(data)
+
+
+def as_store(
+    data: Any,
+    extended: Optional[bool] = None,
+    times: Optional[Sequence[float]] = None,
+) -> SampleStore:
+    """
+    The canonical columnar form of a run, which export, plots and stats all read.
+
+    A ``SampleStore`` is returned as is. A list of ``ProcessSample`` or basic
+    ``(CpuUsage, MemoryUsage)`` tuples is flattened once into a new store, with
+    ``times`` as its ``time_s`` column, and the counter rates computed from
+    it. ``extended`` is inferred from the items when not given.
+    """
+    if isinstance(data, SampleStore):
+        return data
+    data = list(data)
+    if extended is None:
+        extended = bool(data) and not isinstance(data[0], tuple)
+    store = SampleStore(extended, capacity=max(1, len(data)))
+    store.extend(rows_from_samples(extended, data, times))
+    if extended:
+        # models carry no rates; derive them from the counters in one pass
+        from procsight.core.rates import fill_rates
+
+        fill_rates(store)
+    return store
@@ -0,0 +1,255 @@
+"""
+Per-thread CPU usage.
+
+``ThreadCpuReader`` reads user and system CPU time of every thread of a
+process. On Linux it reads ``/proc/<pid>/task/<tid>/stat``. The task directory
+and each thread's ``stat`` stay open between ticks and are re-read with
+``os.preadv``, so a tick costs one directory listing plus one read per
+thread. Elsewhere it uses ``psutil.Process.threads()``, which has no thread
+names.
+
+``ThreadTracker`` turns the deltas between ticks into per-thread CPU% and
+emits only the ``top_k`` busiest threads of each tick, so a tick writes at
+most ``top_k`` rows however many threads the process has. Rows are streamed
+to sinks; they are kept in memory only with ``retain``. A thread that reaches
+``hot_percent`` of a core is logged once as a hot thread.
+"""
+
+import heapq
+import os
+from time import monotonic
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import psutil
+from loguru import logger
+
+from procsight.core.procfs import parse_stat, procfs_available
+from procsight.core.rows import Row
+from procsight.core.sinks import SampleSink
+from procsight.core.store import SampleStore
+
+# columns of the thread series: one row per kept thread per tick
+THREAD_COLUMNS = [
+    "sample",
+    "time_s",
+    "rank",
+    "tid",
+    "comm",
+    "cpu_percent",
+    "user_percent",
+    "system_percent",
+]
+DEFAULT_TOP_K = 5
+# a thread above this share of one core is reported as hot
+HOT_THREAD_PERCENT = 80.0
+# thread stat files kept open between ticks; threads beyond this are opened per read
+MAX_CACHED_FDS = 512
+
+# tid -> (comm, user seconds, system seconds)
+ThreadTimes = Dict[int, Tuple[str, float, float]]
+
+
+class ThreadCpuReader:
+    """Cumulative user/system CPU seconds of every thread of ``pid``."""
+
+    def __init__(self, pid: int, backend: str = "auto"):
+        self.pid = pid
+        self._task_fd: Optional[int] = None
+        self._fds: Dict[int, int] = {}
+        self._buf = bytearray(1024)
+        self._clk_tck = 100.0
+        self._proc: Optional[psutil.Process] = None
+        if backend != "psutil" and procfs_available():
+            try:
+                self._task_fd = os.open(
+                    f"/proc/{pid}/task", os.O_RDONLY | os.O_DIRECTORY
+                )
+                self._clk_tck = float(os.sysconf("SC_CLK_TCK"))
+            except FileNotFoundError:
+                raise psutil.NoSuchProcess(pid)
+            except PermissionError:
+                if backend == "procfs":
+                    raise
+        if self._task_fd is None:
+            self._proc = psutil.Process(pid)
+
+    def close(self) -> None:
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds.clear()
+        if self._task_fd is not None:
+            os.close(self._task_fd)
+            self._task_fd = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def read(self) -> ThreadTimes:
+        if self._proc is not None:
+            try:
+                threads = self._proc.threads()
+            except psutil.AccessDenied:
+                return {}
+            return {t.id: ("", t.user_time, t.system_time) for t in threads}
+        try:
+            names = os.listdir(self._task_fd)
+        except (FileNotFoundError, ProcessLookupError):
+            raise psutil.NoSuchProcess(self.pid)
+
+        out: ThreadTimes = {}
+        for name in names:
+            tid = int(name)
+            data = self.__read_stat(tid)
+            if data is None:
+                continue  # the thread exited since the listing
+            fields = parse_stat(data)
+            comm = data[data.find(b"(") + 1 : data.rfind(b")")].decode(errors="replace")
+            out[tid] = (
+                comm,
+                int(fields[11]) / self._clk_tck,
+                int(fields[12]) / self._clk_tck,
+            )
+        for tid in [t for t in self._fds if t not in out]:
+            os.close(self._fds.pop(tid))
+        return out
+
+    def __read_stat(self, tid: int) -> Optional[bytes]:
+        fd = self._fds.get(tid)
+        cached = fd is not None
+        try:
+            if fd is None:
+                fd = os.open(f"{tid}/stat", os.O_RDONLY, dir_fd=self._task_fd)
+                if len(self._fds) < MAX_CACHED_FDS:
+                    self._fds[tid] = fd
+                    cached = True
+            n = os.preadv(fd, [self._buf], 0)
+        except (FileNotFoundError, ProcessLookupError):
+            if cached:
+                os.close(self._fds.pop(tid))
+            return None
+        finally:
+            if fd is not None and not cached:
+                os.close(fd)
+        return bytes(self._buf[:n])
+
+
+class ThreadTracker:
+    """
+    Per-thread CPU% of one process, top ``top_k`` threads per tick.
+
+    CPU% is a share of one core, as ``top -H`` shows it, so a thread that
+    keeps a core busy reads 100. Rows (see ``THREAD_COLUMNS``) are ranked
+    from 1 (busiest) and go to ``sinks`` and, with ``retain``, to ``series``.
+    Threads that used no CPU since the last tick are left out.
+
+    ``totals`` holds the CPU seconds over the run of the live threads and of
+    the ``top_k`` busiest threads that have exited, so thread churn does not
+    grow it.
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        top_k: int = DEFAULT_TOP_K,
+        backend: str = "auto",
+        hot_percent: float = HOT_THREAD_PERCENT,
+        sinks: Sequence[SampleSink] = (),
+        retain: bool = True,
+    ):
+        if top_k < 1:
+            raise ValueError("top_k must be >= 1.")
+        self.top_k = top_k
+        self.hot_percent = hot_percent
+        self.reader = ThreadCpuReader(pid, backend)
+        self.series = SampleStore(extended=False, columns=THREAD_COLUMNS)
+        self.sinks = list(sinks)
+        self.retain = retain
+        self.totals: Dict[int, Tuple[str, float]] = {}
+        self._last: Dict[int, Tuple[float, float]] = {}
+        self._last_wall: Optional[float] = None
+        self._hot: set = set()
+
+    def close(self) -> None:
+        self.reader.close()
+        for sink in self.sinks:
+            sink.close()
+
+    def prime(self) -> None:
+        """Take the baseline the first tick's deltas are measured from."""
+        self._last = {tid: (u, s) for tid, (_, u, s) in self.reader.read().items()}
+        self._last_wall = monotonic()
+
+    def update(self, sample_index: int, elapsed: float) -> List[Row]:
+        threads = self.reader.read()
+        now = monotonic()
+        dt = now - self._last_wall if self._last_wall is not None else 0.0
+        self._last_wall = now
+
+        busy = []
+        last = self._last
+        for tid, (comm, user, system) in threads.items():
+            # a thread not seen before started since the last tick, from zero
+            last_user, last_system = last.get(tid, (0.0, 0.0))
+            du = max(0.0, user - last_user)
+            ds = max(0.0, system - last_system)
+            if du or ds:
+                busy.append((du + ds, tid, comm, du, ds))
+                _, total = self.totals.get(tid, (comm, 0.0))
+                self.totals[tid] = (comm, total + du + ds)
+        self._last = {tid: (u, s) for tid, (_, u, s) in threads.items()}
+        self.__forget_exited(threads)
+        if dt <= 0:
+            return []
+
+        rows = []
+        for rank, (cpu_s, tid, comm, du, ds) in enumerate(
+            heapq.nlargest(self.top_k, busy), start=1
+        ):
+            row: Row = {
+                "sample": sample_index,
+                "time_s": elapsed,
+                "rank": rank,
+                "tid": tid,
+                "comm": comm,
+                "cpu_percent": cpu_s / dt * 100,
+                "user_percent": du / dt * 100,
+                "system_percent": ds / dt * 100,
+            }
+            if row["cpu_percent"] >= self.hot_percent and tid not in self._hot:
+                self._hot.add(tid)
+                logger.warning(
+                    f"hot thread {comm or '?'} (tid {tid}) at "
+                    f"{row['cpu_percent']:.0f}% of a core"
+                )
+            for sink in self.sinks:
+                sink.write(elapsed, row)
+            if self.retain:
+                self.series.append(row)
+            rows.append(row)
+        return rows
+
+    def __forget_exited(self, threads: ThreadTimes) -> None:
+        self._hot.intersection_update(threads)
+        if len(self.totals) <= len(threads) + self.top_k:
+            return
+        exited = [tid for tid in self.totals if tid not in threads]
+        keep = set(heapq.nlargest(self.top_k, exited, key=lambda t: self.totals[t][1]))
+        for tid in exited:
+            if tid not in keep:
+                del self.totals[tid]
+
+    def log_summary(self) -> None:
+        busiest = heapq.nlargest(
+            self.top_k, self.totals.items(), key=lambda kv: kv[1][1]
+        )
+        if not busiest:
+            return
+        logger.info(
+            "busiest threads (CPU s): "
+            + ", ".join(
+                f"{comm or '?'} ({tid}) {cpu_s:.2f}" for tid, (comm, cpu_s) in busiest
+            )
+        )
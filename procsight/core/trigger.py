@@ -0,0 +1,209 @@
+"""
+Triggered capture.
+
+A long run at a cheap interval (e.g. every 5 s) writes nothing to disk. It
+keeps its last ``pre_s`` seconds of rows in a fixed-size ring buffer. When a
+``Condition`` fires, the monitor switches to ``capture_interval`` for
+``window_s`` seconds. The buffered rows and the window go to a file of their
+own, then the monitor drops back to its base interval. Only these incident
+files are written.
+
+Conditions are parsed from specs by ``parse_condition``::
+
+    rss_mb>2048        RSS above 2048 MB
+    cpu_percent>80x3   CPU above 80% for 3 ticks in a row
+    fds+10x12          fds grew by at least 10 over the last 12 ticks
+
+Conditions are checked at the base interval only. After a capture, a
+condition that still holds does not fire again until it has cleared once.
+
+At the base interval only the probes the conditions need are read, so the
+buffered rows have empty extended columns apart from those. The capture
+window reads every column.
+"""
+
+import math
+import re
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, List, Mapping, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from procsight.core.rates import RATES
+from procsight.core.rows import Row
+from procsight.core.sinks import SampleSink, open_file_sink
+
+if TYPE_CHECKING:
+    from procsight.core.monitor import Monitor
+
+OPERATORS = (">", "<", "+")
+DEFAULT_CAPTURE_INTERVAL = 0.1
+DEFAULT_WINDOW_SEC = 60.0
+DEFAULT_PRE_SEC = 30.0
+
+# rate column -> the counter it is derived from
+_COUNTERS = {rate: counter for counter, (rate, _) in RATES.items()}
+
+_SPEC = re.compile(
+    r"^\s*(\w+)\s*([<>+])\s*([-+]?[0-9.]+(?:[eE][-+]?\d+)?)(?:x(\d+))?\s*$"
+)
+
+
+class Condition:
+    """
+    One trigger on a row column.
+
+    ``>`` and ``<`` fire once the value has been beyond ``value`` for ``ticks``
+    ticks in a row. ``+`` fires once the value has grown by at least ``value``
+    over the last ``ticks`` ticks. A missing value clears the condition.
+    """
+
+    def __init__(self, column: str, op: str, value: float, ticks: int = 1):
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator {op!r} (expected one of {OPERATORS}).")
+        if ticks < 1:
+            raise ValueError("ticks must be >= 1.")
+        self.column = column
+        self.op = op
+        self.value = value
+        self.ticks = ticks
+        self._history: Deque[float] = deque(maxlen=ticks + 1 if op == "+" else ticks)
+
+    @property
+    def spec(self) -> str:
+        return f"{self.column}{self.op}{self.value:g}" + (
+            f"x{self.ticks}" if self.ticks > 1 else ""
+        )
+
+    def reset(self) -> None:
+        self._history.clear()
+
+    def update(self, row: Mapping[str, Any]) -> bool:
+        value = row.get(self.column)
+        if value is None or math.isnan(value):
+            self._history.clear()
+            return False
+        if self.op == "+":
+            self._history.append(value)
+            full = len(self._history) == self._history.maxlen
+            return full and value - self._history[0] >= self.value
+        beyond = value > self.value if self.op == ">" else value < self.value
+        if not beyond:
+            self._history.clear()
+            return False
+        self._history.append(value)
+        return len(self._history) == self._history.maxlen
+
+
+def parse_condition(spec: str) -> Condition:
+    """``Condition`` from ``METRIC>VALUE``, ``METRIC<VALUE`` or ``METRIC+DELTA``, with optional ``xTICKS``."""
+    match = _SPEC.match(spec)
+    if match is None:
+        raise ValueError(
+            f"Bad trigger {spec!r} (expected e.g. rss_mb>2048, cpu_percent>80x3 or fds+10x12)."
+        )
+    column, op, value, ticks = match.groups()
+    return Condition(column, op, float(value), int(ticks or 1))
+
+
+class TriggeredCapture:
+    """
+    Runs ``monitor`` cheaply and writes only the windows around triggers.
+
+    ``monitor.interval`` is the base rate. Each capture is written to
+    ``<out stem>_trigger<N><suffix>`` (CSV, NDJSON or Arrow, as for ``--out``).
+    It holds the buffered rows of the last ``pre_s`` seconds, then ``window_s``
+    seconds sampled every ``capture_interval``. Conditions can use any extended
+    column. At the base rate only their columns are read (see
+    ``Monitor.set_columns``), and the window has all of them. The paths
+    written are kept in ``incidents``.
+    """
+
+    def __init__(
+        self,
+        monitor: "Monitor",
+        conditions: Sequence[Condition],
+        out: str,
+        capture_interval: float = DEFAULT_CAPTURE_INTERVAL,
+        window_s: float = DEFAULT_WINDOW_SEC,
+        pre_s: float = DEFAULT_PRE_SEC,
+    ):
+        if not conditions:
+            raise ValueError("TriggeredCapture needs at least one condition.")
+        if capture_interval <= 0 or window_s <= 0 or pre_s < 0:
+            raise ValueError(
+                "capture_interval and window_s must be > 0, pre_s must be >= 0."
+            )
+        self.monitor = monitor
+        self.conditions = list(conditions)
+        self.out = Path(out)
+        self.capture_interval = capture_interval
+        self.window_s = window_s
+        self.pre_s = pre_s
+        self.incidents: List[str] = []
+        referenced = {c.column for c in self.conditions}
+        self.columns = referenced | {_COUNTERS[c] for c in referenced if c in _COUNTERS}
+        # the trigger tick itself plus pre_s seconds of base-rate ticks before it
+        self._ring: Deque[Tuple[float, Row]] = deque(
+            maxlen=math.ceil(pre_s / monitor.interval) + 1
+        )
+
+    def run(self, duration: int = 0, samples: int = 0) -> List[str]:
+        """Sample until the run ends (same modes as ``Monitor``); returns the incident files."""
+        monitor = self.monitor
+        monitor.set_columns(self.columns)
+        stream = monitor.iter_samples(duration, samples, extended=True, rows=True)
+        sink: Optional[SampleSink] = None
+        armed = True
+        until = 0.0
+        try:
+            for elapsed, row in stream:
+                if sink is not None:
+                    sink.write(elapsed, row)
+                    if elapsed >= until:
+                        sink.close()
+                        sink = None
+                        monitor.set_interval(monitor.interval)
+                        monitor.set_columns(self.columns)
+                        self._ring.clear()
+                        for condition in self.conditions:
+                            condition.reset()
+                    continue
+
+                self._ring.append((elapsed, row))
+                fired = [c.spec for c in self.conditions if c.update(row)]
+                if not fired:
+                    armed = True
+                    continue
+                if not armed:
+                    continue
+                armed = False
+                sink = self.__open(elapsed, fired)
+                until = elapsed + self.window_s
+                monitor.set_interval(self.capture_interval)
+                monitor.set_columns(None)
+        finally:
+            stream.close()
+            monitor.set_columns(None)
+            if sink is not None:
+                sink.close()
+        return self.incidents
+
+    def __open(self, elapsed: float, fired: List[str]) -> SampleSink:
+        path = str(
+            self.out.with_name(
+                f"{self.out.stem}_trigger{len(self.incidents) + 1}{self.out.suffix}"
+            )
+        )
+        self.incidents.append(path)
+        logger.warning(
+            f"trigger {', '.join(fired)} fired at {elapsed:.1f}s: capturing "
+            f"{self.window_s:g}s every {self.capture_interval:g}s to {path}"
+        )
+        sink = open_file_sink(path, extended=True)
+        for t, row in self._ring:
+            if t >= elapsed - self.pre_s:
+                sink.write(t, row)
+        self._ring.clear()
+        return sink
@@ -15,25 +15,26 @@ class MemoryUsage(BaseModel):
     shared: Optional[float] = None
     data: Optional[float] = None
     text: Optional[float] = None
+    pss: Optional[float] = None
 
 
 class IOUsage(BaseModel):
-    read_count: int
-    write_count: int
-    read_bytes: int
-    write_bytes: int
+    read_count: Optional[int]
+    write_count: Optional[int]
+    read_bytes: Optional[int]
+    write_bytes: Optional[int]
     read_chars: Optional[int] = None
     write_chars: Optional[int] = None
 
 
 class ContextSwitchesUsage(BaseModel):
-    voluntary: int
-    involuntary: int
+    voluntary: Optional[int]
+    involuntary: Optional[int]
 
 
 class DescriptorUsage(BaseModel):
-    open_files: int
-    fds: int
+    open_files: Optional[int]
+    fds: Optional[int]
 
 
 class ThreadUsage(BaseModel):
@@ -45,6 +46,7 @@ class ProcessMeta(BaseModel):
     uptime_sec: float
     status: str
     cpu_affinity: Optional[List[int]] = None
+    processes: Optional[int] = None
 
 
 class ProcessSample(BaseModel):
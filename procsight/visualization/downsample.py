@@ -0,0 +1,99 @@
+"""
+Downsampling for plotting long recordings.
+
+A line chart cannot show more points than the axes are pixels wide, so long
+runs are reduced before drawing: ``lttb`` picks the points that best keep the
+shape of the line (Largest-Triangle-Three-Buckets), and ``minmax_envelope``
+keeps the extremes of every bucket so short spikes stay visible when drawn
+as a band behind the line. Both run in NumPy; their cost depends on the
+output size, not on how long the run was.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Tuple
+
+import numpy as np
+
+# output points per horizontal pixel of the axes
+POINTS_PER_PIXEL = 1.0
+# below this many points a series is always drawn as is
+MIN_POINTS = 64
+
+
+def target_points(width_in: float, dpi: int, max_points: int | None = None) -> int:
+    """
+    How many points to draw in a figure ``width_in`` inches wide.
+
+    ``max_points=None`` sizes it to the figure's pixel width; ``0`` disables
+    downsampling.
+    """
+    if max_points is not None:
+        return max_points
+    return max(MIN_POINTS, int(width_in * dpi * POINTS_PER_PIXEL))
+
+
+def _buckets(n_points: int, n_buckets: int) -> np.ndarray:
+    """Start index of each of ``n_buckets`` contiguous, near-equal buckets."""
+    return np.linspace(0, n_points, n_buckets + 1).astype(np.int64)[:-1]
+
+
+def lttb(x: Sequence[float], y: Sequence[float], n_out: int) -> np.ndarray:
+    """
+    Indices of the ``n_out`` points LTTB keeps (always the first and last).
+
+    Missing (NaN) values count as 0 when choosing points.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets between the fixed first and last point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts = edges[:-1]
+    ends = edges[1:]
+    # average of the *next* bucket, the third corner of each triangle
+    sum_x = np.add.reduceat(x[:-1], starts)
+    sum_y = np.add.reduceat(y[:-1], starts)
+    counts = np.diff(edges)
+    avg_x = np.append((sum_x / counts)[1:], x[-1])
+    avg_y = np.append((sum_y / counts)[1:], y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    # each step depends on the point chosen in the previous bucket
+    for i in range(n_out - 2):
+        lo, hi = starts[i], ends[i]
+        xs, ys = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x[i]) * (ys - y[a]) - (x[a] - xs) * (avg_y[i] - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def minmax_envelope(
+    x: Sequence[float], y: Sequence[float], n_buckets: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-bucket ``(x start, min, max)`` of ``y``, ignoring NaN."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    starts = _buckets(len(y), max(1, min(n_buckets, len(y))))
+    missing = np.isnan(y)
+    lo = np.minimum.reduceat(np.where(missing, np.inf, y), starts)
+    hi = np.maximum.reduceat(np.where(missing, -np.inf, y), starts)
+    empty = np.isinf(lo)
+    lo[empty] = hi[empty] = np.nan
+    return x[starts], lo, hi
+
+
+def downsample(
+    x: Sequence[float], y: Sequence[float], n_out: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """``(x, y)`` reduced to at most ``n_out`` points with LTTB."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    idx = lttb(x, y, n_out)
+    return x[idx], y[idx]
@@ -0,0 +1,259 @@
+"""
+Live plots while sampling.
+
+``LivePlot`` is a sink: the sampling thread appends each row to a bounded
+rolling window, and the GUI thread redraws on its own timer. Redraws use
+blitting. The static parts of the figure (axes, ticks, labels) are cached as a
+background, and only the lines are re-rendered with their new data. A full
+redraw happens only when a y-range has to grow or shrink. The x axis is fixed
+to "seconds before the latest sample", so a moving window never needs one.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+import matplotlib.pyplot as plt
+import numpy as np
+from loguru import logger
+from matplotlib.lines import Line2D
+
+from procsight.core.sinks import to_row
+from procsight.visualization.style import Theme, apply_style
+
+_MB = 1024**2
+
+# seconds of history shown
+DEFAULT_WINDOW_SEC = 300.0
+# seconds between redraws
+REFRESH_SEC = 0.5
+
+# (title, y label, [(column, legend label, scale)])
+Panel = Tuple[str, str, List[Tuple[str, str, float]]]
+
+BASIC_PANELS: List[Panel] = [
+    ("CPU", "CPU % (per core)", [("cpu_percent", "CPU %", 1.0)]),
+    ("Memory", "RSS (MB)", [("rss_mb", "RSS MB", 1.0)]),
+]
+EXTENDED_PANELS: List[Panel] = BASIC_PANELS + [
+    (
+        "I/O",
+        "MB/s",
+        [
+            ("read_bytes_per_s", "Read", 1 / _MB),
+            ("write_bytes_per_s", "Write", 1 / _MB),
+        ],
+    ),
+    (
+        "Context switches",
+        "Per second",
+        [
+            ("ctx_voluntary_per_s", "Voluntary", 1.0),
+            ("ctx_involuntary_per_s", "Involuntary", 1.0),
+        ],
+    ),
+    (
+        "Descriptors and threads",
+        "Count",
+        [("fds", "FDs", 1.0), ("threads", "Threads", 1.0)],
+    ),
+]
+
+
+def _y_range(values: Sequence[np.ndarray]) -> Optional[Tuple[float, float]]:
+    finite = [v[np.isfinite(v)] for v in values]
+    finite = [v for v in finite if len(v)]
+    if not finite:
+        return None
+    return min(0.0, min(float(v.min()) for v in finite)), max(
+        float(v.max()) for v in finite
+    )
+
+
+class LivePlot:
+    """
+    Rolling-window figure fed as a ``SampleSink``.
+
+    ``write`` is called from the sampling thread and only appends to the
+    window under a lock. ``update`` runs on the figure's timer in the GUI
+    thread every ``refresh_sec`` seconds, so drawing never runs inside a
+    sampling tick.
+    """
+
+    def __init__(
+        self,
+        extended: bool,
+        interval: float,
+        window_sec: float = DEFAULT_WINDOW_SEC,
+        refresh_sec: float = REFRESH_SEC,
+        theme: Theme = "light",
+        title: str | None = None,
+    ):
+        apply_style(theme=theme)
+        self.window_sec = window_sec
+        self.panels = EXTENDED_PANELS if extended else BASIC_PANELS
+        maxlen = int(math.ceil(window_sec / interval)) + 1
+        self._lock = threading.Lock()
+        self._count = 0
+        self._dirty = False
+        self._times: Deque[float] = deque(maxlen=maxlen)
+        self._columns: Dict[str, Deque[float]] = {
+            name: deque(maxlen=maxlen)
+            for _, _, series in self.panels
+            for name, _, _ in series
+        }
+
+        self.fig, axes = plt.subplots(
+            len(self.panels),
+            1,
+            figsize=(9, 1.2 + 2.0 * len(self.panels)),
+            sharex=True,
+            squeeze=False,
+        )
+        self.axes = list(axes[:, 0])
+        self._lines: List[Tuple[Line2D, str, float]] = []
+        self._panel_lines: List[List[Line2D]] = []
+        for ax, (panel_title, ylabel, series) in zip(self.axes, self.panels):
+            lines = []
+            for name, label, scale in series:
+                # animated lines are left out of full draws and blitted instead
+                (line,) = ax.plot([], [], label=label, animated=True)
+                self._lines.append((line, name, scale))
+                lines.append(line)
+            self._panel_lines.append(lines)
+            ax.set_title(panel_title, loc="left")
+            ax.set_ylabel(ylabel)
+            ax.set_xlim(-window_sec, 0)
+            ax.set_ylim(0, 1)
+            ax.legend(loc="upper left", frameon=False)
+        self.axes[-1].set_xlabel("Seconds before latest sample")
+        if title:
+            self.fig.suptitle(title)
+        self.fig.tight_layout()
+
+        self._background = None
+        self.fig.canvas.mpl_connect("draw_event", self._on_draw)
+        self._timer = self.fig.canvas.new_timer(interval=int(refresh_sec * 1000))
+        self._timer.add_callback(self.update)
+
+    # -- sink interface (sampling thread) ---------------------------------
+
+    def write(self, elapsed: float, item) -> None:
+        self._count += 1
+        row = to_row(item, self._count, elapsed)
+        with self._lock:
+            self._times.append(elapsed)
+            for name, values in self._columns.items():
+                value = row.get(name)
+                values.append(math.nan if value is None else value)
+            self._dirty = True
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self._timer.stop()
+
+    # -- drawing (GUI thread) ---------------------------------------------
+
+    def start(self) -> None:
+        self._timer.start()
+
+    def _on_draw(self, event) -> None:
+        # a full draw just happened (first show, resize, rescale): cache it
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self) -> None:
+        for line, _, _ in self._lines:
+            line.axes.draw_artist(line)
+
+    def _snapshot(self) -> Optional[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+        with self._lock:
+            if not self._dirty or not self._times:
+                return None
+            self._dirty = False
+            times = np.array(self._times)
+            columns = {
+                name: np.array(values, dtype=np.float64)
+                for name, values in self._columns.items()
+            }
+        return times, columns
+
+    def _rescale(self, ax, lines) -> bool:
+        y_range = _y_range([line.get_ydata() for line in lines])
+        if y_range is None:
+            return False
+        lo, hi = y_range
+        cur_lo, cur_hi = ax.get_ylim()
+        # grow with headroom; shrink only when the data uses under a quarter
+        grow = lo < cur_lo or hi > cur_hi
+        shrink = hi > lo and hi < cur_lo + (cur_hi - cur_lo) / 4
+        if not (grow or shrink):
+            return False
+        span = hi - lo or max(abs(hi), 1.0)
+        ax.set_ylim(lo, hi + span * 0.2)
+        return True
+
+    def update(self) -> None:
+        """Push the latest window to the lines and blit them."""
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return
+        times, columns = snapshot
+        x = times - times[-1]
+        for line, name, scale in self._lines:
+            line.set_data(x, columns[name] * scale)
+
+        rescaled = False
+        for ax, lines in zip(self.axes, self._panel_lines):
+            rescaled |= self._rescale(ax, lines)
+
+        canvas = self.fig.canvas
+        if rescaled or self._background is None:
+            # full redraw; the draw_event handler re-caches the background
+            canvas.draw()
+        else:
+            canvas.restore_region(self._background)
+            self._draw_lines()
+        canvas.blit(self.fig.bbox)
+
+    def save(self, path: str, dpi: int = 144) -> None:
+        """Save the current window as a static image (lines included)."""
+        self.update()
+        for line, _, _ in self._lines:
+            line.set_animated(False)
+        try:
+            self.fig.savefig(path, dpi=dpi, bbox_inches="tight")
+        finally:
+            for line, _, _ in self._lines:
+                line.set_animated(True)
+        logger.info(f"Saved live plot at: {path}")
+
+
+def run_live(monitor, live: LivePlot, duration: int, samples: int, extended: bool):
+    """
+    Sample with ``monitor`` in a background thread while ``live`` is shown.
+
+    Returns when the window is closed, Ctrl+C is pressed, or the run ends. On
+    a non-interactive backend ``plt.show()`` returns at once; sampling then
+    simply runs to completion.
+    """
+    monitor.start_background(duration, samples, extended)
+    live.start()
+    try:
+        plt.show()
+        if plt.fignum_exists(live.fig.number):
+            logger.warning(
+                "matplotlib backend is not interactive; sampling without live view"
+            )
+            monitor.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.stop()
+        live.close()
+        monitor.join()
@@ -1,18 +1,32 @@
 from __future__ import annotations
 
-from itertools import accumulate
-from typing import Sequence, Tuple
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+from typing import TYPE_CHECKING, Any, Dict, Sequence, Tuple
 
 import matplotlib.pyplot as plt
-import pandas as pd
+import numpy as np
 import seaborn as sns
 from matplotlib.axes import Axes
 from matplotlib.figure import Figure
 from matplotlib.ticker import MaxNLocator
 
-from procsight.models.metrics import CpuUsage, MemoryUsage, ProcessSample
+from procsight.core.rows import NON_METRIC_COLUMNS
+from procsight.core.store import SampleStore, as_store
+from procsight.visualization.downsample import (
+    downsample,
+    lttb,
+    minmax_envelope,
+    target_points,
+)
 from procsight.visualization.style import Theme, apply_style
 
+if TYPE_CHECKING:
+    from procsight.models.metrics import CpuUsage, MemoryUsage, ProcessSample
+
+_MB = 1024**2
+
 
 def _finalize(fig: Figure, ax: Axes, *, title: str | None = None) -> None:
     if title:
@@ -23,6 +37,31 @@ def _finalize(fig: Figure, ax: Axes, *, title: str | None = None) -> None:
     fig.tight_layout()
 
 
+def _column(store: SampleStore, name: str, fill_missing: bool = False):
+    """NumPy view of one metric (missing values as 0 with ``fill_missing``)."""
+    values = store.column(name)
+    return np.nan_to_num(values) if fill_missing else values
+
+
+def _line(ax: Axes, times, values, n_out: int, **kwargs) -> None:
+    """
+    Plot one series, reduced to ``n_out`` points when it is longer.
+
+    The reduced line is drawn over a min/max band of the full data, so spikes
+    LTTB drops between two kept points still show.
+    """
+    x = np.asarray(times, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+    if not n_out or len(x) <= n_out:
+        ax.plot(x, y, **kwargs)
+        return
+    (line,) = ax.plot(*downsample(x, y, n_out), **kwargs)
+    bx, lo, hi = minmax_envelope(x, y, n_out // 2)
+    ax.fill_between(
+        bx, lo, hi, step="post", color=line.get_color(), alpha=0.2, linewidth=0
+    )
+
+
 def plot_cpu_usage(
     data: Sequence[Tuple[CpuUsage, MemoryUsage]],
     times: Sequence[float],
@@ -32,10 +71,19 @@ def plot_cpu_usage(
     dpi: int = 144,
     transparent: bool = False,
     theme: Theme = "light",
+    max_points: int | None = None,
 ):
     apply_style(theme=theme)  # ensure consistent look
+    data = as_store(data, times=times)
     fig, ax = plt.subplots(figsize=(9, 4))
-    ax.plot(times, [cpu.process for cpu, _ in data], label="CPU % (per core)")
+    n_out = target_points(fig.get_figwidth(), dpi, max_points)
+    _line(
+        ax,
+        times,
+        _column(data, "cpu_percent"),
+        n_out,
+        label="CPU % (per core)",
+    )
     ax.set_ylabel("CPU per-core usage (%)")
     ax.set_xlabel("Time (s)")
     _finalize(fig, ax, title="CPU Utilization Over Time")
@@ -58,17 +106,14 @@ def plot_memory_usage(
     dpi: int = 144,
     transparent: bool = False,
     theme: Theme = "light",
+    max_points: int | None = None,
 ):
     apply_style(theme=theme)
+    data = as_store(data, times=times)
     fig, ax = plt.subplots(figsize=(9, 4))
+    n_out = target_points(fig.get_figwidth(), dpi, max_points)
 
-    # When called from basic mode, data is tuples; from extended, it's ProcessSample
-    def _rss_mb(item) -> float:
-        if isinstance(item, tuple):
-            return item[1].rss
-        return item.memory.rss
-
-    ax.plot(times, [_rss_mb(i) for i in data], label="RSS MB")
+    _line(ax, times, _column(data, "rss_mb"), n_out, label="RSS MB")
     ax.set_ylabel("Memory RSS (MB)")
     ax.set_xlabel("Time (s)")
     _finalize(fig, ax, title="Resident Memory Over Time")
@@ -91,15 +136,35 @@ def plot_cpu_components(
     dpi: int = 144,
     transparent: bool = False,
     theme: Theme = "light",
+    max_points: int | None = None,
 ):
     apply_style(theme=theme)
+    samples = as_store(samples, times=times)
     fig, ax = plt.subplots(figsize=(9, 4))
-    ax.plot(times, [s.cpu.user or 0 for s in samples], label="User (s)")
-    ax.plot(times, [s.cpu.system or 0 for s in samples], label="System (s)")
-    ax.plot(
-        times, [s.cpu.process for s in samples], label="Total % (per core)", alpha=0.7
+    n_out = target_points(fig.get_figwidth(), dpi, max_points)
+    _line(
+        ax,
+        times,
+        _column(samples, "cpu_user_percent"),
+        n_out,
+        label="User %",
+    )
+    _line(
+        ax,
+        times,
+        _column(samples, "cpu_system_percent"),
+        n_out,
+        label="System %",
+    )
+    _line(
+        ax,
+        times,
+        _column(samples, "cpu_percent"),
+        n_out,
+        label="Total %",
+        alpha=0.7,
     )
-    ax.set_ylabel("CPU (per-core % / seconds)")
+    ax.set_ylabel("CPU % (per core)")
     ax.set_xlabel("Time (s)")
     _finalize(fig, ax, title="CPU Breakdown")
     if save_path:
@@ -118,20 +183,26 @@ def plot_memory_breakdown(
     dpi: int = 144,
     transparent: bool = False,
     theme: Theme = "light",
+    max_points: int | None = None,
 ):
     apply_style(theme=theme)
+    samples = as_store(samples, times=times)
     fig, ax = plt.subplots(figsize=(9, 4))
-    rss = [s.memory.rss for s in samples]
-    shared = [s.memory.shared or 0 for s in samples]
-    data = [s.memory.data or 0 for s in samples]
-    text = [s.memory.text or 0 for s in samples]
-
+    n_out = target_points(fig.get_figwidth(), dpi, max_points)
+    rss = _column(samples, "rss_mb")
+    shared = _column(samples, "shared_mb", True)
+    data = _column(samples, "data_mb", True)
+    text = _column(samples, "text_mb", True)
+
+    # one set of LTTB points for every layer, chosen on the stack's total height
+    x = np.asarray(times, dtype=np.float64)
+    layers = [np.asarray(v, dtype=np.float64) for v in (rss, shared, data, text)]
+    if n_out and len(x) > n_out:
+        idx = lttb(x, np.sum(layers, axis=0), n_out)
+        x, layers = x[idx], [layer[idx] for layer in layers]
     ax.stackplot(
-        times,
-        rss,
-        shared,
-        data,
-        text,
+        x,
+        *layers,
         labels=["RSS", "Shared", "Data", "Text"],
         alpha=0.8,
     )
@@ -154,22 +225,17 @@ def plot_io_bytes_cumulative(
     dpi: int = 144,
     transparent: bool = False,
     theme: Theme = "light",
+    max_points: int | None = None,
 ):
     apply_style(theme=theme)
+    samples = as_store(samples, times=times)
     fig, ax = plt.subplots(figsize=(9, 4))
-    read_b = [s.io.read_bytes for s in samples]
-    write_b = [s.io.write_bytes for s in samples]
-
-    def is_monotonic(xs: Sequence[int]) -> bool:
-        return all(b >= a for a, b in zip(xs, xs[1:]))
-
-    if not is_monotonic(read_b):
-        read_b = list(accumulate(read_b))
-    if not is_monotonic(write_b):
-        write_b = list(accumulate(write_b))
-
-    ax.plot(times, [rb / (1024**2) for rb in read_b], label="Read MB")
-    ax.plot(times, [wb / (1024**2) for wb in write_b], label="Write MB")
+    n_out = target_points(fig.get_figwidth(), dpi, max_points)
+    # the counters are cumulative; per-second rates are in plot_throughput
+    read_mb = _column(samples, "read_bytes") / _MB
+    write_mb = _column(samples, "write_bytes") / _MB
+    _line(ax, times, read_mb, n_out, label="Read MB")
+    _line(ax, times, write_mb, n_out, label="Write MB")
     ax.set_ylabel("I/O (MB)")
     ax.set_xlabel("Time (s)")
     _finalize(fig, ax, title="Cumulative I/O Bytes")
@@ -180,6 +246,53 @@ def plot_io_bytes_cumulative(
     plt.close(fig)
 
 
+def plot_throughput(
+    samples: Sequence[ProcessSample],
+    times: Sequence[float],
+    *,
+    show: bool = True,
+    save_path: str | None = None,
+    dpi: int = 144,
+    transparent: bool = False,
+    theme: Theme = "light",
+    max_points: int | None = None,
+):
+    """I/O MB/s and context switches/s, from the per-tick counter rates."""
+    apply_style(theme=theme)
+    samples = as_store(samples, times=times)
+    fig, (io_ax, ctx_ax) = plt.subplots(2, 1, figsize=(9, 6), sharex=True)
+    n_out = target_points(fig.get_figwidth(), dpi, max_points)
+    _line(io_ax, times, _column(samples, "read_bytes_per_s") / _MB, n_out, label="Read")
+    _line(
+        io_ax, times, _column(samples, "write_bytes_per_s") / _MB, n_out, label="Write"
+    )
+    io_ax.set_ylabel("I/O (MB/s)")
+    _line(
+        ctx_ax,
+        times,
+        _column(samples, "ctx_voluntary_per_s"),
+        n_out,
+        label="Voluntary",
+    )
+    _line(
+        ctx_ax,
+        times,
+        _column(samples, "ctx_involuntary_per_s"),
+        n_out,
+        label="Involuntary",
+    )
+    ctx_ax.set_ylabel("Context switches/s")
+    ctx_ax.set_xlabel("Time (s)")
+    io_ax.legend(loc="best", frameon=False)
+    _finalize(fig, ctx_ax, title=None)
+    io_ax.set_title("I/O and Context-Switch Throughput", pad=10)
+    if save_path:
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight", transparent=transparent)
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
 def plot_ctx_switches(
     samples: Sequence[ProcessSample],
     times: Sequence[float],
@@ -189,11 +302,26 @@ def plot_ctx_switches(
     dpi: int = 144,
     transparent: bool = False,
     theme: Theme = "light",
+    max_points: int | None = None,
 ):
     apply_style(theme=theme)
+    samples = as_store(samples, times=times)
     fig, ax = plt.subplots(figsize=(9, 4))
-    ax.plot(times, [s.ctx.voluntary for s in samples], label="Voluntary")
-    ax.plot(times, [s.ctx.involuntary for s in samples], label="Involuntary")
+    n_out = target_points(fig.get_figwidth(), dpi, max_points)
+    _line(
+        ax,
+        times,
+        _column(samples, "ctx_voluntary"),
+        n_out,
+        label="Voluntary",
+    )
+    _line(
+        ax,
+        times,
+        _column(samples, "ctx_involuntary"),
+        n_out,
+        label="Involuntary",
+    )
     ax.set_ylabel("Context Switches")
     ax.set_xlabel("Time (s)")
     _finalize(fig, ax, title="Context Switches Over Time")
@@ -213,12 +341,33 @@ def plot_descriptors_threads(
     dpi: int = 144,
     transparent: bool = False,
     theme: Theme = "light",
+    max_points: int | None = None,
 ):
     apply_style(theme=theme)
+    samples = as_store(samples, times=times)
     fig, ax = plt.subplots(figsize=(9, 4))
-    ax.plot(times, [s.descriptors.open_files for s in samples], label="Open files")
-    ax.plot(times, [s.descriptors.fds for s in samples], label="FDs")
-    ax.plot(times, [s.threads.threads for s in samples], label="Threads")
+    n_out = target_points(fig.get_figwidth(), dpi, max_points)
+    _line(
+        ax,
+        times,
+        _column(samples, "open_files"),
+        n_out,
+        label="Open files",
+    )
+    _line(
+        ax,
+        times,
+        _column(samples, "fds"),
+        n_out,
+        label="FDs",
+    )
+    _line(
+        ax,
+        times,
+        _column(samples, "threads"),
+        n_out,
+        label="Threads",
+    )
     ax.set_ylabel("Count")
     ax.set_xlabel("Time (s)")
     _finalize(fig, ax, title="Descriptors and Threads")
@@ -229,6 +378,46 @@ def plot_descriptors_threads(
     plt.close(fig)
 
 
+# the extended suite: (renderer, file stem, takes times and max_points)
+def _suite():
+    return (
+        (plot_cpu_components, "cpu_components", True),
+        (plot_memory_breakdown, "memory_breakdown", True),
+        (plot_io_bytes_cumulative, "io_cumulative", True),
+        (plot_throughput, "throughput", True),
+        (plot_ctx_switches, "ctx_switches", True),
+        (plot_descriptors_threads, "descriptors_threads", True),
+        (plot_distributions, "distributions", False),
+        (plot_correlation_heatmap, "corr_heatmap", False),
+    )
+
+
+# samples and times of the suite being rendered; set before the pool forks so
+# workers inherit the column arrays instead of receiving a pickled copy
+_shared: Dict[str, Any] = {}
+
+
+def _render(index: int, kwargs: Dict[str, Any]) -> None:
+    fn, _, timed = _suite()[index]
+    if timed:
+        fn(_shared["samples"], _shared["times"], **kwargs)
+    else:
+        fn(_shared["samples"], **kwargs)
+
+
+def _init_worker() -> None:
+    plt.switch_backend("Agg")
+
+
+def _suite_workers(workers: int | None, jobs: int) -> int:
+    # workers share the parent's arrays through fork; without it render in-process
+    if "fork" not in get_all_start_methods():
+        return 1
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, jobs))
+
+
 def plot_from_extended(
     samples: Sequence[ProcessSample],
     times: Sequence[float],
@@ -238,35 +427,47 @@ def plot_from_extended(
     dpi: int = 144,
     theme: Theme = "light",
     ext: str = "png",
+    max_points: int | None = None,
+    workers: int | None = None,
 ):
-    """Convenience to render a suite of plots from extended samples."""
-    cpu_path = f"{out_dir}/cpu_components.{ext}" if out_dir else None
-    mem_path = f"{out_dir}/memory_breakdown.{ext}" if out_dir else None
-    io_path = f"{out_dir}/io_cumulative.{ext}" if out_dir else None
-    ctx_path = f"{out_dir}/ctx_switches.{ext}" if out_dir else None
-    dt_path = f"{out_dir}/descriptors_threads.{ext}" if out_dir else None
-    dist_path = f"{out_dir}/distributions.{ext}" if out_dir else None
-    corr_path = f"{out_dir}/corr_heatmap.{ext}" if out_dir else None
-
-    plot_cpu_components(
-        samples, times, show=show, save_path=cpu_path, dpi=dpi, theme=theme
-    )
-    plot_memory_breakdown(
-        samples, times, show=show, save_path=mem_path, dpi=dpi, theme=theme
-    )
-    plot_io_bytes_cumulative(
-        samples, times, show=show, save_path=io_path, dpi=dpi, theme=theme
-    )
-    plot_ctx_switches(
-        samples, times, show=show, save_path=ctx_path, dpi=dpi, theme=theme
-    )
-    plot_descriptors_threads(
-        samples, times, show=show, save_path=dt_path, dpi=dpi, theme=theme
-    )
-    plot_distributions(samples, show=show, save_path=dist_path, dpi=dpi, theme=theme)
-    plot_correlation_heatmap(
-        samples, show=show, save_path=corr_path, dpi=dpi, theme=theme
-    )
+    """
+    Convenience to render a suite of plots from extended samples.
+
+    Samples are converted to columns once and shared by every figure. When
+    only saving (``show=False``) the figures are rendered concurrently in a
+    pool of up to ``workers`` processes (default: one per CPU) on the Agg
+    backend. ``max_points`` caps the points drawn per line (None: the
+    figure's pixel width, 0: draw every sample).
+    """
+    samples = as_store(samples, extended=True, times=times)
+
+    jobs = []
+    for index, (_, stem, timed) in enumerate(_suite()):
+        kwargs: Dict[str, Any] = {
+            "show": show,
+            "save_path": f"{out_dir}/{stem}.{ext}" if out_dir else None,
+            "dpi": dpi,
+            "theme": theme,
+        }
+        if timed:
+            kwargs["max_points"] = max_points
+        jobs.append((index, kwargs))
+
+    n_workers = 1 if show or not out_dir else _suite_workers(workers, len(jobs))
+    _shared.update(samples=samples, times=times)
+    try:
+        if n_workers == 1:
+            for index, kwargs in jobs:
+                _render(index, kwargs)
+            return
+        with ProcessPoolExecutor(
+            n_workers, mp_context=get_context("fork"), initializer=_init_worker
+        ) as pool:
+            futures = [pool.submit(_render, index, kwargs) for index, kwargs in jobs]
+            for future in futures:
+                future.result()
+    finally:
+        _shared.clear()
 
 
 def plot_distributions(
@@ -279,11 +480,12 @@ def plot_distributions(
 ):
     """Plot histogram/KDE distributions for CPU%, RSS MB, and VMS MB."""
     apply_style(theme=theme)
+    samples = as_store(samples)
     fig, axes = plt.subplots(1, 3, figsize=(12, 3.8))
 
-    cpu = [s.cpu.process for s in samples]
-    rss = [s.memory.rss for s in samples]
-    vms = [s.memory.vms for s in samples]
+    cpu = _column(samples, "cpu_percent")
+    rss = _column(samples, "rss_mb")
+    vms = _column(samples, "vms_mb")
 
     sns.histplot(cpu, kde=True, ax=axes[0])
     axes[0].set_title("CPU % (per core)")
@@ -306,6 +508,14 @@ def plot_distributions(
     plt.close(fig)
 
 
+# shorter axis labels for the correlation heatmap
+_HEATMAP_LABELS = {
+    "cpu_percent": "cpu% (per-core)",
+    "ctx_voluntary": "ctx_vol",
+    "ctx_involuntary": "ctx_invol",
+}
+
+
 def plot_correlation_heatmap(
     samples: Sequence[ProcessSample],
     *,
@@ -316,21 +526,10 @@ def plot_correlation_heatmap(
 ):
     """Compute numeric correlation across extended metrics and render a heatmap."""
     apply_style(theme=theme)
-    rows = [s.model_dump() for s in samples]
-    df = pd.json_normalize(rows)
-    num_df = df.select_dtypes(include=["number"]).copy()
-
-    rename = {
-        "cpu.percent": "cpu% (per-core)",
-        "cpu.user": "cpu_user",
-        "cpu.system": "cpu_system",
-        "memory.rss": "rss_mb",
-        "memory.vms": "vms_mb",
-        "ctx.voluntary": "ctx_vol",
-        "ctx.involuntary": "ctx_invol",
-    }
-    num_df = num_df.rename(columns=rename)
-    corr = num_df.corr(numeric_only=True)
+    store = as_store(samples)
+    metrics = [c for c in store.columns if c not in NON_METRIC_COLUMNS]
+    df = store.to_dataframe(metrics).dropna(axis=1, how="all")
+    corr = df.rename(columns=_HEATMAP_LABELS).corr(numeric_only=True)
 
     fig, ax = plt.subplots(figsize=(7, 6))
 
@@ -343,3 +542,64 @@ def plot_correlation_heatmap(
     if show:
         plt.show()
     plt.close(fig)
+
+
+def plot_thread_cpu(
+    series: SampleStore,
+    *,
+    show: bool = True,
+    save_path: str | None = None,
+    dpi: int = 144,
+    transparent: bool = False,
+    theme: Theme = "light",
+    max_threads: int = 8,
+    max_points: int | None = None,
+):
+    """
+    Stacked per-thread CPU% over time, from a ``ThreadTracker`` series.
+
+    The ``max_threads`` threads with the most CPU over the run get a band each;
+    the rest are summed into "other". Long runs are averaged into ``max_points``
+    bins (default: the figure's pixel width).
+    """
+    apply_style(theme=theme)
+    df = series.to_dataframe(["time_s", "tid", "comm", "cpu_percent"])
+    df["thread"] = [
+        f"{comm} ({tid})" if comm else str(tid)
+        for comm, tid in zip(df["comm"], df["tid"])
+    ]
+    table = df.pivot_table(
+        index="time_s",
+        columns="thread",
+        values="cpu_percent",
+        aggfunc="sum",
+        fill_value=0.0,
+    )
+    busiest = table.sum().sort_values(ascending=False).index
+    if len(busiest) > max_threads:
+        rest = table[busiest[max_threads:]].sum(axis=1)
+        table = table[busiest[:max_threads]].assign(other=rest)
+    else:
+        table = table[busiest]
+
+    fig, ax = plt.subplots(figsize=(9, 4))
+    n_out = target_points(fig.get_figwidth(), dpi, max_points)
+    x = table.index.to_numpy(dtype=np.float64)
+    y = table.to_numpy(dtype=np.float64).T
+    if n_out and len(x) > n_out:
+        bins = np.array_split(np.arange(len(x)), n_out)
+        x = np.array([x[b].mean() for b in bins])
+        y = np.stack([y[:, b].mean(axis=1) for b in bins], axis=1)
+    if len(x):
+        ax.stackplot(x, y, labels=list(table.columns), alpha=0.85, linewidth=0)
+    ax.set_ylabel("CPU per-core usage (%)")
+    ax.set_xlabel("Time (s)")
+    _finalize(fig, ax, title="CPU by Thread")
+
+    if save_path:
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight", transparent=transparent)
+
+    if show:
+        plt.show()
+
+    plt.close(fig)
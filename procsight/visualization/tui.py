@@ -0,0 +1,303 @@
+"""
+Terminal live view for SSH sessions.
+
+``TerminalView`` is a sink like ``LivePlot``: it reads the rows ``Monitor``
+already produces (no extra probing) into a bounded window, tracking running
+min/max on the way in. ``run_tui`` samples in a background thread and redraws
+a curses screen every ``refresh_sec``. For each metric of the ``ProcessSample``
+groups the screen shows the current value, min, max, the p95 over the window
+and a sparkline. curses only sends the cells that changed, and the view's own
+CPU time is measured and shown in the header.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import curses
+import io
+import locale
+import math
+import sys
+import threading
+from collections import deque
+from time import monotonic, thread_time
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from procsight.core.rows import BASIC_ROW_COLUMNS
+from procsight.core.sinks import to_row
+
+# seconds between redraws
+REFRESH_SEC = 1.0
+# seconds of history kept for p95 and the sparklines
+DEFAULT_WINDOW_SEC = 300.0
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+SPARK_ASCII = "_.-~=+*#"
+
+# metric groups as in ProcessSample: (group, [(column, label)])
+GROUPS: List[Tuple[str, List[Tuple[str, str]]]] = [
+    (
+        "cpu",
+        [
+            ("cpu_percent", "process %"),
+            ("cpu_user_percent", "user %"),
+            ("cpu_system_percent", "system %"),
+        ],
+    ),
+    (
+        "memory",
+        [
+            ("rss_mb", "rss MB"),
+            ("vms_mb", "vms MB"),
+            ("pss_mb", "pss MB"),
+            ("shared_mb", "shared MB"),
+            ("data_mb", "data MB"),
+            ("text_mb", "text MB"),
+        ],
+    ),
+    (
+        "io",
+        [
+            ("read_bytes_per_s", "read B/s"),
+            ("write_bytes_per_s", "write B/s"),
+            ("read_ops_per_s", "read ops/s"),
+            ("write_ops_per_s", "write ops/s"),
+            ("read_bytes", "read total B"),
+            ("write_bytes", "write total B"),
+        ],
+    ),
+    (
+        "ctx",
+        [("ctx_voluntary_per_s", "voluntary/s"), ("ctx_involuntary_per_s", "invol./s")],
+    ),
+    ("descriptors", [("open_files", "open files"), ("fds", "fds")]),
+    ("threads", [("threads", "threads")]),
+]
+
+_LABEL_W = 14
+_NUM_W = 9
+
+
+def format_value(value: float) -> str:
+    """Compact number for a fixed-width cell (``12.3``, ``4.56k``, ``7.89G``)."""
+    if value is None or math.isnan(value):
+        return "-"
+    magnitude = abs(value)
+    for suffix, scale in (("T", 1e12), ("G", 1e9), ("M", 1e6), ("k", 1e3)):
+        if magnitude >= scale:
+            return f"{value / scale:.3g}{suffix}"
+    if magnitude >= 100 or value == int(value):
+        return f"{value:.0f}"
+    return f"{value:.3g}"
+
+
+def sparkline(values: Sequence[float], width: int, chars: str = SPARK_CHARS) -> str:
+    """
+    ``values`` as ``width`` characters of bar heights.
+
+    Longer series are bucketed, keeping each bucket's max so spikes show.
+    """
+    if width <= 0 or not values:
+        return ""
+    if len(values) > width:
+        step = len(values) / width
+        buckets = []
+        for i in range(width):
+            chunk = [
+                v
+                for v in values[int(i * step) : int((i + 1) * step)]
+                if not math.isnan(v)
+            ]
+            buckets.append(max(chunk) if chunk else math.nan)
+        values = buckets
+    finite = [v for v in values if not math.isnan(v)]
+    if not finite:
+        return " " * len(values)
+    lo, hi = min(finite), max(finite)
+    span = hi - lo
+    top = len(chars) - 1
+    out = []
+    for v in values:
+        if math.isnan(v):
+            out.append(" ")
+        else:
+            out.append(chars[int((v - lo) / span * top) if span else 0])
+    return "".join(out)
+
+
+def _p95(values: Sequence[float]) -> float:
+    finite = sorted(v for v in values if not math.isnan(v))
+    if not finite:
+        return math.nan
+    return finite[min(len(finite) - 1, int(len(finite) * 0.95))]
+
+
+class TerminalView:
+    """Bounded window of the sampled rows, rendered as text lines."""
+
+    def __init__(
+        self,
+        extended: bool,
+        interval: float,
+        window_sec: float = DEFAULT_WINDOW_SEC,
+        title: str = "",
+        ascii_only: Optional[bool] = None,
+    ):
+        self.title = title
+        self.interval = interval
+        if ascii_only is None:
+            ascii_only = "utf" not in (sys.stdout.encoding or "").lower()
+        self.chars = SPARK_ASCII if ascii_only else SPARK_CHARS
+        self.groups = [
+            (
+                group,
+                [
+                    (c, label)
+                    for c, label in metrics
+                    if extended or c in BASIC_ROW_COLUMNS
+                ],
+            )
+            for group, metrics in GROUPS
+        ]
+        self.groups = [(g, m) for g, m in self.groups if m]
+        maxlen = int(math.ceil(window_sec / interval)) + 1
+        self._lock = threading.Lock()
+        self._count = 0
+        self._elapsed = 0.0
+        self._missed = 0
+        self._window: Dict[str, Deque[float]] = {
+            c: deque(maxlen=maxlen) for _, metrics in self.groups for c, _ in metrics
+        }
+        self._min: Dict[str, float] = {}
+        self._max: Dict[str, float] = {}
+        # CPU time the view has spent rendering (seconds) and since when
+        self.render_cpu_s = 0.0
+        self._started = monotonic()
+
+    # -- sink interface (sampling thread) ---------------------------------
+
+    def write(self, elapsed: float, item) -> None:
+        row = to_row(item, self._count + 1, elapsed)
+        with self._lock:
+            self._count += 1
+            self._elapsed = elapsed
+            self._missed += row.get("missed") or 0
+            for name, window in self._window.items():
+                value = row.get(name)
+                if value is None:
+                    window.append(math.nan)
+                    continue
+                window.append(value)
+                if value < self._min.get(name, math.inf):
+                    self._min[name] = value
+                if value > self._max.get(name, -math.inf):
+                    self._max[name] = value
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    # -- rendering --------------------------------------------------------
+
+    @property
+    def cpu_percent(self) -> float:
+        """CPU used by rendering, as a % of one core since the view started."""
+        wall = monotonic() - self._started
+        return self.render_cpu_s / wall * 100 if wall > 0 else 0.0
+
+    def render(self, width: int, height: Optional[int] = None) -> List[str]:
+        """The screen as text lines ``width`` columns wide."""
+        with self._lock:
+            count, elapsed, missed = self._count, self._elapsed, self._missed
+            windows = {name: list(w) for name, w in self._window.items()}
+            lows, highs = dict(self._min), dict(self._max)
+
+        spark_w = max(0, width - _LABEL_W - 4 * (_NUM_W + 1) - 2)
+        lines = [
+            f"{self.title}  {count} samples  {elapsed:.1f}s  every {self.interval:g}s"
+            f"  missed {missed}  view CPU {self.cpu_percent:.2f}%",
+            "",
+            f"{'':<{_LABEL_W}}"
+            + "".join(f"{h:>{_NUM_W + 1}}" for h in ("current", "min", "max", "p95"))
+            + "  trend",
+        ]
+        for group, metrics in self.groups:
+            rows = []
+            for name, label in metrics:
+                values = windows[name]
+                if not values or all(math.isnan(v) for v in values):
+                    continue  # not available on this platform/backend
+                cells = (
+                    values[-1],
+                    lows.get(name, math.nan),
+                    highs.get(name, math.nan),
+                    _p95(values),
+                )
+                rows.append(
+                    f"  {label:<{_LABEL_W - 2}}"
+                    + "".join(f"{format_value(v):>{_NUM_W + 1}}" for v in cells)
+                    + "  "
+                    + sparkline(values, spark_w, self.chars)
+                )
+            if rows:
+                lines.append(group)
+                lines.extend(rows)
+        lines.append("")
+        lines.append("q: quit")
+        if height is not None:
+            lines = lines[:height]
+        return [line[:width] for line in lines]
+
+
+def _draw(stdscr, view: TerminalView) -> None:
+    height, width = stdscr.getmaxyx()
+    stdscr.erase()
+    for y, line in enumerate(view.render(width - 1, height)):
+        try:
+            stdscr.addstr(y, 0, line)
+        except curses.error:
+            pass  # terminal shrank mid-draw
+    stdscr.refresh()
+
+
+def run_tui(
+    monitor,
+    view: TerminalView,
+    duration: int,
+    samples: int,
+    extended: bool,
+    refresh_sec: float = REFRESH_SEC,
+) -> None:
+    """
+    Sample with ``monitor`` in a background thread while ``view`` is shown.
+
+    Returns when the run ends, ``q`` is pressed or Ctrl+C is hit.
+    """
+    locale.setlocale(locale.LC_ALL, "")
+
+    def loop(stdscr) -> None:
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        stdscr.timeout(int(refresh_sec * 1000))
+        monitor.start_background(duration, samples, extended)
+        while monitor.running:
+            start = thread_time()
+            _draw(stdscr, view)
+            view.render_cpu_s += thread_time() - start
+            # waits up to refresh_sec for a key without using CPU
+            if stdscr.getch() in (ord("q"), ord("Q"), 27):
+                break
+
+    try:
+        # stray prints (e.g. the continuous-mode banner) would corrupt the screen
+        with contextlib.redirect_stdout(io.StringIO()):
+            curses.wrapper(loop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.stop()
+        monitor.join()
@@ -0,0 +1,23 @@
+from procsight.core.adaptive import ActivityDetector
+
+
+def test_first_row_and_threshold_crossings_are_active():
+    detector = ActivityDetector()
+    row = {"cpu_percent": 10.0, "rss_mb": 100.0}
+    assert detector.update(row)
+    assert not detector.update({"cpu_percent": 12.0, "rss_mb": 100.5})
+    assert detector.update({"cpu_percent": 20.0, "rss_mb": 100.5})
+    assert detector.update({"cpu_percent": 20.0, "rss_mb": 99.0})
+
+    # I/O counters count when the rows carry them; missing values are ignored
+    detector.reset()
+    detector.update({"cpu_percent": 1.0, "read_bytes": 0, "write_bytes": None})
+    assert not detector.update({"cpu_percent": 1.0, "read_bytes": 4096})
+    assert detector.update({"cpu_percent": 1.0, "read_bytes": 1 << 20})
+
+
+def test_custom_thresholds_replace_the_defaults():
+    detector = ActivityDetector({"threads": 1})
+    detector.update({"threads": 4, "cpu_percent": 0.0})
+    assert not detector.update({"threads": 4, "cpu_percent": 90.0})
+    assert detector.update({"threads": 5, "cpu_percent": 90.0})
@@ -0,0 +1,128 @@
+import asyncio
+from types import SimpleNamespace
+
+import psutil
+import pytest
+
+from procsight.core.async_monitor import AsyncMonitor
+
+
+class _FakeProc:
+    def __init__(self, pid: int, die_after: int | None = None, error=None):
+        self.pid = pid
+        self._calls = 0
+        self._die_after = die_after
+        self._error = error or psutil.NoSuchProcess
+
+    def cpu_percent(self, interval=None):
+        return 40.0
+
+    def cpu_times(self):
+        self._calls += 1
+        if self._die_after is not None and self._calls > self._die_after:
+            raise self._error(self.pid)
+        return SimpleNamespace(user=1.0, system=0.5)
+
+    def memory_info(self):
+        return SimpleNamespace(rss=10 * 1024**2, vms=20 * 1024**2)
+
+
+class _UnreadableProc(_FakeProc):
+    def cpu_percent(self, interval=None):
+        raise psutil.AccessDenied(self.pid)
+
+
+@pytest.fixture
+def fake_procs(monkeypatch):
+    procs = {pid: _FakeProc(pid) for pid in range(1, 5)}
+    procs[3] = _FakeProc(3, die_after=1)
+    procs[5] = _FakeProc(5, die_after=2, error=psutil.AccessDenied)
+    procs[6] = _FakeProc(6, die_after=0, error=psutil.AccessDenied)
+    procs[7] = _UnreadableProc(7)
+    monkeypatch.setattr(psutil, "cpu_count", lambda logical=True: 4)
+    monkeypatch.setattr(psutil, "Process", lambda pid: procs[pid])
+    return procs
+
+
+def _collect(monitor, stop_after=None, delay=0.0, **kw):
+    async def run():
+        out = []
+        async for s in monitor.stream(**kw):
+            out.append(s)
+            if stop_after is not None and len(out) == stop_after:
+                monitor.stop()
+            if delay:
+                await asyncio.sleep(delay)
+        return out
+
+    return asyncio.run(run())
+
+
+def test_stream_yields_each_target_per_tick(fake_procs):
+    m = AsyncMonitor([1, 2], interval=0.01, backend="psutil")
+    out = _collect(m, samples=3)
+
+    assert len(out) == 6
+    assert [s.pid for s in out[:2]] == [1, 2]
+    assert [s.row["sample"] for s in out] == [1, 1, 2, 2, 3, 3]
+    assert out[0].elapsed == out[1].elapsed == 0.0
+    assert out[2].elapsed == pytest.approx(0.01, abs=0.01)
+    assert out[0].row["rss_mb"] == pytest.approx(10.0)
+
+
+def test_targets_join_and_leave_while_streaming(fake_procs):
+    m = AsyncMonitor([1, 3], interval=0.01, backend="psutil")
+
+    async def run():
+        seen = []
+        async for s in m.stream(samples=4):
+            seen.append((s.row["sample"], s.pid))
+            if s.row["sample"] == 1 and s.pid == 1:
+                m.add(4)
+        return seen
+
+    seen = asyncio.run(run())
+    assert (1, 3) in seen and (2, 3) not in seen
+    # the ticker may run ahead of the consumer: 4 joins on a later tick
+    assert min(tick for tick, pid in seen if pid == 4) >= 2
+    assert sorted(m.pids) == [1, 4]
+
+
+def test_slow_consumer_drops_ticks_instead_of_buffering(fake_procs):
+    m = AsyncMonitor([1], interval=0.01, backend="psutil", max_pending=1)
+    out = _collect(m, stop_after=4, delay=0.035)
+
+    assert 4 <= len(out) <= 6
+    assert sum(s.row["missed"] for s in out) >= 3
+
+
+def test_cancelling_the_consumer_stops_the_ticker(fake_procs):
+    m = AsyncMonitor([1, 2], interval=0.01, backend="psutil")
+
+    async def run():
+        seen = []
+
+        async def consume():
+            async for s in m.stream():
+                seen.append(s)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return seen, [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    seen, left = asyncio.run(run())
+    assert seen and left == []
+
+
+def test_stream_drops_targets_it_cannot_read(fake_procs):
+    # 5 is denied after two samples, 6 from its first probe, 7 when it is primed
+    m = AsyncMonitor([1, 5, 6, 7], interval=0.01, backend="psutil")
+    out = _collect(m, samples=3)
+
+    assert [s.row["sample"] for s in out if s.pid == 1] == [1, 2, 3]
+    assert [s.row["sample"] for s in out if s.pid == 5] == [1, 2]
+    assert not any(s.pid in (6, 7) for s in out)
+    assert m.pids == [1]
@@ -0,0 +1,41 @@
+import json
+import os
+
+from procsight.bench import main, run_benchmarks
+
+
+def test_run_benchmarks_reports_every_section():
+    results = run_benchmarks(
+        os.getpid(), repeat=5, timing_samples=3, memory_samples=50, intervals=(0.01,)
+    )
+
+    assert set(results) == {
+        "environment",
+        "target",
+        "probes",
+        "ticks",
+        "timing",
+        "memory",
+    }
+    assert "memory_info" in results["probes"]["psutil"]
+    assert results["ticks"]["psutil"]["extended_row"]["median_us"] > 0
+    assert [t["mode"] for t in results["timing"]] == ["basic", "extended", "high-freq"]
+    assert results["timing"][0]["samples"] == 3
+    assert results["memory"]["store_bytes_per_sample"] > 0
+    json.dumps(results)
+
+
+def test_bench_cli_writes_json(tmp_path, monkeypatch):
+    import procsight.bench as bench
+
+    monkeypatch.setattr(
+        bench,
+        "run_benchmarks",
+        lambda pid, **kw: run_benchmarks(
+            pid, repeat=3, timing_samples=2, memory_samples=10, intervals=(0.01,)
+        ),
+    )
+    out = tmp_path / "bench.json"
+    main(["--pid", str(os.getpid()), "--out", str(out)])
+
+    assert json.loads(out.read_text())["target"]["pid"] == os.getpid()
@@ -26,6 +26,15 @@ def test_cli_accepts_pid(monkeypatch):
     assert args.interval == 0.1
 
 
+def test_cli_accepts_repeated_pid(monkeypatch):
+    monkeypatch.setattr(
+        sys, "argv", ["prog", "--pid", "10", "--pid", "20", "--pid", "10"]
+    )
+    args = get_params()
+    assert args.pids == [10, 20]
+    assert args.pid == 10
+
+
 def test_cli_name_single_match(monkeypatch):
     # Simulate a single matching process
     def fake_iter(attrs=None):
@@ -49,3 +58,52 @@ def test_cli_name_no_match(monkeypatch):
 
     with pytest.raises(SystemExit):
         get_params()
+
+
+def test_cli_max_interval_must_not_undercut_interval(monkeypatch):
+    monkeypatch.setattr(
+        sys, "argv", ["prog", "--pid", "1", "--interval", "0.5", "--max-interval", "8"]
+    )
+    assert get_params().max_interval == 8.0
+
+    monkeypatch.setattr(
+        sys, "argv", ["prog", "--pid", "1", "--interval", "2", "--max-interval", "1"]
+    )
+    with pytest.raises(SystemExit):
+        get_params()
+
+
+def test_cli_threads_needs_extended(monkeypatch):
+    monkeypatch.setattr(
+        sys, "argv", ["prog", "--pid", "1", "--extended", "--threads", "5"]
+    )
+    assert get_params().threads == 5
+
+    monkeypatch.setattr(sys, "argv", ["prog", "--pid", "1", "--threads", "5"])
+    with pytest.raises(SystemExit):
+        get_params()
+
+
+def test_cli_self_metrics_rejects_live_views(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog", "--pid", "1", "--self-metrics"])
+    assert get_params().self_metrics
+
+    for view in ("--live", "--tui"):
+        monkeypatch.setattr(sys, "argv", ["prog", "--pid", "1", "--self-metrics", view])
+        with pytest.raises(SystemExit):
+            get_params()
+
+
+def test_cli_trigger_rejects_options_it_would_ignore(monkeypatch):
+    base = ["prog", "--pid", "1", "--out", "run.csv", "--trigger", "cpu_percent>80"]
+    monkeypatch.setattr(sys, "argv", base)
+    assert [c.spec for c in get_params().triggers] == ["cpu_percent>80"]
+
+    for extra in (
+        ["--self-metrics"],
+        ["--threshold", "cpu_percent=50"],
+        ["--extended", "--threads", "3"],
+    ):
+        monkeypatch.setattr(sys, "argv", base + extra)
+        with pytest.raises(SystemExit):
+            get_params()
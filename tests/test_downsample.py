@@ -0,0 +1,51 @@
+import matplotlib.pyplot as plt
+import numpy as np
+
+from procsight.visualization.downsample import lttb, minmax_envelope, target_points
+from procsight.visualization.plot import _line
+
+
+def _series(n=100_000):
+    x = np.arange(n) * 0.1
+    y = np.sin(x / 50)
+    y[n // 3] = 40.0  # one-sample spike
+    return x, y
+
+
+def test_lttb_keeps_endpoints_and_spike():
+    x, y = _series()
+    idx = lttb(x, y, 500)
+
+    assert len(idx) == 500
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    assert np.all(np.diff(idx) > 0)
+    assert len(x) // 3 in idx
+    # short series are left alone
+    assert len(lttb(x[:10], y[:10], 500)) == 10
+
+
+def test_minmax_envelope_ignores_missing_values():
+    y = np.array([1.0, np.nan, 5.0, np.nan, np.nan, 2.0])
+    bx, lo, hi = minmax_envelope(np.arange(6.0), y, 3)
+
+    assert bx.tolist() == [0.0, 2.0, 4.0]
+    assert lo[0] == 1.0 and hi[1] == 5.0
+    assert lo[2] == hi[2] == 2.0
+
+
+def test_line_draws_a_fixed_number_of_points():
+    x, y = _series()
+    fig, ax = plt.subplots(figsize=(9, 4))
+    n_out = target_points(fig.get_figwidth(), 100)
+    _line(ax, x, y, n_out)
+
+    assert n_out == 900
+    assert len(ax.lines[0].get_xdata()) == n_out
+    # the min/max band still reaches the spike
+    assert ax.collections[0].get_datalim(ax.transData).ymax == 40.0
+    plt.close(fig)
+
+    fig, ax = plt.subplots()
+    _line(ax, x, y, target_points(9, 100, max_points=0))
+    assert len(ax.lines[0].get_xdata()) == len(x)
+    plt.close(fig)
@@ -42,8 +42,8 @@ def test_export_basic(tmp_path):
     export_to_csv(args, data)
 
     df = pd.read_csv(args.out)
-    # Expect 3 rows: two samples + avg row
-    assert len(df) == 3
+    # two samples + p50/p95/p99/max + avg
+    assert len(df) == 7
     assert set(["sample", "cpu_percent", "rss_mb", "vms_mb"]).issubset(df.columns)
     assert df.iloc[-1]["sample"] == "avg"
 
@@ -55,8 +55,18 @@ def test_export_extended(tmp_path):
     export_to_csv(args, data)
 
     df = pd.read_csv(args.out)
-    # Expect 3 rows: two samples + avg row
-    assert len(df) == 3
+    # two samples + p50/p95/p99/max + avg
+    assert len(df) == 7
     # Check a few expected columns exist after normalization
     expected = {"sample", "cpu_percent", "rss_mb", "vms_mb", "uptime_sec", "status"}
     assert expected.issubset(set(df.columns))
+
+
+def test_export_writes_time_column(tmp_path):
+    args = SimpleNamespace(extended=True, out=str(tmp_path / "timed.csv"))
+    export_to_csv(args, [_mk_sample(1), _mk_sample(2)], times=[0.0, 0.25])
+
+    df = pd.read_csv(args.out)
+    assert list(df["time_s"][:2]) == [0.0, 0.25]
+    assert pd.isna(df.iloc[-1]["time_s"])
+    assert df.iloc[0]["cpu_affinity"] == "0;1"
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import psutil
+import pytest
+
+from procsight.core.highfreq import HighFrequencyCapture
+
+
+class _FakeProc:
+    """Burns 1 ms of CPU per 2 ms tick on a fake clock."""
+
+    def __init__(self, clock):
+        self.pid = 4242
+        self._clock = clock
+
+    def cpu_percent(self, interval=None):
+        return 0.0
+
+    def cpu_times(self):
+        return SimpleNamespace(user=self._clock.now / 2, system=0.0)
+
+    def memory_info(self):
+        return SimpleNamespace(rss=64 * 1024**2, vms=128 * 1024**2)
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(psutil, "cpu_count", lambda logical=True: 1)
+    monkeypatch.setattr(psutil, "Process", lambda pid: _FakeProc(clock))
+    monkeypatch.setattr("procsight.core.highfreq.monotonic", clock)
+    monkeypatch.setattr("procsight.core.highfreq.sleep", clock.sleep)
+    return clock
+
+
+def test_high_freq_capture_builds_store_after_run(clock):
+    capture = HighFrequencyCapture(4242, interval=0.002, backend="psutil", spin_sec=0)
+    store = capture.run(samples=10)
+
+    assert len(store) == 10
+    assert store.times == pytest.approx([i * 0.002 for i in range(10)])
+    cpu, mem = store[5]
+    assert cpu.process == pytest.approx(50.0)
+    assert mem.rss == pytest.approx(64.0)
+
+    report = capture.report
+    assert report.samples == 10
+    assert report.achieved == pytest.approx(0.002)
+    assert report.jitter == pytest.approx(0.0, abs=1e-12)
+    assert report.missed == 0
+
+
+def test_high_freq_capture_needs_a_bound(clock):
+    capture = HighFrequencyCapture(4242, interval=0.002, backend="psutil")
+    with pytest.raises(ValueError):
+        capture.run()
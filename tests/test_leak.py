@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from procsight.core.leak import LeakDetector
+from procsight.core.stats import RunStats
+
+
+def _rows(seconds, rss, step=10.0):
+    return [
+        {"time_s": t, "rss_mb": rss(t)}
+        for t in (i * step for i in range(int(seconds / step)))
+    ]
+
+
+def test_steady_leak_is_found_despite_spikes():
+    rng = random.Random(1)
+
+    def rss(t):
+        # 30 MB/h with noise and an occasional large GC-style drop
+        value = 200 + 30 * t / 3600 + rng.gauss(0, 2)
+        return value - 80 if rng.random() < 0.05 else value
+
+    leak = LeakDetector(window_s=3600, points=60, limit_mb=400)
+    leak.extend(_rows(4 * 3600, rss))
+    trend = leak.trends()["rss_mb"]
+
+    assert trend.slope_mb_h == pytest.approx(30, rel=0.1)
+    assert trend.confidence > 0.99
+    assert trend.points == 60
+    # ~320 MB now, 80 MB to go at 30 MB/h
+    assert trend.hours_to_limit == pytest.approx(80 / 30, rel=0.15)
+    assert "pss_mb" not in leak.trends()
+
+
+def test_window_forgets_old_growth_and_stays_bounded():
+    leak = LeakDetector(window_s=600, points=10)
+    leak.extend(_rows(600, lambda t: 100 + t))  # grows for one window ...
+    assert leak.trends()["rss_mb"].slope_mb_h > 1000
+    rng = random.Random(2)
+    leak.extend(
+        {"time_s": 600 + r["time_s"], "rss_mb": 700 + rng.gauss(0, 1)}
+        for r in _rows(1200, lambda t: 0)
+    )  # ... then stays flat
+
+    trend = leak.trends()["rss_mb"]
+    assert abs(trend.slope_mb_h) < 60
+    assert 0.01 < trend.confidence < 0.99
+    assert trend.hours_to_limit is None
+    assert len(leak._fits["rss_mb"].slopes) == 10 * 9 // 2
+
+
+def test_trends_reach_the_summary_rows_before_avg():
+    leak = LeakDetector(window_s=60, points=6, limit_mb=1000)
+    stats = RunStats(["time_s", "rss_mb"], leak=leak)
+    stats.extend(_rows(60, lambda t: 100 + t, step=1.0))
+
+    labels = [r["sample"] for r in stats.summary_rows()]
+    assert labels[-4:] == ["slope_mb_h", "slope_confidence", "hours_to_limit", "avg"]
+    assert stats.summary_rows()[-4]["rss_mb"] == pytest.approx(3600)
+    assert stats.to_dict()["leak"]["rss_mb"]["points"] == 6
+    assert RunStats(["rss_mb"]).summary_rows()[-1]["sample"] == "avg"
@@ -0,0 +1,98 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import matplotlib.pyplot as plt
+import psutil
+import pytest
+
+from procsight.core.monitor import Monitor
+from procsight.visualization.live import LivePlot, run_live
+
+
+class _FakeProc:
+    pid = 4242
+
+    def cpu_percent(self, interval=None):
+        return 25.0
+
+    def cpu_times(self):
+        return SimpleNamespace(user=1.0, system=0.5)
+
+    def memory_info(self):
+        return SimpleNamespace(rss=64 * 1024**2, vms=128 * 1024**2)
+
+
+@pytest.fixture
+def fake_proc(monkeypatch):
+    monkeypatch.setattr(psutil, "cpu_count", lambda logical=True: 1)
+    monkeypatch.setattr(psutil, "Process", lambda pid: _FakeProc())
+
+
+def _row(i: int, cpu: float = 10.0) -> dict:
+    return {"sample": i, "cpu_percent": cpu, "rss_mb": 50.0, "vms_mb": 80.0}
+
+
+def test_live_plot_keeps_a_rolling_window_and_blits():
+    live = LivePlot(extended=False, interval=1.0, window_sec=5.0, refresh_sec=0.1)
+    for i in range(20):
+        live.write(float(i), _row(i))
+    live.update()
+
+    cpu_line = live._lines[0][0]
+    x = cpu_line.get_xdata()
+    assert len(x) == 6
+    assert x[-1] == 0.0 and x[0] == -5.0
+    assert live.axes[0].get_ylim()[1] >= 10.0
+    assert live._background is not None
+
+    # an update within the current y-range only blits the lines
+    redraws = []
+    live.fig.canvas.mpl_connect("draw_event", redraws.append)
+    live.write(20.0, _row(20, cpu=11.0))
+    live.update()
+    assert redraws == []
+    assert cpu_line.get_ydata()[-1] == 11.0
+
+    # a spike past the y-range triggers one full redraw
+    live.write(21.0, _row(21, cpu=90.0))
+    live.update()
+    assert len(redraws) == 1
+    assert live.axes[0].get_ylim()[1] >= 90.0
+    plt.close(live.fig)
+
+
+def test_run_live_samples_in_a_background_thread(fake_proc, monkeypatch):
+    monkeypatch.setattr("procsight.core.monitor.sleep", lambda s: None)
+    live = LivePlot(extended=True, interval=0.01, window_sec=1.0)
+    monitor = Monitor(4242, 0.01, backend="psutil", sinks=[live], retain=False)
+    seen = []
+    main_thread = threading.main_thread()
+
+    write = live.write
+
+    def spy(elapsed, item):
+        seen.append(threading.current_thread() is main_thread)
+        write(elapsed, item)
+
+    live.write = spy
+    # Agg: plt.show() returns at once and the run completes headless
+    run_live(monitor, live, duration=0, samples=5, extended=True)
+
+    assert seen == [False] * 5
+    live.update()
+    assert len(live._lines) == 8
+    assert live._lines[1][0].get_ydata()[-1] == pytest.approx(64.0)
+    plt.close(live.fig)
+
+
+def test_monitor_stop_ends_continuous_run(fake_proc):
+    monitor = Monitor(4242, 0.005, backend="psutil", retain=True)
+    thread = threading.Thread(target=monitor.get_process_usage_by_interval, args=(0, 0))
+    thread.start()
+    time.sleep(0.05)
+    monitor.stop()
+    thread.join(timeout=2)
+
+    assert not thread.is_alive()
+    assert len(monitor.sample_times) > 0
@@ -13,7 +13,7 @@ from procsight.models.metrics import (
 
 
 class _FakeMonitor:
-    def __init__(self, pid: int, interval: float):
+    def __init__(self, pid: int, interval: float, **kwargs):
         self.sample_times = [0.0, 1.0]
 
     def get_process_usage_by_interval(self, duration, samples, extended=False):
@@ -107,3 +107,60 @@ def test_main_extended_flow(monkeypatch, tmp_path):
     )
 
     app.main()
+
+
+class _FakeMultiMonitor:
+    def __init__(self, pids, interval: float, sinks=None, **kwargs):
+        self._pids = pids
+        self._sinks = sinks
+
+    def times_for(self, pid: int):
+        return [0.0, 1.0]
+
+    def get_process_usage_by_interval(self, duration, samples, extended=False):
+        single = _FakeMonitor(0, 0.0)
+        series = {
+            pid: single.get_process_usage_by_interval(duration, samples, extended)
+            for pid in self._pids
+        }
+        for pid, data in series.items():
+            for sink in self._sinks(pid) if self._sinks else ():
+                for elapsed, item in zip(self.times_for(pid), data):
+                    sink.write(elapsed, item)
+        return series
+
+
+def test_main_multi_pid_flow(monkeypatch, tmp_path):
+    import main as app
+
+    monkeypatch.setattr(app, "MultiMonitor", _FakeMultiMonitor)
+
+    plots_dir = tmp_path / "plots_multi"
+    out = tmp_path / "multi.csv"
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "prog",
+            "--pid",
+            "123",
+            "--pid",
+            "456",
+            "--samples",
+            "2",
+            "--no-show",
+            "--save-plots",
+            str(plots_dir),
+            "--out",
+            str(out),
+            "--dpi",
+            "72",
+        ],
+    )
+
+    app.main()
+
+    assert (tmp_path / "multi_pid123.csv").exists()
+    assert (tmp_path / "multi_pid456.csv").exists()
+    assert (plots_dir / "cpu_pid456.png").exists()
@@ -1,3 +1,4 @@
+import sys
 from types import SimpleNamespace
 from typing import Tuple, cast
 
@@ -43,7 +44,7 @@ def test_collect_exact_samples(monkeypatch):
     monkeypatch.setattr("procsight.core.monitor.monotonic", fake_mono)
     monkeypatch.setattr("procsight.core.monitor.sleep", lambda s: None)
 
-    m = Monitor(pid=1234, interval=0.01)
+    m = Monitor(pid=1234, interval=0.01, backend="psutil")
     result = m.get_process_usage_by_interval(duration=0, samples=3, extended=False)
 
     assert len(result) == 3
@@ -55,3 +56,80 @@ def test_collect_exact_samples(monkeypatch):
     # sample_times should start at 0 and be increasing
     assert m.sample_times[0] == 0.0
     assert sorted(m.sample_times) == m.sample_times
+
+
+def test_monitor_streams_to_sinks_without_retaining(monkeypatch):
+    from procsight.core.sinks import TailSink
+
+    monkeypatch.setattr("procsight.core.monitor.sleep", lambda s: None)
+
+    tail = TailSink(maxlen=2)
+    m = Monitor(pid=1234, interval=0.01, backend="psutil", sinks=[tail], retain=False)
+    result = m.get_process_usage_by_interval(duration=0, samples=5, extended=False)
+
+    assert len(result) == 0
+    assert m.sample_times == []
+    assert len(tail) == 2
+    cpu, _ = tail.samples[-1]
+    assert cpu.process == pytest.approx(30.0)
+
+
+def test_iter_samples_yields_per_tick_and_stops_early(monkeypatch):
+    monkeypatch.setattr("procsight.core.monitor.sleep", lambda s: None)
+
+    flushed = []
+    tail = SimpleNamespace(
+        write=lambda elapsed, item: None,
+        flush=lambda: flushed.append(True),
+        close=lambda: None,
+    )
+    m = Monitor(pid=1234, interval=0.01, backend="psutil", sinks=[tail])
+    stream = m.iter_samples()  # continuous
+    seen = []
+    for elapsed, (cpu, mem) in stream:
+        seen.append(elapsed)
+        if len(seen) == 3:
+            break
+    stream.close()
+
+    assert len(seen) == 3 and seen[0] == 0.0
+    assert cpu.process == pytest.approx(30.0)
+    assert flushed == [True]
+    assert m.sample_times == []
+
+    elapsed, row = next(m.iter_samples(samples=2, extended=False, rows=True))
+    assert row["sample"] == 1 and row["rss_mb"] == pytest.approx(100.0)
+
+
+def test_adaptive_monitor_backs_off_when_flat_and_resets_on_change(monkeypatch):
+    clock = SimpleNamespace(now=0.0)
+
+    def fake_sleep(seconds):
+        clock.now += seconds
+
+    monkeypatch.setattr("procsight.core.monitor.monotonic", lambda: clock.now)
+    monkeypatch.setattr("procsight.core.monitor.sleep", fake_sleep)
+    # priming call, six flat samples, then a jump of 40 points (160 / 4 cores)
+    cpu = iter([0.0] + [40.0] * 6 + [200.0] * 2)
+    proc = _FakeProc()
+    proc.cpu_percent = lambda interval=None: next(cpu)
+    monkeypatch.setattr(psutil, "Process", lambda pid: proc)
+
+    m = Monitor(pid=1234, interval=0.01, backend="psutil", max_interval=0.08)
+    store = m.get_process_usage_by_interval(duration=0, samples=8)
+
+    intervals = list(store.column("interval_s"))
+    assert intervals == pytest.approx([0.01, 0.01, 0.02, 0.04, 0.08, 0.08, 0.08, 0.01])
+    gaps = [b - a for a, b in zip(m.sample_times, m.sample_times[1:])]
+    assert gaps == pytest.approx(intervals[1:])
+
+
+def test_background_run_restores_switch_interval_without_join(monkeypatch):
+    monkeypatch.setattr("procsight.core.monitor.sleep", lambda s: None)
+    before = sys.getswitchinterval()
+    m = Monitor(pid=1234, interval=0.01, backend="psutil")
+    thread = m.start_background(duration=0, samples=3)
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert sys.getswitchinterval() == pytest.approx(before)
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+import psutil
+import pytest
+
+from procsight.core.multi_monitor import MultiMonitor
+from procsight.core.sinks import TailSink
+
+
+class _FakeProc:
+    def __init__(self, pid: int, die_after: int | None = None, error=None):
+        self.pid = pid
+        self._calls = 0
+        self._die_after = die_after
+        self._error = error or psutil.NoSuchProcess
+
+    def cpu_percent(self, interval=None):
+        return 40.0
+
+    def cpu_times(self):
+        self._calls += 1
+        if self._die_after is not None and self._calls > self._die_after:
+            raise self._error(self.pid)
+        return SimpleNamespace(user=1.0, system=0.5)
+
+    def memory_info(self):
+        return SimpleNamespace(rss=10 * 1024**2, vms=20 * 1024**2)
+
+
+@pytest.fixture
+def fake_procs(monkeypatch):
+    procs = {
+        1: _FakeProc(1),
+        2: _FakeProc(2),
+        3: _FakeProc(3, die_after=1),
+        4: _FakeProc(4, die_after=2, error=psutil.AccessDenied),
+    }
+    monkeypatch.setattr(psutil, "cpu_count", lambda logical=True: 4)
+    monkeypatch.setattr(psutil, "Process", lambda pid: procs[pid])
+    monkeypatch.setattr("procsight.core.multi_monitor.sleep", lambda s: None)
+    return procs
+
+
+def test_multi_monitor_shared_ticks(fake_procs):
+    m = MultiMonitor(pids=[1, 2, 1], interval=0.01, backend="psutil")
+    series = m.get_process_usage_by_interval(duration=0, samples=3)
+
+    assert list(series) == [1, 2]
+    assert all(len(s) == 3 for s in series.values())
+    assert m.times_for(1) == m.times_for(2) == m.sample_times
+    cpu, mem = series[2][0]
+    assert cpu.process == pytest.approx(10.0)
+    assert mem.rss == pytest.approx(10.0)
+
+
+def test_multi_monitor_drops_exited_targets(fake_procs):
+    m = MultiMonitor(pids=[1, 3], interval=0.01, backend="psutil", max_workers=2)
+    series = m.get_process_usage_by_interval(duration=0, samples=4)
+
+    assert len(series[1]) == 4
+    assert len(series[3]) == 1
+    assert m.times_for(3) == m.sample_times[:1]
+
+
+def test_multi_monitor_drops_targets_it_cannot_read(fake_procs):
+    m = MultiMonitor(pids=[1, 4], interval=0.01, backend="psutil", max_workers=2)
+    series = m.get_process_usage_by_interval(duration=0, samples=4)
+
+    assert len(series[1]) == 4
+    assert len(series[4]) == 2
+    assert m.times_for(4) == m.sample_times[:2]
+
+
+def test_multi_monitor_streams_each_target_to_its_sinks(fake_procs):
+    opened = {}
+
+    def sinks_for(pid):
+        opened[pid] = TailSink(100)
+        return [opened[pid]]
+
+    m = MultiMonitor(
+        pids=[1, 3], interval=0.01, backend="psutil", sinks=sinks_for, retain=False
+    )
+    series = m.get_process_usage_by_interval(duration=0, samples=4)
+
+    assert len(series[1]) == len(series[3]) == 0
+    assert m.sample_times == []
+    assert opened[1].times == pytest.approx(sorted(opened[1].times))
+    assert len(opened[1]) == 4 and len(opened[3]) == 1
+    cpu, mem = opened[1].samples[0]
+    assert mem.rss == pytest.approx(10.0)
@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import psutil
+import pytest
+
+from procsight.core.monitor import Monitor
+from procsight.core.overhead import ProbeTimer, SelfMonitor, marker
+
+
+class _FakeProc:
+    pid = 9999
+
+    def cpu_percent(self, interval=None):
+        return 50.0
+
+    def cpu_times(self):
+        return SimpleNamespace(user=1.0, system=0.5)
+
+    def memory_info(self):
+        return SimpleNamespace(rss=100 * 1024**2, vms=150 * 1024**2)
+
+
+@pytest.fixture(autouse=True)
+def _patch_psutil(monkeypatch):
+    monkeypatch.setattr(psutil, "cpu_count", lambda logical=True: 1)
+    monkeypatch.setattr(psutil, "Process", lambda pid: _FakeProc())
+    monkeypatch.setattr("procsight.core.monitor.sleep", lambda s: None)
+
+
+def test_probe_timer_charges_time_since_previous_mark(monkeypatch):
+    now = iter([0, 1_000, 1_500, 4_000])
+    monkeypatch.setattr("procsight.core.overhead.perf_counter_ns", lambda: next(now))
+    timer = ProbeTimer()
+    mark = marker(timer)
+    mark("cpu")
+    mark("memory")
+    mark("cpu")
+
+    assert timer.last == {"cpu": 3_500, "memory": 500}
+    # disabled timing is a no-op
+    marker(None)("cpu")
+
+
+def test_self_monitor_series_and_summary():
+    monitor = SelfMonitor(["cpu", "memory"])
+    for i in range(1, 4):
+        monitor.begin()
+        monitor.timer.start()
+        monitor.timer.mark("cpu")
+        monitor.end(i, i * 0.1)
+
+    series = monitor.series
+    assert len(series) == 3
+    row = series[0]
+    assert row["sample"] == 1
+    assert row["self_rss_mb"] == pytest.approx(100.0)
+    assert row["probe_cpu_us"] >= 0
+    assert row["probe_memory_us"] is None
+
+    summary = monitor.summary(wall_s=1.0)
+    assert set(summary) >= {"tick_us", "self_cpu_ms", "probe_cpu_us", "cpu_share"}
+    assert "probe_memory_us" not in summary
+    assert summary["tick_us"]["max"] >= summary["tick_us"]["mean"]
+
+
+def test_monitor_records_self_series_per_tick():
+    m = Monitor(pid=1234, interval=0.01, backend="psutil", self_metrics=True)
+    m.get_process_usage_by_interval(duration=0, samples=4, extended=True)
+
+    series = m.self_series
+    assert series is not None and len(series) == 4
+    probes = [c for c in series.columns if c.startswith("probe_")]
+    assert probes == [f"probe_{p}_us" for p in m._collector.PROBES]
+    assert all(series.row(-1)[c] is not None for c in probes)
+    assert m._collector.timer is not None
+
+    plain = Monitor(pid=1234, interval=0.01, backend="psutil")
+    plain.get_process_usage_by_interval(duration=0, samples=2)
+    assert plain.self_series is None
+    assert plain._collector.timer is None
+
+
+def test_monitor_streams_self_rows_without_retaining(tmp_path):
+    out = tmp_path / "run_self.csv"
+    m = Monitor(
+        pid=1234,
+        interval=0.01,
+        backend="psutil",
+        self_metrics=True,
+        retain=False,
+        self_out=str(out),
+    )
+    m.get_process_usage_by_interval(duration=0, samples=5, extended=True)
+
+    assert m.self_series is not None and len(m.self_series) == 0
+    lines = out.read_text().splitlines()
+    assert lines[0].startswith("sample,time_s,tick_us")
+    assert len(lines) == 6
+    # the summary is kept without the rows
+    assert m._self.summary()["tick_us"]["max"] > 0
@@ -0,0 +1,40 @@
+import pytest
+
+from procsight.core.pipeline import aggregate, take, until, where, windows
+
+
+def _stream(n, closed=None):
+    try:
+        for i in range(n):
+            yield i * 0.5, {"sample": i + 1, "cpu_percent": float(i), "rss_mb": 10.0}
+    finally:
+        if closed is not None:
+            closed.append(True)
+
+
+def test_filters_compose_and_stop_the_source():
+    closed = []
+    busy = where(_stream(100, closed), lambda t, row: row["cpu_percent"] % 2 == 0)
+    out = list(until(busy, lambda t, row: t >= 3.0))
+
+    assert [row["cpu_percent"] for _, row in out] == [0.0, 2.0, 4.0]
+    assert closed == [True]
+
+    closed = []
+    assert len(list(take(_stream(100, closed), 4))) == 4
+    assert closed == [True]
+
+
+def test_windows_and_aggregate_are_time_aligned():
+    batches = list(windows(_stream(7), 1.0))
+    assert [start for start, _ in batches] == [0.0, 1.0, 2.0, 3.0]
+    assert [len(b) for _, b in batches] == [2, 2, 2, 1]
+
+    summaries = list(aggregate(_stream(7), 2.0, columns=["cpu_percent"]))
+    assert [start for start, _ in summaries] == [0.0, 2.0]
+    first = summaries[0][1].as_dict()["cpu_percent"]
+    assert first == {"count": 4, "mean": 1.5, "min": 0.0, "max": 3.0}
+    assert summaries[1][1].means() == {"cpu_percent": pytest.approx(5.0)}
+
+    with pytest.raises(ValueError):
+        next(aggregate(_stream(1), 0))
@@ -1,5 +1,8 @@
 from pathlib import Path
 
+import procsight.visualization.plot as plot_module
+from procsight.core.rows import flatten_sample
+from procsight.core.store import SampleStore
 from procsight.models.metrics import (
     ContextSwitchesUsage,
     CpuUsage,
@@ -11,9 +14,11 @@ from procsight.models.metrics import (
     ThreadUsage,
 )
 from procsight.visualization.plot import (
+    plot_correlation_heatmap,
     plot_cpu_usage,
     plot_from_extended,
     plot_memory_usage,
+    plot_thread_cpu,
 )
 
 
@@ -68,6 +73,7 @@ def test_extended_plot_suite(tmp_path: Path):
         "cpu_components.png",
         "memory_breakdown.png",
         "io_cumulative.png",
+        "throughput.png",
         "ctx_switches.png",
         "descriptors_threads.png",
         "distributions.png",
@@ -75,3 +81,49 @@ def test_extended_plot_suite(tmp_path: Path):
     ]
     for name in expected:
         assert (out_dir / name).exists()
+
+
+def test_extended_plot_suite_renders_in_worker_processes(tmp_path: Path):
+    store = SampleStore(extended=True)
+    store.extend(flatten_sample(s, float(i)) for i, s in enumerate(_samples()))
+
+    plot_from_extended(store, store.times, out_dir=str(tmp_path), show=False, workers=2)
+
+    assert len(list(tmp_path.glob("*.png"))) == 8
+
+
+def test_correlation_heatmap_uses_canonical_columns(monkeypatch):
+    seen = {}
+    monkeypatch.setattr(
+        plot_module.sns, "heatmap", lambda corr, **kw: seen.setdefault("corr", corr)
+    )
+
+    plot_correlation_heatmap(_samples(), show=False)
+
+    labels = set(seen["corr"].columns)
+    assert {"cpu% (per-core)", "rss_mb", "ctx_vol", "read_bytes"} <= labels
+    # all-missing and non-metric columns are left out
+    assert not labels & {"pss_mb", "sample", "pid", "time_s"}
+
+
+def test_thread_cpu_plot_stacks_busiest_threads(tmp_path: Path):
+    series = SampleStore(
+        extended=False,
+        columns=["sample", "time_s", "rank", "tid", "comm", "cpu_percent"],
+    )
+    for i in range(1, 4):
+        for rank, tid in enumerate((101, 102, 103), start=1):
+            series.append(
+                {
+                    "sample": i,
+                    "time_s": float(i),
+                    "rank": rank,
+                    "tid": tid,
+                    "comm": "worker",
+                    "cpu_percent": 40.0 / rank,
+                }
+            )
+
+    path = tmp_path / "threads.png"
+    plot_thread_cpu(series, show=False, save_path=str(path), max_threads=2)
+    assert path.exists()
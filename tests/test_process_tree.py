@@ -0,0 +1,135 @@
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+
+from procsight.core import process_tree
+from procsight.core.multi_monitor import MultiMonitor
+from procsight.core.process_tree import TreeMonitor, aggregate_samples
+from procsight.core.sinks import TailSink
+from procsight.models.metrics import (
+    ContextSwitchesUsage,
+    CpuUsage,
+    DescriptorUsage,
+    IOUsage,
+    MemoryUsage,
+    ProcessMeta,
+    ProcessSample,
+    ThreadUsage,
+)
+
+
+def _sample(pid: int, cpu: float, rss: float, pss: float | None) -> ProcessSample:
+    return ProcessSample(
+        sample=1,
+        cpu=CpuUsage(process=cpu, user=1.0, system=None),
+        memory=MemoryUsage(rss=rss, vms=2 * rss, pss=pss),
+        io=IOUsage(read_count=1, write_count=2, read_bytes=10, write_bytes=20),
+        ctx=ContextSwitchesUsage(voluntary=3, involuntary=4),
+        descriptors=DescriptorUsage(open_files=1, fds=5),
+        threads=ThreadUsage(threads=2),
+        meta=ProcessMeta(pid=pid, uptime_sec=float(pid), status="sleeping"),
+    )
+
+
+def test_aggregate_samples_sums_tree():
+    total = aggregate_samples(
+        [_sample(10, 5.0, 100.0, 40.0), _sample(11, 20.0, 50.0, None)], 7, 10
+    )
+    assert total.sample == 7
+    assert total.cpu.process == pytest.approx(25.0)
+    assert total.cpu.user == pytest.approx(2.0)
+    assert total.cpu.system is None
+    assert total.memory.rss == pytest.approx(150.0)
+    assert total.memory.pss == pytest.approx(40.0)
+    assert total.io.write_bytes == 40
+    assert total.descriptors.fds == 10
+    assert total.threads.threads == 4
+    assert total.meta.pid == 10
+    assert total.meta.uptime_sec == 10.0
+    assert total.meta.processes == 2
+
+
+@pytest.fixture
+def process_tree_root():
+    code = (
+        "import subprocess, sys, time\n"
+        "c = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(20)'])\n"
+        "time.sleep(20)\n"
+    )
+    root = subprocess.Popen([sys.executable, "-c", code])
+    deadline = time.time() + 10
+    while not psutil.Process(root.pid).children() and time.time() < deadline:
+        time.sleep(0.05)
+    yield root.pid
+    for child in psutil.Process(root.pid).children(recursive=True):
+        child.kill()
+    root.kill()
+    root.wait()
+
+
+@pytest.mark.parametrize("children_files", [False, True])
+def test_tree_monitor_tracks_children(monkeypatch, process_tree_root, children_files):
+    monkeypatch.setattr(
+        process_tree, "children_files_supported", lambda: children_files
+    )
+    # exercise the incremental path even on kernels without children files
+    monkeypatch.setattr(
+        process_tree,
+        "read_children",
+        lambda pid: [c.pid for c in psutil.Process(pid).children()],
+    )
+
+    m = TreeMonitor(process_tree_root, interval=0.05, rescan_sec=0.0)
+    series = m.get_process_usage_by_interval(duration=0, samples=3, extended=True)
+    m.close()
+
+    assert process_tree_root in series
+    assert len(series) == 2
+    assert len(m.totals) == 3
+    total = m.totals[-1]
+    assert total.meta.processes == 2
+    assert total.memory.rss == pytest.approx(
+        sum(s[-1].memory.rss for s in series.values())
+    )
+
+
+def test_tree_monitor_streams_and_skips_unreadable_children(
+    monkeypatch, process_tree_root
+):
+    missing = 2**22 + 1  # above pid_max, never a live process
+    monkeypatch.setattr(process_tree, "children_files_supported", lambda: True)
+    monkeypatch.setattr(
+        process_tree,
+        "read_children",
+        lambda pid: (
+            [c.pid for c in psutil.Process(pid).children()]
+            + ([missing] if pid == process_tree_root else [])
+        ),
+    )
+    tried = []
+    monkeypatch.setattr(
+        TreeMonitor,
+        "_add_target",
+        lambda self, pid: tried.append(pid) or MultiMonitor._add_target(self, pid),
+    )
+    per_pid = {}
+    totals = TailSink(10)
+
+    m = TreeMonitor(
+        process_tree_root,
+        interval=0.05,
+        sinks=lambda pid: [per_pid.setdefault(pid, TailSink(10))],
+        total_sinks=[totals],
+        retain=False,
+    )
+    series = m.get_process_usage_by_interval(duration=0, samples=3, extended=True)
+    m.close()
+
+    assert tried.count(missing) == 1
+    assert len(m.totals) == 0 and all(len(s) == 0 for s in series.values())
+    assert len(totals) == 3 and totals.samples[-1].meta.processes == 2
+    assert sorted(len(t) for t in per_pid.values()) == [3, 3]
+    assert m.pss is False
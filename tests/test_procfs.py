@@ -0,0 +1,130 @@
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+
+from procsight.core.procfs import ProcfsCollector, parse_cpu_list, parse_stat
+from procsight.core.sample_collector import SampleCollector, make_collector
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="procfs backend is Linux-only"
+)
+
+
+def test_parse_stat_handles_odd_comm():
+    raw = b"42 (we(ir) d) S 1 42 42 0 -1 0 0 0 0 0 7 3 0 0 20 0 4 0 100 4096 12\n"
+    fields = parse_stat(raw)
+    assert fields[0] == b"S"
+    assert (fields[11], fields[12]) == (b"7", b"3")
+    assert fields[17] == b"4"
+
+
+def test_parse_cpu_list():
+    assert parse_cpu_list(b"0-3,8,10-11") == [0, 1, 2, 3, 8, 10, 11]
+
+
+def test_procfs_matches_psutil_for_self():
+    proc = psutil.Process(os.getpid())
+    collector = ProcfsCollector(os.getpid())
+    collector.prime()
+    sample = collector.sample(1)
+    collector.close()
+
+    mem = proc.memory_info()
+    assert sample.meta.pid == os.getpid()
+    assert sample.memory.rss == pytest.approx(mem.rss / 1024**2, rel=0.2)
+    assert sample.memory.vms == pytest.approx(mem.vms / 1024**2, rel=0.2)
+    assert sample.threads.threads == proc.num_threads()
+    assert sample.descriptors.fds > 0
+    assert sample.meta.uptime_sec == pytest.approx(
+        max(0.0, time.time() - proc.create_time()), abs=1.0
+    )
+
+
+def test_procfs_raises_no_such_process_after_exit():
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    collector = ProcfsCollector(child.pid)
+    child.wait()
+    with pytest.raises(psutil.NoSuchProcess):
+        collector.basic()
+    collector.close()
+
+
+@pytest.mark.parametrize("backend", ["procfs", "psutil"])
+def test_read_row_skips_probes_for_unwanted_columns(backend):
+    collector = make_collector(psutil.Process(os.getpid()), backend)
+    collector.prime()
+    row = collector.read_row(1, {"fds"})
+    full = collector.read_row(2)
+    collector.close()
+
+    assert row["fds"] > 0 and row["rss_mb"] > 0 and row["threads"] > 0
+    for name in ("read_bytes", "ctx_voluntary", "shared_mb", "pss_mb"):
+        assert row[name] is None
+    assert full["ctx_voluntary"] is not None and full["shared_mb"] is not None
+    assert row["rss_mb"] == pytest.approx(full["rss_mb"], rel=0.2)
+
+
+def test_make_collector_backends():
+    proc = psutil.Process(os.getpid())
+    assert isinstance(make_collector(proc, "auto"), ProcfsCollector)
+    assert isinstance(make_collector(proc, "psutil"), SampleCollector)
+    with pytest.raises(ValueError):
+        make_collector(proc, "nope")
+
+
+def _stat(utime: int, stime: int, threads: int) -> bytes:
+    # fields after "(comm)": state is [0], utime [11], stime [12], num_threads [17]
+    fields = ["S"] + ["0"] * 23
+    fields[11], fields[12], fields[17] = str(utime), str(stime), str(threads)
+    fields[19], fields[20], fields[21] = "100", str(1024**2), "256"
+    return f"42 (app) {' '.join(fields)}\n".encode()
+
+
+def test_read_fast_falls_back_to_ticks_once_threads_start(monkeypatch):
+    collector = ProcfsCollector(os.getpid())
+    if "schedstat" not in collector._fds:
+        collector.close()
+        pytest.skip("kernel without schedstat")
+    ticks = collector._clk_tck
+    files = {}
+    monkeypatch.setattr(collector, "_read", lambda name: files[name])
+    reads = []
+
+    def read(utime, stime, threads, run_ns):
+        files["stat"] = _stat(utime, stime, threads)
+        files["schedstat"] = f"{run_ns} 0 0\n".encode()
+        reads.append(collector.read_fast()[0] * collector._cores)
+
+    read(0, 0, 1, 5_000_000)
+    read(1, 0, 1, 12_500_000)  # single-threaded: ns-resolution schedstat delta
+    read(1 + int(ticks), 0, 3, 13_000_000)  # threads: the leader alone is too little
+    read(1 + 2 * int(ticks), 0, 3, 13_000_000)
+    collector.close()
+
+    assert reads[1] - reads[0] == pytest.approx(0.0075)
+    assert reads[2] - reads[1] == pytest.approx(1.0)
+    assert reads[3] - reads[2] == pytest.approx(1.0)
+
+
+def test_affinity_change_is_picked_up_without_status(monkeypatch):
+    collector = ProcfsCollector(os.getpid())
+    collector.prime()
+    monkeypatch.setattr("procsight.core.procfs.AFFINITY_REFRESH_SEC", 0.0)
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {2, 0})
+    try:
+        collector.read_basic_row()
+        assert collector._cores == 2
+        assert collector.read_row(1, {"fds"})["cpu_affinity"] == (0, 2)
+
+        before = collector.read_fast()[0]
+        monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {3})
+        collector.read_basic_row()
+        assert collector._cores == 1
+        # the cumulative CPU seconds do not jump when the core count changes
+        assert collector.read_fast()[0] - before < 0.5
+    finally:
+        collector.close()
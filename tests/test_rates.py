@@ -0,0 +1,67 @@
+import math
+
+import numpy as np
+import pytest
+
+from procsight.core.rates import RATE_COLUMNS, RateTracker, compute_rates, fill_rates
+from procsight.core.store import SampleStore, as_store
+from procsight.models.metrics import (
+    ContextSwitchesUsage,
+    CpuUsage,
+    DescriptorUsage,
+    IOUsage,
+    MemoryUsage,
+    ProcessMeta,
+    ProcessSample,
+    ThreadUsage,
+)
+
+TIMES = [0.0, 0.5, 1.5, 2.0, 3.0]
+COUNTS = [100, 150, 250, 20, 40]  # reset between ticks 3 and 4
+
+
+def test_vectorized_rates_use_real_elapsed_time_and_handle_resets():
+    rates = compute_rates(TIMES, COUNTS)
+    assert math.isnan(rates[0])
+    # 50 over 0.5 s, 100 over 1 s, reset: 20 since zero over 0.5 s, 20 over 1 s
+    assert rates[1:].tolist() == [100.0, 100.0, 40.0, 20.0]
+    assert math.isnan(compute_rates([0.0, 0.0], [1, 2])[1])
+
+
+def test_streaming_rates_match_vectorized():
+    tracker = RateTracker()
+    streamed = []
+    for t, n in zip(TIMES, COUNTS):
+        row = tracker.update({"time_s": t, "read_bytes": n, "cpu_user": n / 1000})
+        streamed.append(row)
+
+    assert all(streamed[0][c] is None for c in RATE_COLUMNS)
+    assert [r["read_bytes_per_s"] for r in streamed[1:]] == [100.0, 100.0, 40.0, 20.0]
+    # cumulative CPU seconds per core -> per-core percent
+    assert streamed[1]["cpu_user_percent"] == pytest.approx(10.0)
+    assert streamed[1]["ctx_voluntary_per_s"] is None  # counter missing
+
+
+def _sample(i: int) -> ProcessSample:
+    return ProcessSample(
+        sample=i,
+        cpu=CpuUsage(process=10.0, user=0.1 * i, system=0.0),
+        memory=MemoryUsage(rss=50.0, vms=70.0),
+        io=IOUsage(read_count=i, write_count=0, read_bytes=100 * i, write_bytes=0),
+        ctx=ContextSwitchesUsage(voluntary=i, involuntary=2 * i),
+        descriptors=DescriptorUsage(open_files=0, fds=3),
+        threads=ThreadUsage(threads=1),
+        meta=ProcessMeta(pid=1, uptime_sec=float(i), status="running"),
+    )
+
+
+def test_stores_built_from_models_get_rate_columns():
+    store = as_store([_sample(i) for i in (1, 2, 3)], times=[0.0, 0.5, 1.5])
+    np.testing.assert_allclose(store.column("read_bytes_per_s"), [np.nan, 200.0, 100.0])
+    assert store[1].io.read_bytes == 200
+
+    rows = SampleStore(extended=True)
+    rows.extend(store.rows())
+    rows.column("ctx_involuntary_per_s")[:] = np.nan
+    fill_rates(rows)
+    np.testing.assert_allclose(rows.column("ctx_involuntary_per_s"), [np.nan, 4.0, 2.0])
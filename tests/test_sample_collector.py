@@ -4,7 +4,11 @@ from types import SimpleNamespace
 import psutil
 import pytest
 
-from procsight.core.sample_collector import collect_basic_tuple, collect_sample
+from procsight.core.sample_collector import (
+    SampleCollector,
+    collect_basic_tuple,
+    collect_sample,
+)
 
 
 class FakeProc:
@@ -98,3 +102,70 @@ def test_collect_sample_full_payload():
     assert sample.threads.threads == 5
     assert sample.meta.pid == 4242
     assert sample.meta.status == "running"
+
+
+class CountingProc(FakeProc):
+    def __init__(self):
+        super().__init__()
+        self.affinity = [0, 1]
+        self.affinity_calls = 0
+        self.create_time_calls = 0
+        self.oneshot_calls = 0
+
+    def cpu_affinity(self):
+        self.affinity_calls += 1
+        return list(self.affinity)
+
+    def create_time(self):
+        self.create_time_calls += 1
+        return self._create_time
+
+    def oneshot(self):
+        from contextlib import contextmanager
+
+        @contextmanager
+        def _cm():
+            self.oneshot_calls += 1
+            yield
+
+        return _cm()
+
+
+def test_collector_caches_static_attributes():
+    proc = CountingProc()
+    collector = SampleCollector(proc)  # type: ignore[arg-type]
+    collector.prime()
+
+    for i in range(1, 6):
+        sample = collector.sample(i)
+        # 200% total across the 2 cores in affinity => 100% per core
+        assert sample.cpu.process == pytest.approx(100.0)
+        assert sample.meta.cpu_affinity == [0, 1]
+    collector.basic()
+
+    # the affinity is one syscall per tick; the create time stays cached
+    assert proc.affinity_calls == 1 + 6
+    assert proc.create_time_calls == 1
+    assert proc.oneshot_calls == 6
+
+
+def test_collector_refreshes_static_on_timer():
+    proc = CountingProc()
+    collector = SampleCollector(proc, static_refresh_sec=0.0)  # type: ignore[arg-type]
+    collector.sample(1)
+    collector.sample(2)
+
+    assert proc.create_time_calls == 3
+
+
+def test_collector_picks_up_affinity_changes_on_the_next_tick():
+    proc = CountingProc()
+    collector = SampleCollector(proc)  # type: ignore[arg-type]
+    collector.prime()
+    assert collector.sample(1).cpu.process == pytest.approx(100.0)
+
+    # taskset down to one core: 200% total is now 200% of that core
+    proc.affinity = [1]
+    sample = collector.sample(2)
+    assert sample.cpu.process == pytest.approx(200.0)
+    assert sample.meta.cpu_affinity == [1]
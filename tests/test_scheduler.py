@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from procsight.core.scheduler import DeadlineScheduler
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _scheduler(policy: str, clock: _FakeClock) -> DeadlineScheduler:
+    s = DeadlineScheduler(1.0, policy, clock=clock, sleep=clock.sleep)
+    s.start()
+    return s
+
+
+def test_probe_cost_does_not_drift():
+    clock = _FakeClock()
+    s = _scheduler("skip", clock)
+    starts = []
+    for _ in range(5):
+        s.wait()
+        starts.append(clock.now)
+        clock.now += 0.3  # probe cost
+    assert starts == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert s.missed == 0
+
+
+@pytest.mark.parametrize(
+    "policy, offsets, lateness, missed",
+    [
+        ("skip", [0.0, 2.0, 3.0], [0.0, 0.5, 0.0], [0, 1, 0]),
+        ("catchup", [0.0, 1.0, 2.0, 3.0], [0.0, 1.5, 0.5, 0.0], [0, 0, 0, 0]),
+        ("stretch", [0.0, 1.0, 3.5], [0.0, 1.5, 0.0], [0, 1, 0]),
+    ],
+)
+def test_overrun_policies(policy, offsets, lateness, missed):
+    clock = _FakeClock()
+    s = _scheduler(policy, clock)
+    ticks = [s.wait()]
+    clock.now += 2.5  # one slow probe overruns the next deadline
+    ticks += [s.wait() for _ in range(len(offsets) - 1)]
+
+    assert [t.offset for t in ticks] == pytest.approx(offsets)
+    assert [t.lateness for t in ticks] == pytest.approx(lateness)
+    assert [t.missed for t in ticks] == missed
+    assert s.missed == sum(missed)
+    assert s.max_lateness == pytest.approx(max(lateness))
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        DeadlineScheduler(1.0, "drop")
+
+
+def test_wait_async_follows_the_loop_clock():
+    async def run():
+        loop = asyncio.get_running_loop()
+        s = DeadlineScheduler(0.01, "skip", clock=loop.time)
+        ticks = [await s.wait_async() for _ in range(3)]
+        return ticks, loop.time() - s._start
+
+    ticks, took = asyncio.run(run())
+    assert [t.offset for t in ticks] == pytest.approx([0.0, 0.01, 0.02])
+    assert took >= 0.02 - 1e-3
+
+
+def test_adaptive_scheduler_backs_off_and_snaps_back():
+    from procsight.core.scheduler import AdaptiveScheduler
+
+    clock = _FakeClock()
+    s = AdaptiveScheduler(1.0, 4.0, clock=clock, sleep=clock.sleep)
+    s.start()
+    offsets = []
+    for active in [True, False, False, False, False, True, False]:
+        tick = s.wait()
+        offsets.append((tick.offset, tick.interval))
+        s.adapt(active)
+
+    assert offsets == [
+        (0.0, 1.0),
+        (1.0, 1.0),
+        (3.0, 2.0),
+        (7.0, 4.0),
+        (11.0, 4.0),
+        (15.0, 4.0),
+        (16.0, 1.0),
+    ]
+    with pytest.raises(ValueError):
+        AdaptiveScheduler(2.0, 1.0)
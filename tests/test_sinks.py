@@ -0,0 +1,89 @@
+import json
+
+import pandas as pd
+import pytest
+
+from procsight.core.sinks import (
+    CsvSink,
+    NdjsonSink,
+    TailSink,
+    _BatchedFileSink,
+    open_file_sink,
+)
+from procsight.models.metrics import (
+    ContextSwitchesUsage,
+    CpuUsage,
+    DescriptorUsage,
+    IOUsage,
+    MemoryUsage,
+    ProcessMeta,
+    ProcessSample,
+    ThreadUsage,
+)
+
+
+def _mk_sample(i: int) -> ProcessSample:
+    return ProcessSample(
+        sample=i,
+        cpu=CpuUsage(process=10.0 * i, user=1.0, system=0.5),
+        memory=MemoryUsage(rss=50.0 + i, vms=75.0 + i),
+        io=IOUsage(read_count=i, write_count=i, read_bytes=100 * i, write_bytes=0),
+        ctx=ContextSwitchesUsage(voluntary=i, involuntary=2 * i),
+        descriptors=DescriptorUsage(open_files=i, fds=2 * i),
+        threads=ThreadUsage(threads=1),
+        meta=ProcessMeta(
+            pid=1, uptime_sec=float(i), status="running", cpu_affinity=[0, 1]
+        ),
+    )
+
+
+def test_csv_sink_flushes_in_batches_and_appends_avg(tmp_path):
+    path = tmp_path / "run.csv"
+    sink = CsvSink(str(path), extended=True, batch_size=2, flush_sec=3600)
+
+    sink.write(0.0, _mk_sample(1))
+    assert len(path.read_text().splitlines()) == 1  # header only, row pending
+    sink.write(0.5, _mk_sample(2))
+    assert len(path.read_text().splitlines()) == 3
+    sink.write(1.0, _mk_sample(3))
+    sink.close()
+
+    df = pd.read_csv(path)
+    assert len(df) == 8
+    assert list(df["sample"][3:]) == ["p50", "p95", "p99", "max", "avg"]
+    assert float(df.iloc[-1]["cpu_percent"]) == pytest.approx(20.0)
+    assert list(df["time_s"][:3]) == [0.0, 0.5, 1.0]
+    assert df.iloc[0]["cpu_affinity"] == "0;1"
+
+
+def test_ndjson_sink_basic_tuples(tmp_path):
+    path = tmp_path / "run.ndjson"
+    sink = open_file_sink(str(path), extended=False)
+    assert isinstance(sink, NdjsonSink)
+    for i in range(3):
+        sink.write(float(i), (CpuUsage(process=i), MemoryUsage(rss=1.0, vms=2.0)))
+    sink.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["sample"] for r in records] == [1, 2, 3]
+    assert records[2]["cpu"]["process"] == 2.0
+    assert records[1]["time_s"] == 1.0
+
+
+def test_tail_sink_is_bounded():
+    tail = TailSink(maxlen=3)
+    for i in range(10):
+        tail.write(float(i), i)
+    assert len(tail) == 3
+    assert tail.times == [7.0, 8.0, 9.0]
+    assert tail.samples == [7, 8, 9]
+
+
+def test_incomplete_file_sink_fails_when_created(tmp_path):
+    class _NoWriter(_BatchedFileSink):
+        def write(self, elapsed, item):
+            self._push(item)
+
+    with pytest.raises(TypeError):
+        _NoWriter(str(tmp_path / "out.txt"))
+    assert not (tmp_path / "out.txt").exists()
@@ -0,0 +1,43 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("pandas", "matplotlib", "seaborn", "numpy", "pydantic", "pyarrow")
+
+_RUN = """
+import json, subprocess, sys
+import main
+target = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(5)"])
+sys.argv = ["procsight", "--pid", str(target.pid), "--samples", "3",
+            "--interval", "0.01", "--no-show", "--out", sys.argv[1]]
+try:
+    main.main()
+finally:
+    target.kill()
+print(json.dumps(sorted(m for m in {heavy} if m in sys.modules)))
+"""
+
+
+def _loaded(code: str, *args: str):
+    out = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_cli_import_does_not_load_heavy_modules():
+    code = f"import json, sys, main; print(json.dumps([m for m in {HEAVY} if m in sys.modules]))"
+    assert _loaded(code) == []
+
+
+def test_sampling_to_csv_does_not_load_heavy_modules(tmp_path):
+    out = tmp_path / "run.csv"
+    assert _loaded(_RUN.format(heavy=HEAVY), str(out)) == []
+    # header, 3 samples, p50/p95/p99/max, avg
+    assert len(out.read_text().splitlines()) == 9
@@ -0,0 +1,95 @@
+import random
+
+import numpy as np
+import pytest
+
+from procsight.core.stats import RunStats, TDigest, merge_files
+
+
+def test_tdigest_quantiles_and_merge_track_exact_values():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(0, 1) for _ in range(20_000)]
+    whole, first, second = TDigest(), TDigest(), TDigest()
+    for i, v in enumerate(values):
+        whole.add(v)
+        (first if i % 2 else second).add(v)
+    first.merge(second)
+
+    assert len(whole._means) <= whole.compression
+    for q in (0.5, 0.95, 0.99):
+        exact = np.quantile(values, q)
+        assert whole.quantile(q) == pytest.approx(exact, rel=0.02)
+        assert first.quantile(q) == pytest.approx(exact, rel=0.02)
+    assert first.count == len(values) and first.max == max(values)
+
+
+def _run(cpu_values, start=0.0):
+    return [
+        {"sample": i + 1, "time_s": start + i * 0.5, "cpu_percent": v, "rss_mb": 10.0}
+        for i, v in enumerate(cpu_values)
+    ]
+
+
+def test_run_stats_summary_rows_and_time_above_threshold():
+    stats = RunStats(["sample", "time_s", "cpu_percent", "rss_mb"], {"cpu_percent": 50})
+    stats.extend(_run([10, 60, 70, 20, 90]))
+
+    summary = stats.summary()
+    assert set(summary) == {"cpu_percent", "rss_mb"}
+    cpu = summary["cpu_percent"]
+    assert cpu["mean"] == pytest.approx(50.0)
+    assert cpu["max"] == 90 and cpu["min"] == 10
+    assert cpu["above_s"] == pytest.approx(1.5)  # three 0.5 s gaps end above 50
+    assert "above_s" not in summary["rss_mb"]
+
+    rows = stats.summary_rows()
+    assert [r["sample"] for r in rows] == ["p50", "p95", "p99", "max", "above_s", "avg"]
+    assert rows[-1]["cpu_percent"] == pytest.approx(50.0)
+    assert "rss_mb" not in rows[4]
+
+
+def test_run_stats_round_trip_through_json_and_merge(tmp_path):
+    a, b = RunStats(["cpu_percent"]), RunStats(["cpu_percent"], {"cpu_percent": 50})
+    a.extend(_run([10, 20, 30]))
+    b.extend(_run([60, 70], start=100.0))
+    a.save(str(tmp_path / "a.json"))
+    b.save(str(tmp_path / "b.json"))
+
+    merged = merge_files([str(tmp_path / "a.json"), str(tmp_path / "b.json")])
+    cpu = merged.summary()["cpu_percent"]
+    assert cpu["count"] == 5
+    assert cpu["mean"] == pytest.approx(38.0)
+    assert cpu["max"] == 70
+    assert cpu["above_s"] == pytest.approx(0.5)
+
+
+def test_samples_are_weighted_by_their_interval():
+    stats = RunStats(["interval_s", "cpu_percent"])
+    # one flat 8 s stretch at 10%, then a burst of four 0.5 s ticks at 90%
+    stats.extend(
+        [{"interval_s": 8.0, "cpu_percent": 10.0}]
+        + [{"interval_s": 0.5, "cpu_percent": 90.0}] * 4
+    )
+    cpu = stats.summary()["cpu_percent"]
+    assert cpu["mean"] == pytest.approx(26.0)  # (8 * 10 + 2 * 90) / 10
+    assert cpu["p50"] < 50
+    assert "interval_s" not in stats.summary()
+
+
+def test_cumulative_counters_are_summarized_by_their_rates():
+    columns = ["sample", "time_s", "read_bytes", "read_bytes_per_s", "cpu_user"]
+    stats = RunStats(columns)
+    stats.extend(
+        {
+            "sample": i + 1,
+            "time_s": float(i),
+            "read_bytes": 1000 * i,
+            "read_bytes_per_s": 1000.0 if i else None,
+            "cpu_user": 0.5 * i,
+        }
+        for i in range(5)
+    )
+
+    summary = stats.summary()
+    assert set(summary) == {"read_bytes_per_s"}
+    assert summary["read_bytes_per_s"]["p50"] == pytest.approx(1000.0)
@@ -0,0 +1,95 @@
+import math
+
+import pytest
+
+from procsight.core.rows import flatten_sample
+from procsight.core.store import SampleStore, as_store
+from procsight.models.metrics import (
+    ContextSwitchesUsage,
+    CpuUsage,
+    DescriptorUsage,
+    IOUsage,
+    MemoryUsage,
+    ProcessMeta,
+    ProcessSample,
+    ThreadUsage,
+)
+
+
+def _mk_sample(idx: int) -> ProcessSample:
+    return ProcessSample(
+        sample=idx,
+        cpu=CpuUsage(process=10.0 * idx, user=1.0, system=0.5),
+        memory=MemoryUsage(rss=100.0 + idx, vms=200.0, shared=10.0),
+        io=IOUsage(read_count=1, write_count=2, read_bytes=3, write_bytes=4),
+        ctx=ContextSwitchesUsage(voluntary=5, involuntary=6),
+        descriptors=DescriptorUsage(open_files=7, fds=8),
+        threads=ThreadUsage(threads=9),
+        meta=ProcessMeta(pid=42, uptime_sec=1.5, status="running", cpu_affinity=[0, 1]),
+    )
+
+
+def test_store_round_trips_models():
+    store = SampleStore(extended=True)
+    store.append(flatten_sample(_mk_sample(1), time_s=0.0))
+    store.append(flatten_sample(_mk_sample(2), time_s=0.5))
+
+    assert len(store) == 2
+    assert store[1] == _mk_sample(2)
+    assert store[-1].memory.pss is None
+    assert store.times == [0.0, 0.5]
+    assert [s.sample for s in store[:]] == [1, 2]
+
+
+def test_store_growth_keeps_views_valid():
+    store = SampleStore(extended=False, capacity=2)
+    row = {"cpu_percent": 1.0, "rss_mb": 2.0, "vms_mb": 3.0}
+    store.append({**row, "sample": 1, "time_s": 0.0})
+    view = store.column("rss_mb")
+    for i in range(2, 10):
+        store.append({**row, "sample": i, "time_s": float(i), "rss_mb": float(i)})
+
+    assert list(view) == [2.0]
+    assert store.column("rss_mb").tolist() == [2.0] + [float(i) for i in range(2, 10)]
+    assert store.column("sample").tolist() == list(range(1, 10))
+    assert math.isnan(store.column("cpu_user")[0])
+    assert store.nbytes == 9 * (8 * len(store.columns))
+
+
+def test_store_to_dataframe_dtypes():
+    store = SampleStore(extended=True)
+    store.extend([flatten_sample(_mk_sample(i), time_s=i * 0.1) for i in (1, 2, 3)])
+    df = store.to_dataframe()
+
+    assert df["sample"].dtype == "int64"
+    assert df["cpu_percent"].tolist() == pytest.approx([10.0, 20.0, 30.0])
+    assert df["status"].dtype == "category"
+    assert df["cpu_affinity"].tolist() == ["0;1"] * 3
+    assert df["read_chars"].isna().all()
+
+
+def test_as_store_converts_models_once():
+    samples = [_mk_sample(i) for i in range(1, 4)]
+    store = as_store(samples, times=[0.0, 0.5, 1.0])
+
+    assert store.extended
+    assert as_store(store) is store
+    assert store.times == [0.0, 0.5, 1.0]
+    assert store[1] == samples[1]
+
+    basic = as_store([(s.cpu, s.memory) for s in samples])
+    assert not basic.extended
+    assert basic.column("sample").tolist() == [1, 2, 3]
+    assert basic.column("rss_mb").tolist() == [s.memory.rss for s in samples]
+
+
+def test_missing_counters_round_trip_as_none():
+    store = SampleStore(extended=True)
+    row = flatten_sample(_mk_sample(1), time_s=0.0)
+    store.append({**row, "read_bytes": None, "ctx_voluntary": None, "fds": None})
+
+    back = store.row(0)
+    assert back["read_bytes"] is None and back["fds"] is None
+    assert back["read_count"] == 1 and isinstance(back["read_count"], int)
+    assert math.isnan(store.column("ctx_voluntary")[0])
+    assert store[0].io.read_bytes is None
@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import psutil
+import pytest
+
+from procsight.core.monitor import Monitor
+from procsight.core.procfs import procfs_available
+from procsight.core.threads import THREAD_COLUMNS, ThreadCpuReader, ThreadTracker
+
+
+def _spin(stop: threading.Event, tid: list) -> None:
+    tid.append(threading.get_native_id())
+    while not stop.is_set():
+        pass
+
+
+@pytest.mark.skipif(not procfs_available(), reason="needs /proc")
+def test_tracker_finds_the_busy_thread_on_procfs():
+    stop = threading.Event()
+    tid: list = []
+    spinner = threading.Thread(target=_spin, args=(stop, tid), name="spinner")
+    tracker = ThreadTracker(os.getpid(), top_k=2)
+    try:
+        tracker.prime()
+        spinner.start()
+        time.sleep(0.5)
+        rows = tracker.update(1, 0.5)
+    finally:
+        stop.set()
+        spinner.join()
+        tracker.close()
+
+    assert rows[0]["rank"] == 1
+    assert rows[0]["tid"] == tid[0]
+    assert rows[0]["comm"]  # names come from /proc
+    assert rows[0]["cpu_percent"] > 30
+    assert len(rows) <= 2
+    assert len(tracker.series) == len(rows)
+    assert tracker.totals[tid[0]][1] > 0
+    # the reader keeps thread stat files open and drops them once a thread exits
+    reader = tracker.reader
+    assert reader._fds == {}
+
+
+class _FakeProc:
+    def __init__(self):
+        self.ticks = []
+
+    def threads(self):
+        return [
+            SimpleNamespace(id=tid, user_time=u, system_time=s)
+            for tid, u, s in self.ticks.pop(0)
+        ]
+
+
+def test_tracker_ranks_top_k_from_psutil(monkeypatch):
+    proc = _FakeProc()
+    proc.ticks = [
+        [(1, 0.0, 0.0), (2, 1.0, 0.0), (3, 5.0, 0.0)],
+        # 1 s later: tid 1 pins a core, tid 2 uses 30%, tid 3 is idle, tid 4 is new
+        [(1, 0.9, 0.1), (2, 1.2, 0.1), (3, 5.0, 0.0), (4, 0.05, 0.0)],
+        # tid 1 has exited
+        [(2, 1.2, 0.1), (4, 0.1, 0.0)],
+    ]
+    monkeypatch.setattr(psutil, "Process", lambda pid: proc)
+    clock = iter([10.0, 11.0, 12.0])
+    monkeypatch.setattr("procsight.core.threads.monotonic", lambda: next(clock))
+
+    tracker = ThreadTracker(1234, top_k=2, backend="psutil")
+    tracker.prime()
+    rows = tracker.update(1, 1.0)
+
+    assert [(r["rank"], r["tid"]) for r in rows] == [(1, 1), (2, 2)]
+    assert rows[0]["cpu_percent"] == pytest.approx(100.0)
+    assert rows[0]["user_percent"] == pytest.approx(90.0)
+    assert rows[0]["system_percent"] == pytest.approx(10.0)
+    assert rows[1]["cpu_percent"] == pytest.approx(30.0)
+    assert rows[0]["comm"] == ""
+    assert tracker._hot == {1}
+
+    rows = tracker.update(2, 2.0)
+    assert [r["tid"] for r in rows] == [4]
+    assert rows[0]["cpu_percent"] == pytest.approx(5.0)
+    assert tracker.totals[1] == ("", pytest.approx(1.0))
+    assert len(tracker.series) == 3
+
+    with pytest.raises(ValueError):
+        ThreadTracker(1234, top_k=0, backend="psutil")
+
+
+def test_tracker_forgets_exited_threads(monkeypatch):
+    proc = _FakeProc()
+    # a fresh short-lived thread every tick; the one started at tick 3 is busiest
+    proc.ticks = [[(1, 0.0, 0.0)]] + [
+        [(1, 0.1 * i, 0.0), (100 + i, 0.5 if i == 3 else 0.01 * i, 0.0)]
+        for i in range(1, 51)
+    ]
+    monkeypatch.setattr(psutil, "Process", lambda pid: proc)
+    clock = iter(range(100))
+    monkeypatch.setattr("procsight.core.threads.monotonic", lambda: next(clock))
+
+    tracker = ThreadTracker(1234, top_k=2, backend="psutil", retain=False)
+    tracker.prime()
+    for i in range(1, 51):
+        tracker.update(i, float(i))
+
+    assert len(tracker.series) == 0
+    # the live threads plus the two busiest exited ones
+    assert set(tracker.totals) == {1, 150, 103, 149}
+
+
+def test_monitor_records_thread_series():
+    monitor = Monitor(os.getpid(), interval=0.05, threads=3)
+    monitor.get_process_usage_by_interval(duration=0, samples=3, extended=True)
+    series = monitor.thread_series
+    assert series is not None
+    assert series.columns[:5] == ["sample", "time_s", "rank", "tid", "comm"]
+    for row in series:
+        assert 1 <= row["rank"] <= 3
+
+    # basic runs have no per-thread series
+    monitor.get_process_usage_by_interval(duration=0, samples=1, extended=False)
+    assert monitor.thread_series is None
+
+
+def test_reader_raises_for_missing_process():
+    with pytest.raises(psutil.NoSuchProcess):
+        ThreadCpuReader(2**22 + 1)
+
+
+def test_monitor_streams_thread_rows(tmp_path):
+    out = tmp_path / "run_threads.csv"
+    monitor = Monitor(
+        os.getpid(), interval=0.05, threads=2, retain=False, threads_out=str(out)
+    )
+    monitor.get_process_usage_by_interval(duration=0, samples=3, extended=True)
+
+    assert len(monitor.thread_series) == 0
+    lines = out.read_text().splitlines()
+    assert lines[0] == ",".join(THREAD_COLUMNS)
+    assert len(lines) <= 1 + 2 * 3
@@ -0,0 +1,109 @@
+import csv
+
+import pytest
+
+from procsight.core.trigger import Condition, TriggeredCapture, parse_condition
+
+
+class _ReplayMonitor:
+    """Yields one row per tick, advancing time by the current interval."""
+
+    def __init__(self, interval, rss):
+        self.interval = interval
+        self.rss = rss
+        self.intervals = []
+        self.columns = []
+        self._current = interval
+
+    def set_interval(self, interval):
+        self._current = interval
+        self.intervals.append(interval)
+
+    def set_columns(self, columns):
+        self.columns.append(columns)
+
+    def iter_samples(self, duration=0, samples=0, extended=False, rows=False):
+        t = 0.0
+        for i, rss in enumerate(self.rss, start=1):
+            yield t, {"sample": i, "time_s": t, "rss_mb": rss, "pid": 1}
+            t += self._current
+
+
+def test_parse_condition_specs():
+    c = parse_condition("cpu_percent>80x3")
+    assert (c.column, c.op, c.value, c.ticks) == ("cpu_percent", ">", 80.0, 3)
+    assert parse_condition("fds+10").spec == "fds+10"
+    with pytest.raises(ValueError):
+        parse_condition("rss_mb>=2048")
+
+
+def test_conditions_need_consecutive_ticks_or_growth():
+    high = Condition("cpu_percent", ">", 80.0, ticks=2)
+    assert [high.update({"cpu_percent": v}) for v in [90, 50, 90, 95, 99]] == [
+        False,
+        False,
+        False,
+        True,
+        True,
+    ]
+    growth = parse_condition("fds+10x2")
+    assert [growth.update({"fds": v}) for v in [5, 10, 15, 16, 30]] == [
+        False,
+        False,
+        True,
+        False,
+        True,
+    ]
+
+
+def test_capture_writes_only_the_window_around_the_trigger(tmp_path):
+    # base rate 5 s; RSS jumps at t=50 and stays high
+    monitor = _ReplayMonitor(5.0, [10.0] * 10 + [500.0] * 20)
+    out = tmp_path / "run.csv"
+    capture = TriggeredCapture(
+        monitor,
+        [parse_condition("rss_mb>100")],
+        str(out),
+        capture_interval=0.5,
+        window_s=2.0,
+        pre_s=10.0,
+    )
+    incidents = capture.run()
+
+    # the condition holds after the capture, so it does not fire again
+    assert incidents == [str(tmp_path / "run_trigger1.csv")]
+    assert not out.exists()
+    assert monitor.intervals == [0.5, 5.0]
+    # only the condition's column at the base rate, everything in the window
+    assert monitor.columns == [{"rss_mb"}, None, {"rss_mb"}, None]
+    with open(incidents[0]) as f:
+        rows = [r for r in csv.DictReader(f) if r["sample"].isdigit()]
+    times = [float(r["time_s"]) for r in rows]
+    # 10 s of buffered base-rate rows, the trigger tick, then 2 s at 0.5 s
+    assert times == pytest.approx([40.0, 45.0, 50.0, 50.5, 51.0, 51.5, 52.0])
+
+
+def test_condition_rearms_once_it_clears(tmp_path):
+    monitor = _ReplayMonitor(5.0, [10.0] * 3 + [500.0] * 8 + [10.0] * 2 + [500.0] * 8)
+    capture = TriggeredCapture(
+        monitor,
+        [parse_condition("rss_mb>100")],
+        str(tmp_path / "run.csv"),
+        1.0,
+        2.0,
+        0.0,
+    )
+    assert [p.rsplit("/", 1)[-1] for p in capture.run()] == [
+        "run_trigger1.csv",
+        "run_trigger2.csv",
+    ]
+    assert monitor.intervals == [1.0, 5.0, 1.0, 5.0]
+
+
+def test_rate_conditions_read_their_counters(tmp_path):
+    capture = TriggeredCapture(
+        _ReplayMonitor(5.0, []),
+        [parse_condition("read_bytes_per_s>1e6"), parse_condition("fds+10")],
+        str(tmp_path / "run.csv"),
+    )
+    assert capture.columns == {"read_bytes_per_s", "read_bytes", "fds"}
@@ -0,0 +1,52 @@
+import math
+
+from procsight.visualization.tui import (
+    SPARK_CHARS,
+    TerminalView,
+    format_value,
+    sparkline,
+)
+
+
+def _row(i: int, cpu: float) -> dict:
+    return {"sample": i, "cpu_percent": cpu, "rss_mb": 50.0, "vms_mb": 80.0}
+
+
+def test_sparkline_scales_and_keeps_spikes_when_bucketing():
+    assert sparkline([0, 1, 2, 3, 4, 5, 6, 7], 8) == SPARK_CHARS
+    assert sparkline([3.0, 3.0], 4) == SPARK_CHARS[0] * 2
+    assert sparkline([1.0, math.nan, 2.0], 3)[1] == " "
+
+    values = [0.0] * 100
+    values[37] = 9.0
+    line = sparkline(values, 10)
+    assert len(line) == 10
+    assert line[3] == SPARK_CHARS[-1]
+    assert line.count(SPARK_CHARS[-1]) == 1
+
+
+def test_format_value_fits_a_cell():
+    assert format_value(12.345) == "12.3"
+    assert format_value(42.0) == "42"
+    assert format_value(123456.0) == "123k"
+    assert format_value(5.5e9) == "5.5G"
+    assert format_value(math.nan) == "-"
+
+
+def test_view_tracks_window_and_running_extremes():
+    view = TerminalView(extended=False, interval=1.0, window_sec=4.0, ascii_only=True)
+    for i, cpu in enumerate([90.0, 5.0, 10.0, 20.0, 30.0, 40.0, 50.0]):
+        view.write(float(i), _row(i + 1, cpu))
+
+    assert len(view._window["cpu_percent"]) == 5
+    assert [g for g, _ in view.groups] == ["cpu", "memory"]
+
+    lines = view.render(100)
+    assert all(len(line) <= 100 for line in lines)
+    assert "7 samples" in lines[0]
+    cpu = next(line for line in lines if "process %" in line)
+    # current, min and max over the whole run, p95 over the window
+    assert cpu.split()[2:6] == ["50", "5", "90", "50"]
+    # basic rows carry no counter rates: those rows are left out
+    assert not any("user %" in line for line in lines)
+    assert len(view.render(100, height=3)) == 3